@@ -18,12 +18,16 @@ from app.models import (
     Player,
     Auction,
     Bid,
-    Match,
-    MatchEvent,
+    AuctionEvent,
+    TeamCommitment,
+    IdempotencyKey,
+    ProxyBid,
+    AuctionLot,
     Tournament,
     AuditLog,
-    PlayerMatchStats,
-    PlayerCareerStats,
+    Match,
+    MatchEvent,
+    MatchSnapshot,
 )
 from app.db.session import Base
 from app.core.config import get_settings
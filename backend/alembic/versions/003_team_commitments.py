@@ -0,0 +1,51 @@
+"""Add team_commitments ledger.
+
+Revision ID: 003_team_commitments
+Revises: 002_add_auth
+Create Date: 2026-10-16
+
+One row per auction holding the current winning bid of an unresolved lot,
+so the bid budget check no longer aggregates the bids table. Backfilled
+from the winning bids of ongoing/paused auctions.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_team_commitments'
+down_revision = '002_add_auth'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'team_commitments',
+        sa.Column('auction_id', sa.UUID(), sa.ForeignKey('auctions.id'), nullable=False),
+        sa.Column('team_id', sa.UUID(), sa.ForeignKey('teams.id'), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('auction_id')
+    )
+    op.create_index('idx_commitment_team', 'team_commitments', ['team_id'])
+
+    op.execute(
+        """
+        INSERT INTO team_commitments (auction_id, team_id, amount)
+        SELECT b.auction_id, b.team_id, b.amount
+        FROM bids b
+        JOIN auctions a ON a.id = b.auction_id
+            AND a.current_player_id = b.player_id
+            AND a.current_bidder_id = b.team_id
+        JOIN players p ON p.id = b.player_id
+        WHERE b.is_winning
+          AND a.status IN ('ongoing', 'paused')
+          AND p.status <> 'sold'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_commitment_team', table_name='team_commitments')
+    op.drop_table('team_commitments')
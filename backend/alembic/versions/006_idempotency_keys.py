@@ -0,0 +1,38 @@
+"""Add idempotency_keys table.
+
+Revision ID: 006_idempotency_keys
+Revises: 005_auction_version
+Create Date: 2026-10-16
+
+Stores the response of bid requests sent with an Idempotency-Key header so
+client retries return the original bid instead of bidding again.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_idempotency_keys'
+down_revision = '005_auction_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('key', sa.String(255), nullable=False),
+        sa.Column('request_hash', sa.String(64), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=False),
+        sa.Column('response', sa.Text(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('user_id', 'key')
+    )
+    op.create_index('idx_idempotency_expires', 'idempotency_keys', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_idempotency_expires', table_name='idempotency_keys')
+    op.drop_table('idempotency_keys')
@@ -0,0 +1,260 @@
+"""Add auction_events log and auctions.last_event_seq.
+
+Revision ID: 007_auction_events
+Revises: 006_idempotency_keys
+Create Date: 2026-10-16
+
+Append-only per-auction event log numbered by auctions.last_event_seq.
+place_bid_atomic gains an event payload parameter and appends the
+bid_placed event itself, so the previous signature is dropped; downgrade
+drops the new one and reinstalls the 005 body.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_auction_events'
+down_revision = '006_idempotency_keys'
+branch_labels = None
+depends_on = None
+
+PLACE_BID_FUNCTION = """
+CREATE OR REPLACE FUNCTION place_bid_atomic(
+    p_auction_id varchar,
+    p_team_id varchar,
+    p_amount integer,
+    p_min_increment integer,
+    p_budget_limit bigint,
+    p_manager_id varchar,
+    p_bid_id varchar,
+    p_event_payload text
+)
+RETURNS TABLE (
+    result_code text,
+    out_player_id varchar,
+    out_bid_timestamp timestamptz,
+    out_base_price integer,
+    out_required bigint,
+    out_seq bigint
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_auction auctions%ROWTYPE;
+    v_team teams%ROWTYPE;
+    v_pending bigint;
+    v_now timestamptz := now();
+BEGIN
+    SELECT * INTO v_auction FROM auctions WHERE id = p_auction_id FOR UPDATE;
+    IF NOT FOUND THEN
+        result_code := 'auction_not_found';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+    out_player_id := v_auction.current_player_id;
+
+    IF v_auction.status <> 'ongoing' THEN
+        result_code := 'auction_not_active';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    IF v_auction.current_bid IS NULL THEN
+        IF v_auction.current_player_id IS NOT NULL THEN
+            SELECT base_price INTO out_base_price FROM players WHERE id = v_auction.current_player_id;
+            IF out_base_price IS NOT NULL AND p_amount < out_base_price THEN
+                result_code := 'below_base_price';
+                RETURN NEXT;
+                RETURN;
+            END IF;
+        END IF;
+    ELSIF p_amount < v_auction.current_bid + p_min_increment THEN
+        result_code := 'increment_too_small';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    SELECT * INTO v_team FROM teams WHERE id = p_team_id FOR UPDATE;
+    IF NOT FOUND THEN
+        result_code := 'team_not_found';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    IF p_manager_id IS NOT NULL AND v_team.manager_id IS DISTINCT FROM p_manager_id THEN
+        result_code := 'not_team_manager';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    SELECT COALESCE(SUM(amount), 0) INTO v_pending
+    FROM team_commitments
+    WHERE team_id = p_team_id AND auction_id <> p_auction_id;
+
+    out_required := COALESCE(v_team.budget_spent, 0) + v_pending + p_amount;
+    IF out_required > p_budget_limit THEN
+        result_code := 'insufficient_budget';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    UPDATE bids SET is_winning = false, updated_at = v_now
+    WHERE auction_id = p_auction_id AND is_winning;
+
+    INSERT INTO bids (id, auction_id, player_id, team_id, amount, is_winning, bid_timestamp, created_at, updated_at)
+    VALUES (p_bid_id, p_auction_id, v_auction.current_player_id, p_team_id, p_amount, true, v_now, v_now, v_now);
+
+    out_seq := v_auction.last_event_seq + 1;
+    UPDATE auctions
+    SET current_bid = p_amount, current_bidder_id = p_team_id, version = version + 1,
+        last_event_seq = out_seq, updated_at = v_now
+    WHERE id = p_auction_id;
+
+    INSERT INTO auction_events (auction_id, seq, type, payload, created_at, updated_at)
+    VALUES (p_auction_id, out_seq, 'bid_placed', p_event_payload, v_now, v_now);
+
+    INSERT INTO team_commitments (auction_id, team_id, amount, created_at, updated_at)
+    VALUES (p_auction_id, p_team_id, p_amount, v_now, v_now)
+    ON CONFLICT (auction_id) DO UPDATE
+    SET team_id = EXCLUDED.team_id, amount = EXCLUDED.amount, updated_at = EXCLUDED.updated_at;
+
+    result_code := 'accepted';
+    out_bid_timestamp := v_now;
+    RETURN NEXT;
+END;
+$$;
+"""
+
+DROP_PLACE_BID_FUNCTION = """
+DROP FUNCTION IF EXISTS place_bid_atomic(varchar, varchar, integer, integer, bigint, varchar, varchar, text);
+"""
+
+# As installed by 005_auction_version (the signature without the event payload)
+PREVIOUS_PLACE_BID_FUNCTION = """
+CREATE OR REPLACE FUNCTION place_bid_atomic(
+    p_auction_id varchar,
+    p_team_id varchar,
+    p_amount integer,
+    p_min_increment integer,
+    p_budget_limit bigint,
+    p_manager_id varchar,
+    p_bid_id varchar
+)
+RETURNS TABLE (
+    result_code text,
+    out_player_id varchar,
+    out_bid_timestamp timestamptz,
+    out_base_price integer,
+    out_required bigint
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_auction auctions%ROWTYPE;
+    v_team teams%ROWTYPE;
+    v_pending bigint;
+    v_now timestamptz := now();
+BEGIN
+    SELECT * INTO v_auction FROM auctions WHERE id = p_auction_id FOR UPDATE;
+    IF NOT FOUND THEN
+        result_code := 'auction_not_found';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+    out_player_id := v_auction.current_player_id;
+
+    IF v_auction.status <> 'ongoing' THEN
+        result_code := 'auction_not_active';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    IF v_auction.current_bid IS NULL THEN
+        IF v_auction.current_player_id IS NOT NULL THEN
+            SELECT base_price INTO out_base_price FROM players WHERE id = v_auction.current_player_id;
+            IF out_base_price IS NOT NULL AND p_amount < out_base_price THEN
+                result_code := 'below_base_price';
+                RETURN NEXT;
+                RETURN;
+            END IF;
+        END IF;
+    ELSIF p_amount < v_auction.current_bid + p_min_increment THEN
+        result_code := 'increment_too_small';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    SELECT * INTO v_team FROM teams WHERE id = p_team_id FOR UPDATE;
+    IF NOT FOUND THEN
+        result_code := 'team_not_found';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    IF p_manager_id IS NOT NULL AND v_team.manager_id IS DISTINCT FROM p_manager_id THEN
+        result_code := 'not_team_manager';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    SELECT COALESCE(SUM(amount), 0) INTO v_pending
+    FROM team_commitments
+    WHERE team_id = p_team_id AND auction_id <> p_auction_id;
+
+    out_required := COALESCE(v_team.budget_spent, 0) + v_pending + p_amount;
+    IF out_required > p_budget_limit THEN
+        result_code := 'insufficient_budget';
+        RETURN NEXT;
+        RETURN;
+    END IF;
+
+    UPDATE bids SET is_winning = false, updated_at = v_now
+    WHERE auction_id = p_auction_id AND is_winning;
+
+    INSERT INTO bids (id, auction_id, player_id, team_id, amount, is_winning, bid_timestamp, created_at, updated_at)
+    VALUES (p_bid_id, p_auction_id, v_auction.current_player_id, p_team_id, p_amount, true, v_now, v_now, v_now);
+
+    UPDATE auctions
+    SET current_bid = p_amount, current_bidder_id = p_team_id, version = version + 1, updated_at = v_now
+    WHERE id = p_auction_id;
+
+    INSERT INTO team_commitments (auction_id, team_id, amount, created_at, updated_at)
+    VALUES (p_auction_id, p_team_id, p_amount, v_now, v_now)
+    ON CONFLICT (auction_id) DO UPDATE
+    SET team_id = EXCLUDED.team_id, amount = EXCLUDED.amount, updated_at = EXCLUDED.updated_at;
+
+    result_code := 'accepted';
+    out_bid_timestamp := v_now;
+    RETURN NEXT;
+END;
+$$;
+"""
+
+DROP_PREVIOUS_PLACE_BID_FUNCTION = """
+DROP FUNCTION IF EXISTS place_bid_atomic(varchar, varchar, integer, integer, bigint, varchar, varchar);
+"""
+
+
+def upgrade() -> None:
+    op.add_column('auctions', sa.Column('last_event_seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.create_table(
+        'auction_events',
+        sa.Column('auction_id', sa.UUID(), sa.ForeignKey('auctions.id'), nullable=False),
+        sa.Column('seq', sa.BigInteger(), nullable=False),
+        sa.Column('type', sa.String(50), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('auction_id', 'seq')
+    )
+    op.execute(DROP_PREVIOUS_PLACE_BID_FUNCTION)
+    op.execute(PLACE_BID_FUNCTION)
+
+
+def downgrade() -> None:
+    op.execute(DROP_PLACE_BID_FUNCTION)
+    op.drop_table('auction_events')
+    op.drop_column('auctions', 'last_event_seq')
+    op.execute(PREVIOUS_PLACE_BID_FUNCTION)
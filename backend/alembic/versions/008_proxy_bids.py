@@ -0,0 +1,36 @@
+"""Add proxy_bids table.
+
+Revision ID: 008_proxy_bids
+Revises: 007_auction_events
+Create Date: 2026-10-16
+
+Standing maximum bids per (auction, player, team) that the server resolves
+into bids on the team's behalf.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_proxy_bids'
+down_revision = '007_auction_events'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'proxy_bids',
+        sa.Column('auction_id', sa.UUID(), sa.ForeignKey('auctions.id'), nullable=False),
+        sa.Column('player_id', sa.UUID(), sa.ForeignKey('players.id'), nullable=False),
+        sa.Column('team_id', sa.UUID(), sa.ForeignKey('teams.id'), nullable=False),
+        sa.Column('max_amount', sa.Integer(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('registered_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('auction_id', 'player_id', 'team_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('proxy_bids')
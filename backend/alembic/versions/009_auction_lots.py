@@ -0,0 +1,34 @@
+"""Add auction_lots table.
+
+Revision ID: 009_auction_lots
+Revises: 008_proxy_bids
+Create Date: 2026-10-16
+
+Ordered lot catalog per auction, used by the advance-to-next-lot operation.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_auction_lots'
+down_revision = '008_proxy_bids'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'auction_lots',
+        sa.Column('auction_id', sa.UUID(), sa.ForeignKey('auctions.id'), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('player_id', sa.UUID(), sa.ForeignKey('players.id'), nullable=False),
+        sa.Column('pool', sa.String(100), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('auction_id', 'position'),
+        sa.UniqueConstraint('auction_id', 'player_id', name='uq_lot_auction_player')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('auction_lots')
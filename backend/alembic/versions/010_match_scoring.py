@@ -0,0 +1,44 @@
+"""Add match scoring columns.
+
+Revision ID: 010_match_scoring
+Revises: 009_auction_lots
+Create Date: 2026-10-17
+
+Columns the Match and MatchEvent models use that the initial schema did
+not create: schedule and result fields on matches plus
+matches.last_event_seq (the last match_events.sequence_number), and the
+event timestamp on match_events.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_match_scoring'
+down_revision = '009_auction_lots'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('matches', sa.Column('scheduled_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
+    op.add_column('matches', sa.Column('started_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('matches', sa.Column('ended_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('matches', sa.Column('team_1_score', sa.Integer(), nullable=True))
+    op.add_column('matches', sa.Column('team_2_score', sa.Integer(), nullable=True))
+    op.add_column('matches', sa.Column('last_event_seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('matches', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
+    op.add_column('matches', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
+    op.add_column('match_events', sa.Column('event_timestamp', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
+    op.add_column('match_events', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
+    op.add_column('match_events', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
+    op.execute(
+        "UPDATE matches SET last_event_seq = COALESCE("
+        "(SELECT MAX(sequence_number) FROM match_events WHERE match_events.match_id = matches.id), 0)"
+    )
+
+
+def downgrade() -> None:
+    for column in ('updated_at', 'created_at', 'event_timestamp'):
+        op.drop_column('match_events', column)
+    for column in ('updated_at', 'created_at', 'last_event_seq', 'team_2_score', 'team_1_score', 'ended_at', 'started_at', 'scheduled_at'):
+        op.drop_column('matches', column)
@@ -0,0 +1,34 @@
+"""Add match_snapshots table.
+
+Revision ID: 011_match_snapshots
+Revises: 010_match_scoring
+Create Date: 2026-10-17
+
+Scoreboard checkpoints written every MATCH_SNAPSHOT_INTERVAL match
+events, so loading a match replays only the events after the latest one.
+Existing matches get snapshots from scripts/compact_match_events.py.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011_match_snapshots'
+down_revision = '010_match_scoring'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'match_snapshots',
+        sa.Column('match_id', sa.UUID(), sa.ForeignKey('matches.id'), nullable=False),
+        sa.Column('sequence_number', sa.BigInteger(), nullable=False),
+        sa.Column('state', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('match_id', 'sequence_number')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('match_snapshots')
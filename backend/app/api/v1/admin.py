@@ -13,9 +13,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_session
 from app.dependencies.rbac import require_admin
 from app.models import RegistrationToken, User, Team
-from app.schemas.admin import RegistrationTokenCreate, RegistrationTokenRead
+from app.schemas.admin import RegistrationTokenCreate, RegistrationTokenRead, UserAdminUpdate
 from app.schemas.auth import UserMeResponse
 from app.core.audit import log_audit
+from app.models.enums import AuditActionEnum
+from app.services.principal_cache import principal_cache
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -110,3 +112,49 @@ async def list_users(session: AsyncSession = Depends(get_session)):
             team_id=team_id
         ))
     return response
+
+
+@router.patch("/users/{user_id}", response_model=UserMeResponse)
+async def update_user(
+    user_id: str,
+    payload: UserAdminUpdate,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(require_admin),
+):
+    """Change a user's role or deactivate/reactivate them; takes effect on their next request."""
+    result = await session.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    changes = []
+    if payload.role is not None and payload.role.value != user.role:
+        changes.append(f"role={user.role}->{payload.role.value}")
+        user.role = payload.role.value
+    if payload.is_active is not None and payload.is_active != user.is_active:
+        changes.append(f"is_active={user.is_active}->{payload.is_active}")
+        user.is_active = payload.is_active
+
+    if changes:
+        await log_audit(
+            session=session,
+            user_id=current_user.id,
+            action=AuditActionEnum.UPDATE.value,
+            entity_type="user",
+            entity_id=user.id,
+            details=", ".join(changes),
+        )
+        await session.commit()
+        await principal_cache.invalidate(user.id)
+        await session.refresh(user)
+
+    result = await session.execute(select(Team.id).where(Team.manager_id == user.id))
+    return UserMeResponse(
+        id=user.id,
+        email=user.email,
+        username=user.username,
+        full_name=user.full_name,
+        role=user.role,
+        is_active=user.is_active,
+        team_id=result.scalars().first(),
+    )
@@ -1,12 +1,25 @@
 from __future__ import annotations
 
-from typing import List
-from fastapi import APIRouter, Depends, status, HTTPException, Request
+import time
+from typing import List, Optional
+from fastapi import APIRouter, Depends, status, HTTPException, Request, Response, Header, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.db.session import get_session
-from app.schemas.auction import AuctionCreate, AuctionRead, BidCreate, BidRead, AuctionPlayerUpdate
+from app.schemas.auction import (
+    AuctionCreate,
+    AuctionRead,
+    AuctionLiveRead,
+    BidCreate,
+    BidRead,
+    AuctionPlayerUpdate,
+    AuctionEventsRead,
+    ProxyBidCreate,
+    ProxyBidRead,
+    AuctionLotsUpdate,
+    AuctionLotRead,
+)
 from app.services.auction_service import (
     create_auction,
     start_auction,
@@ -17,9 +30,15 @@ from app.services.auction_service import (
     finalize_sold_player,
     update_current_player,
     mark_player_unsold,
+    bid_latency,
 )
 from app.dependencies.rbac import require_admin, require_team_manager, require_any_authenticated_user, get_current_user
 from app.core.rate_limit import bid_limiter, rate_limit_response
+from app.services.idempotency import idempotency_store, request_fingerprint
+from app.services.event_log import event_log
+from app.services.proxy_bidding import set_proxy_bid, cancel_proxy_bid, list_proxy_bids
+from app.services.lot_catalog import set_lots, list_lots, advance_lot, lot_catalog
+from app.services.auction_snapshots import auction_snapshots
 
 
 router = APIRouter(prefix="/auctions", tags=["auctions"]) 
@@ -50,17 +69,76 @@ async def place_bid_endpoint(
     id: str,
     payload: BidCreate,
     request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
     _=Depends(require_team_manager),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
 ):
     # Rate limiting: check bid limit
     if not await bid_limiter.enforce(request, "auction:bid"):
         return rate_limit_response()
     
     # require_team_manager enforces role; service enforces ownership
-    bid = await place_bid(session, id, str(payload.team_id), payload.amount, payload.min_increment, current_user)
-    return bid
+    started = time.perf_counter()
+    outcome = "rejected"
+    try:
+        if not idempotency_key:
+            bid = await place_bid(session, id, str(payload.team_id), payload.amount, payload.min_increment, current_user)
+            outcome = "accepted"
+            return bid
+
+        # Retries with the same key get the original bid back without bidding again
+        async def execute():
+            bid = await place_bid(session, id, str(payload.team_id), payload.amount, payload.min_increment, current_user)
+            return BidRead.model_validate(bid, from_attributes=True).model_dump(mode="json")
+
+        fingerprint = request_fingerprint("auction:bid", id, payload.team_id, payload.amount, payload.min_increment)
+        body, replayed = await idempotency_store.run(current_user.id, idempotency_key, fingerprint, execute)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        outcome = "accepted"
+        return body
+    finally:
+        bid_latency.observe(time.perf_counter() - started, transport="http", outcome=outcome)
+
+
+@router.put("/{id}/proxy-bid", response_model=ProxyBidRead)
+async def set_proxy_bid_endpoint(
+    id: str,
+    payload: ProxyBidCreate,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+    _=Depends(require_team_manager),
+):
+    """Register or change the team's maximum bid; the server bids for the team up to it."""
+    player_id = str(payload.player_id) if payload.player_id else None
+    proxy = await set_proxy_bid(session, id, str(payload.team_id), payload.max_amount, player_id, current_user)
+    return proxy
+
+
+@router.delete("/{id}/proxy-bid", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_proxy_bid_endpoint(
+    id: str,
+    team_id: str = Query(...),
+    player_id: Optional[str] = Query(None),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+    _=Depends(require_team_manager),
+):
+    await cancel_proxy_bid(session, id, team_id, player_id, current_user)
+    return None
+
+
+@router.get("/{id}/proxy-bids", response_model=List[ProxyBidRead])
+async def list_proxy_bids_endpoint(
+    id: str,
+    team_id: str = Query(...),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+    _=Depends(require_team_manager),
+):
+    return await list_proxy_bids(session, id, team_id, current_user)
 
 
 @router.post("/{id}/sold", response_model=AuctionRead, dependencies=[Depends(require_admin)])
@@ -75,6 +153,30 @@ async def mark_unsold_endpoint(id: str, session: AsyncSession = Depends(get_sess
     return auction
 
 
+@router.post("/{id}/advance", response_model=AuctionRead, dependencies=[Depends(require_admin)])
+async def advance_lot_endpoint(id: str, session: AsyncSession = Depends(get_session)):
+    """Sell (or mark unsold) the current lot and open the next one from the catalog."""
+    auction = await advance_lot(session, id)
+    return auction
+
+
+@router.put("/{id}/lots", response_model=List[AuctionLotRead], dependencies=[Depends(require_admin)])
+async def set_lots_endpoint(id: str, payload: AuctionLotsUpdate, session: AsyncSession = Depends(get_session)):
+    lots = [(str(lot.player_id), lot.pool) for lot in payload.lots]
+    return await set_lots(session, id, lots)
+
+
+@router.get("/{id}/lots", response_model=List[AuctionLotRead], dependencies=[Depends(require_any_authenticated_user)])
+async def list_lots_endpoint(id: str, session: AsyncSession = Depends(get_session)):
+    return await list_lots(session, id)
+
+
+@router.get("/{id}/lots/upcoming", response_model=List[AuctionLotRead], dependencies=[Depends(require_any_authenticated_user)])
+async def upcoming_lots_endpoint(id: str):
+    """The next lots after the current one, as last pushed to the auction room."""
+    return await lot_catalog.upcoming(id)
+
+
 @router.put("/{id}/player", response_model=AuctionRead, dependencies=[Depends(require_admin)])
 async def update_player_endpoint(
     id: str,
@@ -104,12 +206,24 @@ async def list_auctions(session: AsyncSession = Depends(get_session)):
     return result.scalars().all()
 
 
-@router.get("/{id}", response_model=AuctionRead, dependencies=[Depends(require_any_authenticated_user)])
-async def get_auction(id: str, session: AsyncSession = Depends(get_session)):
-    from sqlalchemy import select
-    from app.models import Auction as AuctionModel
-    result = await session.execute(select(AuctionModel).where(AuctionModel.id == id))
-    auction = result.scalars().first()
+@router.get("/{id}", response_model=AuctionLiveRead, dependencies=[Depends(require_any_authenticated_user)])
+async def get_auction(id: str):
+    auction = await auction_snapshots.get(id)
     if not auction:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
     return auction
+
+
+@router.get("/{id}/events", response_model=AuctionEventsRead, dependencies=[Depends(require_any_authenticated_user)])
+async def list_auction_events(
+    id: str,
+    after_seq: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    session: AsyncSession = Depends(get_session),
+):
+    """Events after `after_seq`, oldest first, for clients catching up on missed updates."""
+    result = await event_log.events_after(session, id, after_seq, limit)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
+    events, last_seq = result
+    return {"auction_id": id, "last_seq": last_seq, "events": [event.message for event in events]}
@@ -8,9 +8,10 @@ from uuid import uuid4
 from app.db.session import get_session
 from app.models import User, Team
 from app.schemas.auth import LoginRequest, LoginResponse, UserMeResponse, RegisterRequest
-from app.core.hash import verify_password, hash_password
+from app.core.hash import password_hasher
 from app.core.security import create_access_token
 from app.dependencies.rbac import get_current_user
+from app.services.principal_cache import Principal
 from app.core.audit import log_audit
 from app.models.enums import RoleEnum
 
@@ -49,7 +50,7 @@ async def register(
         id=user_id,
         email=f"{payload.username}@example.com",  # Placeholder email as frontend doesn't send it
         username=payload.username,
-        password_hash=hash_password(payload.password),
+        password_hash=await password_hasher.hash(payload.password),
         role=payload.role,
         is_active=True,
         full_name=payload.username,
@@ -109,7 +110,7 @@ async def login(
         )
     
     # Verify password
-    if not verify_password(payload.password, user.password_hash):
+    if not await password_hasher.verify(payload.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -146,21 +147,24 @@ async def login(
 
 @router.get("/me", response_model=UserMeResponse)
 async def get_me(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
     """
     Get current authenticated user.
     Requires valid Bearer token.
     """
-    team_id = await get_user_team_id(session, current_user)
+    result = await session.execute(select(User).where(User.id == current_user.id))
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
 
     return UserMeResponse(
-        id=current_user.id,
-        email=current_user.email,
-        username=current_user.username,
-        full_name=current_user.full_name,
-        role=current_user.role,
-        is_active=current_user.is_active,
-        team_id=team_id,
+        id=user.id,
+        email=user.email,
+        username=user.username,
+        full_name=user.full_name,
+        role=user.role,
+        is_active=user.is_active,
+        team_id=current_user.team_id,
     )
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, status, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_session
+from app.schemas.match import MatchCreate, MatchRead, MatchEventCreate, MatchEventRead, MatchScoreboardRead
+from app.services.match_service import create_match, list_matches, get_match, list_match_events, append_match_event
+from app.services.match_scoreboard import match_scoreboards
+from app.dependencies.rbac import require_admin, require_any_authenticated_user
+
+
+router = APIRouter(prefix="/matches", tags=["matches"])
+
+
+@router.post("", response_model=MatchRead, status_code=status.HTTP_201_CREATED, dependencies=[Depends(require_admin)])
+async def create_match_endpoint(payload: MatchCreate, session: AsyncSession = Depends(get_session)):
+    match = await create_match(session, payload)
+    return match
+
+
+@router.get("", response_model=List[MatchRead], dependencies=[Depends(require_any_authenticated_user)])
+async def list_matches_endpoint(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    session: AsyncSession = Depends(get_session),
+):
+    matches = await list_matches(session, status_filter)
+    return matches
+
+
+@router.get("/{id}", response_model=MatchRead, dependencies=[Depends(require_any_authenticated_user)])
+async def get_match_endpoint(id: str, session: AsyncSession = Depends(get_session)):
+    match = await get_match(session, id)
+    if not match:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Match not found")
+    return match
+
+
+@router.get("/{id}/scoreboard", response_model=MatchScoreboardRead, dependencies=[Depends(require_any_authenticated_user)])
+async def get_scoreboard_endpoint(id: str, session: AsyncSession = Depends(get_session)):
+    """Current score, from memory; rebuilt from the events only on first use."""
+    board = await match_scoreboards.get(session, id)
+    if board is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Match not found")
+    return board.as_dict()
+
+
+@router.post(
+    "/{id}/events",
+    response_model=MatchEventRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_admin)],
+)
+async def append_match_event_endpoint(id: str, payload: MatchEventCreate, session: AsyncSession = Depends(get_session)):
+    """Record the next scoring event; it is broadcast to `/ws/matches/{id}`."""
+    event = await append_match_event(session, id, payload)
+    return event
+
+
+@router.get("/{id}/events", response_model=List[MatchEventRead], dependencies=[Depends(require_any_authenticated_user)])
+async def list_match_events_endpoint(
+    id: str,
+    after_seq: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    session: AsyncSession = Depends(get_session),
+):
+    """Events after `after_seq`, oldest first."""
+    if not await get_match(session, id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Match not found")
+    events = await list_match_events(session, id, after_seq, limit)
+    return events
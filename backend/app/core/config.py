@@ -47,6 +47,86 @@ class Settings(BaseSettings):
         alias="CORS_ORIGINS_REGEX"
     )
 
+    # Bidding settings
+    # "locking": row-locked transaction per bid (default)
+    # "engine": in-memory auction engine with write-behind persistence
+    # "group_commit": concurrent bids per auction resolved in one transaction
+    # "single_statement": one round trip through the place_bid_atomic SQL function
+    bid_mode: str = Field(default="locking", alias="BID_MODE")
+    engine_flush_interval_ms: int = Field(default=20, alias="ENGINE_FLUSH_INTERVAL_MS")
+    group_commit_interval_ms: int = Field(default=5, alias="GROUP_COMMIT_INTERVAL_MS")
+    # Auction row concurrency: "pessimistic" (FOR UPDATE) or "optimistic" (version CAS)
+    auction_concurrency: str = Field(default="pessimistic", alias="AUCTION_CONCURRENCY")
+    auction_cas_max_retries: int = Field(default=5, alias="AUCTION_CAS_MAX_RETRIES")
+    # Retries for transactions aborted by a deadlock or serialization failure,
+    # with jittered exponential backoff between attempts
+    tx_max_retries: int = Field(default=3, alias="TX_MAX_RETRIES")
+    tx_retry_base_ms: int = Field(default=5, alias="TX_RETRY_BASE_MS")
+    tx_retry_max_ms: int = Field(default=200, alias="TX_RETRY_MAX_MS")
+    # Seconds between commitment ledger checks against the bids table (0 disables)
+    ledger_reconcile_interval_seconds: int = Field(default=60, alias="LEDGER_RECONCILE_INTERVAL_SECONDS")
+    # Recent auction events kept in memory per auction for catch-up reads
+    event_ring_size: int = Field(default=256, alias="EVENT_RING_SIZE")
+
+    # Idempotency-Key responses: kept this long, cached in memory within these bounds
+    idempotency_ttl_seconds: int = Field(default=3600, alias="IDEMPOTENCY_TTL_SECONDS")
+    idempotency_cache_max_entries: int = Field(default=10000, alias="IDEMPOTENCY_CACHE_MAX_ENTRIES")
+    idempotency_cache_max_bytes: int = Field(default=4 * 1024 * 1024, alias="IDEMPOTENCY_CACHE_MAX_BYTES")
+
+    # Automatic lot countdown: sells (or marks unsold) a lot when no bid arrives in time
+    lot_timer_enabled: bool = Field(default=False, alias="LOT_TIMER_ENABLED")
+    lot_countdown_seconds: float = Field(default=15, alias="LOT_COUNTDOWN_SECONDS")
+    lot_going_once_seconds: float = Field(default=6, alias="LOT_GOING_ONCE_SECONDS")
+    lot_going_twice_seconds: float = Field(default=3, alias="LOT_GOING_TWICE_SECONDS")
+    lot_tick_interval_ms: int = Field(default=1000, alias="LOT_TICK_INTERVAL_MS")
+    timer_wheel_tick_ms: int = Field(default=100, alias="TIMER_WHEEL_TICK_MS")
+    timer_wheel_slots: int = Field(default=512, alias="TIMER_WHEEL_SLOTS")
+
+    # Step used when resolving competing proxy (max) bids
+    proxy_bid_increment: int = Field(default=1, alias="PROXY_BID_INCREMENT")
+
+    # Upcoming lots whose player cards are prefetched and pushed to the auction room
+    lot_prefetch_count: int = Field(default=3, alias="LOT_PREFETCH_COUNT")
+
+    # WebSocket broadcast fan-out across workers: "memory" (single worker) or "postgres" (LISTEN/NOTIFY)
+    ws_broker: str = Field(default="memory", alias="WS_BROKER")
+    ws_broker_channel: str = Field(default="ws_broadcast", alias="WS_BROKER_CHANNEL")
+
+    # Per-connection outbound queue; on overflow: "drop_oldest", "conflate" (resync from a snapshot) or "disconnect"
+    ws_send_queue_size: int = Field(default=256, alias="WS_SEND_QUEUE_SIZE")
+    ws_overflow_policy: str = Field(default="conflate", alias="WS_OVERFLOW_POLICY")
+
+    # Spectator sockets get these (comma-separated) message types at most WS_SPECTATOR_HZ times a second, latest only; 0 disables
+    ws_spectator_hz: float = Field(default=4, alias="WS_SPECTATOR_HZ")
+    ws_conflated_types: str = Field(default="bid_placed,lot_countdown", alias="WS_CONFLATED_TYPES")
+
+    # Server ping interval, and how long a socket may stay silent (no pong or other message) before it is closed; 0 disables
+    ws_heartbeat_seconds: float = Field(default=20, alias="WS_HEARTBEAT_SECONDS")
+    ws_idle_timeout_seconds: float = Field(default=60, alias="WS_IDLE_TIMEOUT_SECONDS")
+
+    # Post-commit event delivery: events queued across auctions, and how long shutdown waits to deliver them
+    event_dispatch_max_pending: int = Field(default=10000, alias="EVENT_DISPATCH_MAX_PENDING")
+    event_dispatch_drain_seconds: float = Field(default=5.0, alias="EVENT_DISPATCH_DRAIN_SECONDS")
+
+    # Auctions whose event-maintained snapshot is kept in memory (least recently read evicted)
+    auction_snapshot_capacity: int = Field(default=1000, alias="AUCTION_SNAPSHOT_CAPACITY")
+
+    # Match scoreboards kept in memory (least recently used evicted; rebuilt from the events on demand)
+    match_scoreboard_capacity: int = Field(default=200, alias="MATCH_SCOREBOARD_CAPACITY")
+    # A scoreboard snapshot is stored every N match events; loads replay at most N events (0 disables)
+    match_snapshot_interval: int = Field(default=100, alias="MATCH_SNAPSHOT_INTERVAL")
+
+    # bcrypt runs on this many threads off the event loop (0 = one per CPU
+    # core, leaving one for the loop); sign-ins beyond that many waiting for a
+    # thread are refused with 503
+    password_hash_workers: int = Field(default=0, alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_waiting: int = Field(default=64, alias="PASSWORD_HASH_MAX_WAITING")
+
+    # Authenticated principals (role, active flag, team) cached per worker;
+    # changes through the API invalidate them at once, others after the TTL (0 disables)
+    principal_cache_ttl_seconds: float = Field(default=30, alias="PRINCIPAL_CACHE_TTL_SECONDS")
+    principal_cache_max_entries: int = Field(default=10000, alias="PRINCIPAL_CACHE_MAX_ENTRIES")
+
     @property
     def cors_origins(self) -> list:
         """Parse CORS_ORIGINS from comma-separated string."""
@@ -2,9 +2,40 @@
 
 This file provides a wrapper around bcrypt for hashing and verifying passwords.
 It's used by the authentication layer but contains no API or business logic.
+
+A bcrypt call at cost 12 takes a few hundred milliseconds of CPU. Request
+handlers use `password_hasher`, which runs it on a small thread pool (bcrypt
+releases the GIL) so the event loop keeps serving bids and WebSockets; the
+plain functions are for scripts.
 """
 
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
 import bcrypt
+from fastapi import HTTPException, status
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+
+settings = get_settings()
+T = TypeVar("T")
+
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+hash_waiting = metrics.gauge("password_hash_waiting", "Password hash calls waiting for a worker thread")
+hash_running = metrics.gauge("password_hash_running", "Password hash calls running on a worker thread")
+hash_wait = metrics.histogram(
+    "password_hash_wait_seconds", "Time a password hash call waited for a worker thread", ("op",), buckets=HASH_BUCKETS
+)
+hash_duration = metrics.histogram(
+    "password_hash_seconds", "bcrypt time per password hash call", ("op",), buckets=HASH_BUCKETS
+)
+hash_rejected = metrics.counter(
+    "password_hash_rejected_total", "Password hash calls refused because too many were waiting", ("op",)
+)
 
 
 def hash_password(password: str) -> str:
@@ -20,3 +51,73 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     # Truncate to 72 bytes (bcrypt limit)
     password_bytes = plain_password[:72].encode('utf-8')
     return bcrypt.checkpw(password_bytes, hashed_password.encode('utf-8'))
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop, `workers` calls at a time.
+
+    Calls beyond that wait on a semaphore rather than in the executor's
+    unbounded queue: waiting is measured, a caller that goes away (client
+    disconnect) stops waiting without costing a bcrypt run, and once
+    `max_waiting` calls are waiting further ones get 503 instead of a sign-in
+    that would time out anyway.
+    """
+
+    def __init__(self, workers: int = 0, max_waiting: int = 64):
+        # bcrypt is pure CPU: more threads than spare cores only slow the loop down
+        self.workers = workers if workers > 0 else max((os.cpu_count() or 2) - 1, 1)
+        self.max_waiting = max_waiting
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+
+    async def start(self) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+            self._slots = asyncio.Semaphore(self.workers)
+
+    async def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._slots = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    async def _run(self, op: str, fn: Callable[..., T], *args) -> T:
+        if self._executor is None:
+            await self.start()
+        slots, executor = self._slots, self._executor
+        if slots.locked() and self._waiting >= self.max_waiting:
+            hash_rejected.inc(op=op)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-ins in progress, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        queued = time.perf_counter()
+        self._waiting += 1
+        hash_waiting.inc()
+        try:
+            await slots.acquire()
+        finally:
+            self._waiting -= 1
+            hash_waiting.dec()
+        started = time.perf_counter()
+        hash_wait.observe(started - queued, op=op)
+        hash_running.inc()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        finally:
+            hash_running.dec()
+            hash_duration.observe(time.perf_counter() - started, op=op)
+            slots.release()
+
+
+# Global password hasher instance
+password_hasher = PasswordHasher(workers=settings.password_hash_workers, max_waiting=settings.password_hash_max_waiting)
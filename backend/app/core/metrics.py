@@ -0,0 +1,185 @@
+"""In-process metrics.
+
+Counters, gauges and histograms keyed by name and label values, rendered in the
+Prometheus text exposition format by `GET /metrics`. Values are per worker
+process; scrape every worker (or aggregate upstream) for totals.
+
+Usage:
+  retries = metrics.counter("auction_tx_retries_total", "Retried transactions", ("operation", "reason"))
+  retries.inc(operation="place_bid", reason="deadlock")
+  latency = metrics.histogram("ws_fanout_seconds", "Broadcast to socket write", ("room",))
+  latency.observe(0.004, room="auction:1")
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]  # (name, ((label, value), ...), value)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def remove(self, **labels) -> None:
+        """Drop one label combination, e.g. for a room that no longer exists."""
+        key = self._key(labels)
+        with self._lock:
+            self._values.pop(key, None)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [
+                (self.name, tuple(zip(self.labelnames, key)), value)
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self._values: Dict[LabelValues, List[float]] = {}  # bucket counts..., +Inf count, sum
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[index] += 1
+                    break
+            else:
+                row[len(self.buckets)] += 1
+            row[-1] += value
+
+    def value(self, **labels) -> float:
+        """Number of observations."""
+        row = self._values.get(self._key(labels))
+        return sum(row[:-1]) if row else 0
+
+    def samples(self) -> List[Sample]:
+        out: List[Sample] = []
+        with self._lock:
+            for key, row in sorted(self._values.items()):
+                labels = tuple(zip(self.labelnames, key))
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, row):
+                    cumulative += count
+                    out.append((f"{self.name}_bucket", labels + (("le", f"{bound:g}"),), cumulative))
+                cumulative += row[len(self.buckets)]
+                out.append((f"{self.name}_bucket", labels + (("le", "+Inf"),), cumulative))
+                out.append((f"{self.name}_sum", labels, row[-1]))
+                out.append((f"{self.name}_count", labels, cumulative))
+        return out
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """Holds every metric of the process and renders them for scraping."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, cls, name: str, documentation: str, labelnames: Iterable[str], **kwargs):
+        existing = self._metrics.get(name)
+        if existing is not None:
+            if not isinstance(existing, cls):
+                raise ValueError(f"Metric {name} already registered as {existing.kind}")
+            return existing
+        metric = cls(name, documentation, labelnames, **kwargs)
+        self._metrics[name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for sample_name, pairs, value in metric.samples():
+                if pairs:
+                    labels = ",".join(f'{label}="{_escape(val)}"' for label, val in pairs)
+                    lines.append(f"{sample_name}{{{labels}}} {value:g}")
+                else:
+                    lines.append(f"{sample_name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+# Global registry instance
+metrics = MetricsRegistry()
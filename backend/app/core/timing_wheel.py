@@ -0,0 +1,102 @@
+"""Hashed timing wheel.
+
+Drives any number of timers from a single asyncio task. Time is divided
+into ticks of `tick_ms`; a timer due in `n` ticks lands in slot
+`(cursor + n) % slots` with the number of full rotations it still has to
+wait. Scheduling, rescheduling and cancelling are O(1) dict operations,
+and each tick only visits the timers in one slot.
+
+Callbacks are plain functions run on the wheel's task; they must not
+block. Hand slow work to a task.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Timer:
+    key: Hashable
+    callback: Callable[[], None]
+    slot: int
+    rounds: int
+
+
+class TimingWheel:
+    """Timers keyed by an id; scheduling a key again replaces its timer."""
+
+    def __init__(self, tick_ms: int = 100, slots: int = 512):
+        self.tick = tick_ms / 1000
+        self._slots: List[Dict[Hashable, _Timer]] = [{} for _ in range(slots)]
+        self._timers: Dict[Hashable, _Timer] = {}
+        self._cursor = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable[[], None]) -> None:
+        """Run `callback` after `delay` seconds (rounded up to whole ticks)."""
+        self.cancel(key)
+        ticks = max(1, math.ceil(delay / self.tick - 1e-9))
+        slot = (self._cursor + ticks) % len(self._slots)
+        timer = _Timer(key, callback, slot, (ticks - 1) // len(self._slots))
+        self._slots[slot][key] = timer
+        self._timers[key] = timer
+
+    def cancel(self, key: Hashable) -> bool:
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        del self._slots[timer.slot][key]
+        return True
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.tick
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            # Catch up on ticks missed while the loop was busy
+            while next_tick <= loop.time():
+                self._advance()
+                next_tick += self.tick
+
+    def _advance(self) -> None:
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        bucket = self._slots[self._cursor]
+        due = []
+        for key, timer in list(bucket.items()):
+            if timer.rounds > 0:
+                timer.rounds -= 1
+                continue
+            del bucket[key]
+            del self._timers[key]
+            due.append(timer)
+        for timer in due:
+            try:
+                timer.callback()
+            except Exception as exc:
+                logger.error("Timer %s failed: %s", timer.key, exc, exc_info=exc)
@@ -11,10 +11,12 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     AsyncEngine,
 )
+from sqlalchemy import text
 from sqlalchemy.pool import NullPool
 from sqlalchemy.orm import declarative_base
 
 from app.core.config import get_settings
+from app.db.functions import PLACE_BID_FUNCTION, DROP_PLACE_BID_FUNCTION_V1
 
 settings = get_settings()
 
@@ -56,9 +58,12 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def init_db() -> None:
-    """Initialize database tables (creates schema)."""
+    """Initialize database tables (creates schema) and server-side functions."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text(DROP_PLACE_BID_FUNCTION_V1))
+            await conn.execute(text(PLACE_BID_FUNCTION))
 
 
 async def close_db() -> None:
@@ -0,0 +1,154 @@
+"""Transaction helper for row-locking service code.
+
+`run_transaction` runs a unit of work in its own transaction and retries the
+whole unit when PostgreSQL aborts it as a deadlock victim (SQLSTATE 40P01)
+or with a serialization failure (40001), and when an optimistic version
+check loses a race (`StaleDataError`). Retries back off exponentially with
+full jitter so colliding transactions do not collide again in lockstep.
+
+Row locks go through `lock_rows` / `lock_row`, which take them in the
+canonical order Auction -> AuctionLot -> Player -> Team -> ProxyBid -> Bid
+(Match rows, locked on their own, come last),
+and by primary key within a table. Asking for a lock out of order raises `LockOrderError` straight
+away instead of deadlocking later under load. Statements that lock rows
+implicitly (UPDATE/DELETE) declare it with `note_lock`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+# Canonical lock order by table name
+LOCK_ORDER = ("auctions", "auction_lots", "players", "teams", "proxy_bids", "bids", "matches")
+
+RETRYABLE_SQLSTATES = {
+    "40P01": "deadlock",
+    "40001": "serialization",
+}
+STALE = "stale"
+
+_LOCK_RANK = "lock_rank"
+
+tx_retries = metrics.counter(
+    "auction_tx_retries_total",
+    "Transactions retried after a deadlock, serialization failure or stale version",
+    ("operation", "reason"),
+)
+tx_exhausted = metrics.counter(
+    "auction_tx_retries_exhausted_total",
+    "Transactions that failed after using up their retries",
+    ("operation", "reason"),
+)
+
+
+class LockOrderError(RuntimeError):
+    """A row lock was requested out of the canonical order."""
+
+
+def note_lock(session: AsyncSession, model) -> None:
+    """Record that the current transaction now holds locks on `model` rows."""
+    table = model.__tablename__
+    rank = LOCK_ORDER.index(table)
+    held = session.info.get(_LOCK_RANK, -1)
+    if rank < held:
+        raise LockOrderError(
+            f"Locking {table} after {LOCK_ORDER[held]} breaks the lock order {' -> '.join(LOCK_ORDER)}"
+        )
+    session.info[_LOCK_RANK] = rank
+
+
+async def lock_rows(session: AsyncSession, model, *criteria, lock: bool = True) -> List:
+    """SELECT ... FOR UPDATE the matching rows of `model`, in primary key order.
+
+    With `lock=False` the rows are read without a lock but still count
+    towards the lock order, for optimistic callers that rely on a version check.
+    """
+    note_lock(session, model)
+    stmt = select(model).where(*criteria).order_by(*model.__table__.primary_key.columns)
+    if lock:
+        stmt = stmt.with_for_update()
+    res = await session.execute(stmt)
+    return list(res.scalars().all())
+
+
+async def lock_row(session: AsyncSession, model, *criteria, lock: bool = True):
+    """Like `lock_rows` for at most one row; returns None if nothing matches."""
+    rows = await lock_rows(session, model, *criteria, lock=lock)
+    return rows[0] if rows else None
+
+
+def classify_error(exc: BaseException) -> Optional[str]:
+    """Return the retry reason for a transient failure, or None if it is not retryable."""
+    if isinstance(exc, StaleDataError):
+        return STALE
+    if isinstance(exc, DBAPIError):
+        orig = exc.orig
+        code = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+        if code is None and orig is not None:
+            code = getattr(orig.__cause__, "sqlstate", None)
+        return RETRYABLE_SQLSTATES.get(code)
+    return None
+
+
+def _backoff_seconds(attempt: int) -> float:
+    ceiling = min(settings.tx_retry_max_ms, settings.tx_retry_base_ms * (2 ** attempt))
+    return random.uniform(0, ceiling) / 1000
+
+
+async def run_transaction(
+    session: AsyncSession,
+    unit: Callable[[], Awaitable[T]],
+    operation: str,
+) -> T:
+    """Run `unit` inside `session.begin()`, retrying the whole unit on transient failures.
+
+    `unit` must do all of its reads inside the call so each attempt starts
+    from fresh rows. Deadlocks and serialization failures are retried up to
+    TX_MAX_RETRIES times, stale versions up to AUCTION_CAS_MAX_RETRIES times;
+    after that the caller gets HTTP 409.
+    """
+    if session.in_transaction():
+        # Close the implicit read transaction left by earlier queries on this
+        # session (e.g. the auth dependency) so every attempt starts fresh
+        await session.commit()
+
+    attempt = 0
+    while True:
+        session.info.pop(_LOCK_RANK, None)
+        try:
+            async with session.begin():
+                return await unit()
+        except (DBAPIError, StaleDataError) as exc:
+            reason = classify_error(exc)
+            if reason is None:
+                raise
+            limit = settings.auction_cas_max_retries if reason == STALE else settings.tx_max_retries
+            if attempt >= limit:
+                tx_exhausted.inc(operation=operation, reason=reason)
+                logger.warning("%s failed after %d retries (%s)", operation, attempt, reason)
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Auction was modified concurrently, please retry",
+                )
+            tx_retries.inc(operation=operation, reason=reason)
+            attempt += 1
+            await asyncio.sleep(_backoff_seconds(attempt))
+        finally:
+            session.info.pop(_LOCK_RANK, None)
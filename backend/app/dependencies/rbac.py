@@ -10,6 +10,8 @@ Rules implemented here:
 - Admin bypasses all checks
 - Team ownership enforced via `Team.manager_id`
 - Raises HTTPException with 401 (unauthenticated), 403 (unauthorized), 404 (resource not found)
+- The current user is a `Principal` (id, role, is_active, team_id) from
+  `principal_cache`, not a `User` row; load the row when more is needed
 
 Do NOT add business logic or DB schema changes in this module.
 """
@@ -24,30 +26,18 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import decode_token
 from app.db.session import get_session
-from app.models import User, Team
+from app.models import Team
+from app.services.principal_cache import Principal, principal_cache
 
 _bearer = HTTPBearer()
 _bearer_optional = HTTPBearer(auto_error=False)
 
 
-def _is_admin(user: User) -> bool:
+def _is_admin(user: Principal) -> bool:
     return (user.role or "").lower() == "admin"
 
 
-async def _get_user_by_id(session: AsyncSession, user_id: str) -> Optional[User]:
-    result = await session.execute(select(User).where(User.id == user_id))
-    return result.scalars().first()
-
-
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(_bearer),
-    session: AsyncSession = Depends(get_session),
-) -> User:
-    """Authenticate request using Bearer token and return `User`.
-
-    Raises HTTP 401 on invalid/expired token or if user is not found/inactive.
-    """
-    token = credentials.credentials
+async def _principal_from_token(session: AsyncSession, token: str) -> Principal:
     try:
         payload = decode_token(token, expected_type="access")
     except JWTError:
@@ -57,39 +47,35 @@ async def get_current_user(
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
 
-    user = await _get_user_by_id(session, user_id)
-    if not user or not getattr(user, "is_active", True):
+    user = await principal_cache.get(session, user_id)
+    if not user or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
     return user
 
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(_bearer),
+    session: AsyncSession = Depends(get_session),
+) -> Principal:
+    """Authenticate request using Bearer token and return its `Principal`.
+
+    Raises HTTP 401 on invalid/expired token or if user is not found/inactive.
+    """
+    return await _principal_from_token(session, credentials.credentials)
+
+
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer_optional),
     session: AsyncSession = Depends(get_session),
-) -> Optional[User]:
-    """Return User if token is valid, else None. Raises 401 only if token is invalid."""
+) -> Optional[Principal]:
+    """Return the Principal if token is valid, else None. Raises 401 only if token is invalid."""
     if not credentials:
         return None
-
-    token = credentials.credentials
-    try:
-        payload = decode_token(token, expected_type="access")
-    except JWTError:
-        # If a token is sent but invalid, we return 401 to avoid confusion
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
-
-    user_id = payload.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
-
-    user = await _get_user_by_id(session, user_id)
-    if not user or not getattr(user, "is_active", True):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
-
-    return user
+    # If a token is sent but invalid, we return 401 to avoid confusion
+    return await _principal_from_token(session, credentials.credentials)
 
 
-async def require_any_authenticated_user(current_user: User = Depends(get_current_user)) -> User:
+async def require_any_authenticated_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Ensure the request is authenticated.
 
     This expects the caller to inject the real `current_user` dependency (from
@@ -103,7 +89,7 @@ async def require_any_authenticated_user(current_user: User = Depends(get_curren
     return current_user
 
 
-async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+async def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Require an admin user. Admin bypasses all checks."""
     user = await require_any_authenticated_user(current_user)
     if _is_admin(user):
@@ -111,7 +97,7 @@ async def require_admin(current_user: User = Depends(get_current_user)) -> User:
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
 
 
-async def require_team_manager(current_user: User = Depends(get_current_user)) -> User:
+async def require_team_manager(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Require at least a team manager (or admin)."""
     user = await require_any_authenticated_user(current_user)
     if _is_admin(user):
@@ -131,7 +117,7 @@ def require_self_or_admin(user_id_param: str) -> Callable[..., Any]:
             ...
     """
 
-    async def _dependency(current_user: User = Depends(get_current_user), **kwargs) -> User:
+    async def _dependency(current_user: Principal = Depends(get_current_user), **kwargs) -> Principal:
         user = await require_any_authenticated_user(current_user)
         if _is_admin(user):
             return user
@@ -153,7 +139,7 @@ def require_team_manager_or_admin(team_id_param: str) -> Callable[..., Any]:
     team id. FastAPI will bind the concrete value at runtime.
     """
 
-    async def _dependency(current_user: User = Depends(get_current_user), session: AsyncSession = Depends(get_session), **kwargs) -> User:
+    async def _dependency(current_user: Principal = Depends(get_current_user), session: AsyncSession = Depends(get_session), **kwargs) -> Principal:
         user = await require_any_authenticated_user(current_user)
         if _is_admin(user):
             return user
@@ -7,13 +7,15 @@ import sys
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.config import get_settings
 from app.core.logging import RequestLoggingMiddleware, setup_logging
 from app.core.errors import register_error_handlers
+from app.core.hash import password_hasher
+from app.core.metrics import metrics
 from app.db.session import init_db, close_db, engine
 from app.models import (
     User,
@@ -28,7 +30,21 @@ from app.api.v1 import auth as auth_api
 from app.api.v1 import teams as teams_api
 from app.api.v1 import players as players_api
 from app.api.v1 import auctions as auctions_api
-from app.websocket.endpoints import websocket_auction_endpoint
+from app.api.v1 import matches as matches_api
+from app.services.auction_engine import auction_engine
+from app.services.auction_service import bid_pipeline
+from app.services.commitment_ledger import commitment_reconciler
+from app.services.idempotency import idempotency_store
+from app.services.lot_timer import lot_timer
+from app.services.proxy_bidding import proxy_bid_resolver
+from app.services.lot_catalog import lot_catalog
+from app.websocket.endpoints import websocket_auction_endpoint, websocket_match_endpoint, auction_room_snapshot, match_room_snapshot
+from app.websocket.manager import manager
+from app.services.event_log import event_log
+from app.services.event_dispatcher import event_dispatcher
+from app.services.auction_snapshots import auction_snapshots
+from app.services.match_scoreboard import match_scoreboards
+from app.services.principal_cache import principal_cache
 
 
 logger = logging.getLogger(__name__)
@@ -64,10 +80,43 @@ async def lifespan(app: FastAPI):
     validate_config()
     await init_db()
     logger.info("✓ Database initialized")
+    manager.on_remote_message(event_log.ingest_remote)
+    manager.on_remote_message(match_scoreboards.ingest_remote)
+    manager.on_remote_message(principal_cache.ingest_remote)
+    manager.set_snapshot_provider("auction:", auction_room_snapshot)
+    manager.set_snapshot_provider("match:", match_room_snapshot)
+    manager.broker.set_reference_loader("auction:", event_log.load_message)
+    manager.broker.on_reconnect(lambda: auction_snapshots.invalidate(reason="broker_reconnect"))
+    manager.broker.on_reconnect(match_scoreboards.clear)
+    manager.broker.on_reconnect(principal_cache.clear)
+    await password_hasher.start()
+    await manager.start()
+    await event_dispatcher.start()
+    await auction_snapshots.start()
+    await auction_engine.start()
+    await commitment_reconciler.start()
+    await idempotency_store.start()
+    await proxy_bid_resolver.start()
+    await lot_catalog.start()
+    if settings.lot_timer_enabled:
+        await lot_timer.start()
     
     yield
     
     # Shutdown
+    await lot_timer.stop()
+    await proxy_bid_resolver.stop()
+    await lot_catalog.stop()
+    await idempotency_store.stop()
+    await commitment_reconciler.stop()
+    await bid_pipeline.stop()
+    await auction_engine.stop()
+    logger.info("✓ Auction engine flushed")
+    await event_dispatcher.stop()
+    logger.info("✓ Pending events delivered")
+    await auction_snapshots.stop()
+    await manager.stop()
+    await password_hasher.stop()
     await close_db()
     logger.info("✓ Database connections closed")
 
@@ -149,6 +198,14 @@ async def readiness_check():
         )
 
 
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """
+    In-process metrics of this worker in Prometheus text format.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """API root endpoint."""
@@ -176,18 +233,35 @@ app.include_router(admin_api.router, prefix="/api/v1")
 app.include_router(teams_api.router, prefix="/api/v1")
 app.include_router(players_api.router, prefix="/api/v1")
 app.include_router(auctions_api.router, prefix="/api/v1")
+app.include_router(matches_api.router, prefix="/api/v1")
 
 # ==================== WebSocket Routes ====================
 
 @app.websocket("/ws/auctions/{auction_id}")
-async def ws_auction_endpoint(websocket, auction_id: str):
-    """WebSocket endpoint for auction real-time updates. Read-only, JWT-protected.
+async def ws_auction_endpoint(websocket: WebSocket, auction_id: str):
+    """WebSocket endpoint for auction real-time updates and bids. JWT-protected.
     
     Client must pass JWT token as query parameter: ?token=<jwt_token>
+    On reconnect, pass the last applied sequence number too: &last_seq=<seq>
+    Screens that only need the latest state can ask for &stream=spectator.
     """
     token = websocket.query_params.get("token")
     if not token:
         await websocket.close(code=1008, reason="Missing token")
         return
-    await websocket_auction_endpoint(websocket, auction_id, token)
+    last_seq = websocket.query_params.get("last_seq")
+    last_seq = int(last_seq) if last_seq and last_seq.isdigit() else None
+    await websocket_auction_endpoint(websocket, auction_id, token, last_seq, websocket.query_params.get("stream"))
+
 
+@app.websocket("/ws/matches/{match_id}")
+async def ws_match_endpoint(websocket: WebSocket, match_id: str):
+    """WebSocket endpoint for live match scoring. Read-only, JWT-protected.
+    
+    Client must pass JWT token as query parameter: ?token=<jwt_token>
+    """
+    token = websocket.query_params.get("token")
+    if not token:
+        await websocket.close(code=1008, reason="Missing token")
+        return
+    await websocket_match_endpoint(websocket, match_id, token)
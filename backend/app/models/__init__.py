@@ -19,6 +19,14 @@ from app.models.team import Team
 from app.models.player import Player
 from app.models.auction import Auction
 from app.models.bid import Bid
+from app.models.auction_event import AuctionEvent
+from app.models.team_commitment import TeamCommitment
+from app.models.idempotency_key import IdempotencyKey
+from app.models.proxy_bid import ProxyBid
+from app.models.auction_lot import AuctionLot
+from app.models.match import Match
+from app.models.match_event import MatchEvent
+from app.models.match_snapshot import MatchSnapshot
 from app.models.tournament import Tournament
 from app.models.audit_log import AuditLog
 
@@ -40,6 +48,14 @@ __all__ = [
     "Player",
     "Auction",
     "Bid",
+    "AuctionEvent",
+    "TeamCommitment",
+    "IdempotencyKey",
+    "ProxyBid",
+    "AuctionLot",
+    "Match",
+    "MatchEvent",
+    "MatchSnapshot",
     "Tournament",
     "AuditLog",
 ]
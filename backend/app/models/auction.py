@@ -1,6 +1,6 @@
 """Auction model - represents auctions for players."""
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Index, CheckConstraint
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, BigInteger, Index, CheckConstraint
 
 from sqlalchemy.orm import relationship
 
@@ -28,6 +28,8 @@ class Auction(BaseModel):
     current_bid = Column(Integer, nullable=True)  # Current highest bid amount
     current_bidder_id = Column(String(36), ForeignKey("teams.id"), nullable=True)  # Team with highest bid
     total_revenue = Column(Integer, nullable=False, default=0)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Optimistic concurrency token
+    last_event_seq = Column(BigInteger, nullable=False, default=0, server_default="0")  # Last auction_events.seq
     
     # Relationships
     bids = relationship(
@@ -45,3 +47,6 @@ class Auction(BaseModel):
             name="ck_auction_status",
         ),
     )
+    
+    # ORM updates become UPDATE ... WHERE id = ? AND version = ? and bump the version
+    __mapper_args__ = {"version_id_col": version}
@@ -0,0 +1,21 @@
+"""AuctionEvent model - append-only log of auction state changes."""
+
+from sqlalchemy import Column, String, BigInteger, Text, ForeignKey
+
+from app.models.base import BaseModel
+
+
+class AuctionEvent(BaseModel):
+    """
+    One state change of an auction (bid placed, player sold, paused, ...).
+    `seq` is gapless and strictly increasing per auction; it is taken from
+    `auctions.last_event_seq` in the same transaction as the change, so the
+    log replays the auction's history in commit order. Rows are never updated.
+    """
+    
+    __tablename__ = "auction_events"
+    
+    auction_id = Column(String(36), ForeignKey("auctions.id"), primary_key=True)
+    seq = Column(BigInteger, primary_key=True)
+    type = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON message as broadcast to clients
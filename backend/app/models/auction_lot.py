@@ -0,0 +1,24 @@
+"""AuctionLot model - ordered lot catalog of an auction."""
+
+from sqlalchemy import Column, String, Integer, ForeignKey, UniqueConstraint
+
+from app.models.base import BaseModel
+
+
+class AuctionLot(BaseModel):
+    """
+    One player in an auction's running order.
+    Lots are played by ascending position; `pool` groups consecutive lots
+    into sets such as role-based rounds ("Marquee", "Batsmen I", ...).
+    """
+    
+    __tablename__ = "auction_lots"
+    
+    auction_id = Column(String(36), ForeignKey("auctions.id"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    player_id = Column(String(36), ForeignKey("players.id"), nullable=False)
+    pool = Column(String(100), nullable=True)
+    
+    __table_args__ = (
+        UniqueConstraint("auction_id", "player_id", name="uq_lot_auction_player"),
+    )
@@ -0,0 +1,27 @@
+"""IdempotencyKey model - stored results of requests sent with an Idempotency-Key."""
+
+from sqlalchemy import Column, String, Integer, Text, DateTime, Index
+
+from app.models.base import BaseModel
+
+
+class IdempotencyKey(BaseModel):
+    """
+    Result of a request made with an `Idempotency-Key` header.
+    Keys are scoped per user; a retry with the same key and the same request
+    gets the stored response instead of running the request again. Rows past
+    `expires_at` are purged periodically.
+    """
+    
+    __tablename__ = "idempotency_keys"
+    
+    user_id = Column(String(36), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)  # sha256 of the request it answered
+    status_code = Column(Integer, nullable=False)
+    response = Column(Text, nullable=False)  # JSON body
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    
+    __table_args__ = (
+        Index("idx_idempotency_expires", "expires_at"),
+    )
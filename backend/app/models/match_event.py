@@ -1,6 +1,6 @@
 """MatchEvent model - event-sourced match scoring."""
 
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, func, Index, CheckConstraint
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, func, Index, CheckConstraint, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.models.base import BaseModel
@@ -37,6 +37,7 @@ class MatchEvent(BaseModel):
     
     __table_args__ = (
         Index("idx_event_match_sequence", "match_id", "sequence_number"),
+        UniqueConstraint("match_id", "sequence_number", name="uq_match_sequence"),
         Index("idx_event_type", "event_type"),
         CheckConstraint(
             f"event_type IN ('{EventTypeEnum.MATCH_STARTED.value}', '{EventTypeEnum.INNINGS_STARTED.value}', '{EventTypeEnum.RUN_SCORED.value}', '{EventTypeEnum.WICKET.value}', '{EventTypeEnum.OVER_COMPLETED.value}', '{EventTypeEnum.INNINGS_ENDED.value}', '{EventTypeEnum.MATCH_ENDED.value}')",
@@ -0,0 +1,20 @@
+"""MatchSnapshot model - periodic scoreboard checkpoints of a match."""
+
+from sqlalchemy import Column, String, BigInteger, Text, ForeignKey
+
+from app.models.base import BaseModel
+
+
+class MatchSnapshot(BaseModel):
+    """
+    The scoreboard of a match as of event `sequence_number`, written in the
+    same transaction as that event every MATCH_SNAPSHOT_INTERVAL events.
+    Loading a match starts from its latest snapshot and replays only the
+    events after it. Derived data: events remain the source of truth.
+    """
+    
+    __tablename__ = "match_snapshots"
+    
+    match_id = Column(String(36), ForeignKey("matches.id"), primary_key=True)
+    sequence_number = Column(BigInteger, primary_key=True)
+    state = Column(Text, nullable=False)  # JSON scoreboard, as returned by GET /matches/{id}/scoreboard
@@ -0,0 +1,23 @@
+"""ProxyBid model - a team's standing maximum bid on a player."""
+
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Boolean, func
+
+from app.models.base import BaseModel
+
+
+class ProxyBid(BaseModel):
+    """
+    Ceiling a team manager registered for a player in an auction.
+    The server bids on the team's behalf up to `max_amount` while the player
+    is the current lot. Deactivated once another team goes above the ceiling.
+    """
+    
+    __tablename__ = "proxy_bids"
+    
+    auction_id = Column(String(36), ForeignKey("auctions.id"), primary_key=True)
+    player_id = Column(String(36), ForeignKey("players.id"), primary_key=True)
+    team_id = Column(String(36), ForeignKey("teams.id"), primary_key=True)
+    max_amount = Column(Integer, nullable=False)  # in smallest currency unit
+    is_active = Column(Boolean, nullable=False, default=True)
+    # Equal ceilings go to the team that set theirs first
+    registered_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
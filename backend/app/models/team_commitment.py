@@ -0,0 +1,24 @@
+"""TeamCommitment model - ledger of pending winning bids per auction."""
+
+from sqlalchemy import Column, String, Integer, ForeignKey, Index
+
+from app.models.base import BaseModel
+
+
+class TeamCommitment(BaseModel):
+    """
+    Pending commitment of a team on an unresolved lot.
+    One row per auction holding the current winning bid; the row is removed
+    when the lot is sold, unsold, cancelled or the auction ends. The budget
+    check sums a team's rows instead of aggregating the bids table.
+    """
+    
+    __tablename__ = "team_commitments"
+    
+    auction_id = Column(String(36), ForeignKey("auctions.id"), primary_key=True)
+    team_id = Column(String(36), ForeignKey("teams.id"), nullable=False)
+    amount = Column(Integer, nullable=False)  # in smallest currency unit
+    
+    __table_args__ = (
+        Index("idx_commitment_team", "team_id"),
+    )
@@ -5,6 +5,8 @@ from datetime import datetime
 
 from pydantic import BaseModel
 
+from app.models.enums import RoleEnum
+
 
 class RegistrationTokenCreate(BaseModel):
     expires_minutes: Optional[int] = 1440  # default 1 day
@@ -21,3 +23,8 @@ class RegistrationTokenRead(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class UserAdminUpdate(BaseModel):
+    role: Optional[RoleEnum] = None
+    is_active: Optional[bool] = None
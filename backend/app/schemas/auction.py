@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -55,3 +55,72 @@ class BidRead(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class ProxyBidCreate(BaseModel):
+    team_id: UUID
+    max_amount: int = Field(..., gt=0)
+    player_id: Optional[UUID] = None  # defaults to the auction's current player
+
+
+class ProxyBidRead(BaseModel):
+    auction_id: UUID
+    player_id: UUID
+    team_id: UUID
+    max_amount: int
+    is_active: bool
+    registered_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class LotPlayerCard(BaseModel):
+    """Public player card pushed to the auction room ahead of a lot."""
+
+    id: UUID
+    name: str
+    role: str
+    nationality: Optional[str]
+    batting_style: Optional[str]
+    bowling_style: Optional[str]
+    matches_played: Optional[int]
+    runs_scored: Optional[int]
+    wickets_taken: Optional[int]
+    strike_rate: Optional[float]
+    economy_rate: Optional[float]
+    base_price: int
+    profile_photo_url: Optional[str]
+    status: str
+
+    class Config:
+        orm_mode = True
+        from_attributes = True
+
+
+class AuctionLiveRead(AuctionRead):
+    """Auction with its current lot, served from the in-memory snapshot."""
+
+    current_player: Optional[LotPlayerCard] = None
+    last_seq: int
+
+
+class AuctionLotCreate(BaseModel):
+    player_id: UUID
+    pool: Optional[constr(max_length=100)] = None
+
+
+class AuctionLotsUpdate(BaseModel):
+    lots: List[AuctionLotCreate] = Field(..., min_length=1)
+
+
+class AuctionLotRead(BaseModel):
+    position: int
+    pool: Optional[str]
+    player: LotPlayerCard
+
+
+class AuctionEventsRead(BaseModel):
+    auction_id: UUID
+    last_seq: int
+    events: List[Dict[str, Any]]  # same messages as broadcast on the auction's WebSocket room
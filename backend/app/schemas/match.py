@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -36,8 +36,23 @@ class MatchRead(BaseModel):
 
 
 class MatchEventCreate(BaseModel):
+    """One scoring event. `event_data` is a JSON object:
+
+    - innings_started: {"batting_team_id": ...}
+    - run_scored: {"runs": 4, "extras": 0, "extra_type": null|"wide"|"no_ball"|"bye"|"leg_bye",
+      "batter_id": ..., "bowler_id": ...}; `runs` are run by the batters
+      (byes and leg byes when `extra_type` says so), `extras` the penalty runs
+    - wicket: same fields plus "kind" ("bowled", "caught", "run_out", ...)
+    - match_ended: {"winner_team_id": ...} (omit for a tie or no result)
+    - match_started, over_completed, innings_ended: nothing required
+
+    With `expected_sequence_number` the event is only appended as that
+    number (409 otherwise), so a scorer's retry cannot record a ball twice.
+    """
+
     event_type: constr(pattern=r"^(match_started|innings_started|run_scored|wicket|over_completed|innings_ended|match_ended)$")
     event_data: Optional[str] = Field(None, max_length=2000)
+    expected_sequence_number: Optional[int] = Field(None, ge=1)
 
 
 class MatchEventRead(BaseModel):
@@ -51,3 +66,45 @@ class MatchEventRead(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class BattingFiguresRead(BaseModel):
+    player_id: str
+    runs: int
+    balls: int
+    fours: int
+    sixes: int
+    out: Optional[str]  # how the batter was dismissed, None if not out
+
+
+class BowlingFiguresRead(BaseModel):
+    player_id: str
+    balls: int  # legal deliveries
+    runs: int
+    wickets: int
+
+
+class InningsScoreRead(BaseModel):
+    number: int
+    batting_team_id: UUID
+    runs: int
+    wickets: int
+    balls: int  # legal deliveries
+    overs: str  # "overs.balls", e.g. "12.3"
+    extras: int
+    closed: bool
+    batting: List[BattingFiguresRead] = []
+    bowling: List[BowlingFiguresRead] = []
+
+
+class MatchScoreboardRead(BaseModel):
+    match_id: UUID
+    status: str
+    team_1_id: UUID
+    team_2_id: UUID
+    team_1_score: int
+    team_2_score: int
+    innings: List[InningsScoreRead]
+    this_over: List[str]  # deliveries of the over in progress, e.g. ["1", "4", "W", "1wd"]
+    winner_team_id: Optional[UUID]
+    last_seq: int
@@ -0,0 +1,324 @@
+"""In-memory auction engine with write-behind persistence.
+
+Used when ``BID_MODE=engine``. The engine holds the live state of each
+auction that has received a bid (status, current player and base price,
+current bid and bidder) and the purse of every team that has bid, so
+`auction_service.place_bid` can validate and accept bids without touching
+Postgres. Accepted bids and their `bid_placed` events are persisted by a
+background writer in ordered per-auction batches; event sequence numbers
+are assigned in memory on acceptance and written with the batch.
+
+State is rebuilt lazily from the `auctions`, `players`, `teams` and `bids`
+tables on first use, so a restarted worker picks up where the database
+left off. The engine is authoritative for a single process only: run one
+worker (or pin each auction to one worker) when this mode is enabled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import select, update, insert
+
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal
+from app.db.transactions import run_transaction, note_lock
+from app.models import Auction, AuctionEvent, Bid, Team, Player, TeamCommitment
+from app.services.commitment_ledger import record_commitment
+from app.services.event_log import AuctionEventEntry, bid_event_payload, next_event
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class TeamPurse:
+    """Budget view of a team: spent budget plus its commitment ledger rows."""
+
+    team_id: str
+    manager_id: Optional[str]
+    budget_spent: int
+    commitments: Dict[str, int] = field(default_factory=dict)  # auction_id -> winning amount
+
+    def pending_excluding(self, auction_id: str) -> int:
+        return sum(amount for key, amount in self.commitments.items() if key != auction_id)
+
+
+@dataclass
+class LiveAuction:
+    """Authoritative in-memory state of one auction."""
+
+    auction_id: str
+    status: str
+    current_player_id: Optional[str]
+    base_price: Optional[int]
+    current_bid: Optional[int]
+    current_bidder_id: Optional[str]
+    last_event_seq: int = 0
+    pending: List[Bid] = field(default_factory=list)  # accepted, not yet persisted
+    pending_events: List[AuctionEventEntry] = field(default_factory=list)
+    flush_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class AuctionEngine:
+    """Holds live auctions and team purses and persists accepted bids."""
+
+    def __init__(self, flush_interval_ms: int = 20):
+        self.flush_interval = flush_interval_ms / 1000
+        self.auctions: Dict[str, LiveAuction] = {}
+        self.teams: Dict[str, TeamPurse] = {}
+        self._load_lock = asyncio.Lock()
+        self._gates: Dict[str, asyncio.Lock] = {}
+        self._epoch = 0  # bumped by every transition; loads spanning one are discarded
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+    # ---------------------------------------------------------------- state
+
+    async def load(self, auction_id: str, team_id: str) -> Tuple[Optional[LiveAuction], Optional[TeamPurse]]:
+        """Return a consistent (auction, purse) pair for validating a bid.
+
+        Retries if a transition started or the cached objects were replaced
+        while loading, so the caller never validates against dropped state.
+        """
+        while True:
+            gate = self._gates.get(auction_id)
+            if gate is not None and gate.locked():
+                async with gate:
+                    pass
+            epoch = self._epoch
+            live = await self.get_auction(auction_id)
+            purse = await self.get_team(team_id)
+            if live is None or purse is None:
+                return live, purse
+            gate = self._gates.get(auction_id)
+            fenced = gate is not None and gate.locked()
+            if (
+                not fenced
+                and self._epoch == epoch
+                and self.auctions.get(auction_id) is live
+                and self.teams.get(team_id) is purse
+            ):
+                return live, purse
+
+    async def get_auction(self, auction_id: str) -> Optional[LiveAuction]:
+        """Return live state for an auction, loading it from the database on a miss."""
+        live = self.auctions.get(auction_id)
+        if live is not None:
+            return live
+        async with self._load_lock:
+            live = self.auctions.get(auction_id)
+            if live is None:
+                epoch = self._epoch
+                live = await self._load_auction(auction_id)
+                if live is not None and self._epoch == epoch:
+                    self.auctions[auction_id] = live
+        return live
+
+    async def get_team(self, team_id: str) -> Optional[TeamPurse]:
+        """Return the purse for a team, loading it from the database on a miss."""
+        purse = self.teams.get(team_id)
+        if purse is not None:
+            return purse
+        async with self._load_lock:
+            purse = self.teams.get(team_id)
+            if purse is None:
+                epoch = self._epoch
+                purse = await self._load_team(team_id)
+                if purse is not None and self._epoch == epoch:
+                    self.teams[team_id] = purse
+        return purse
+
+    def accept(self, live: LiveAuction, purse: TeamPurse, amount: int) -> Tuple[Bid, AuctionEventEntry]:
+        """Apply an already validated bid to the live state and queue it for persistence.
+
+        Must be called without awaiting between validation and this call so the
+        check-and-set stays atomic on the event loop.
+        """
+        previous_bidder = live.current_bidder_id
+        if previous_bidder and previous_bidder in self.teams:
+            self.teams[previous_bidder].commitments.pop(live.auction_id, None)
+        purse.commitments[live.auction_id] = amount
+
+        bid = Bid(
+            id=str(uuid4()),
+            auction_id=live.auction_id,
+            player_id=live.current_player_id,
+            team_id=purse.team_id,
+            amount=amount,
+            is_winning=True,
+            bid_timestamp=datetime.utcnow(),
+        )
+        event = next_event(live.auction_id, live.last_event_seq, "bid_placed", bid_event_payload(purse.team_id, amount))
+        live.current_bid = amount
+        live.current_bidder_id = purse.team_id
+        live.last_event_seq = event.seq
+        live.pending.append(bid)
+        live.pending_events.append(event)
+        self._wakeup.set()
+        return bid, event
+
+    @asynccontextmanager
+    async def transition(self, auction_id: str):
+        """Fence in-memory bids while a transition runs against the database.
+
+        Pending bids are flushed first so the transition sees them, bids that
+        arrive meanwhile wait on the gate, and cached state is dropped on exit
+        so the next bid reloads it. Team purses are dropped as well since
+        sold/unsold/cancel change budgets and commitments.
+        """
+        gate = self._gates.setdefault(auction_id, asyncio.Lock())
+        async with gate:
+            self._epoch += 1
+            await self.flush(auction_id)
+            try:
+                yield
+            finally:
+                self._epoch += 1
+                live = self.auctions.get(auction_id)
+                if live is None or not live.pending:
+                    self.auctions.pop(auction_id, None)
+                self.teams.clear()
+
+    async def _load_auction(self, auction_id: str) -> Optional[LiveAuction]:
+        async with AsyncSessionLocal() as session:
+            res = await session.execute(select(Auction).where(Auction.id == auction_id))
+            auction = res.scalars().first()
+            if not auction:
+                return None
+            base_price = None
+            if auction.current_player_id:
+                res = await session.execute(select(Player.base_price).where(Player.id == auction.current_player_id))
+                base_price = res.scalar()
+            return LiveAuction(
+                auction_id=auction.id,
+                status=auction.status,
+                current_player_id=auction.current_player_id,
+                base_price=base_price,
+                current_bid=auction.current_bid,
+                current_bidder_id=auction.current_bidder_id,
+                last_event_seq=auction.last_event_seq or 0,
+            )
+
+    async def _load_team(self, team_id: str) -> Optional[TeamPurse]:
+        async with AsyncSessionLocal() as session:
+            res = await session.execute(select(Team).where(Team.id == team_id))
+            team = res.scalars().first()
+            if not team:
+                return None
+            res = await session.execute(
+                select(TeamCommitment.auction_id, TeamCommitment.amount).where(TeamCommitment.team_id == team_id)
+            )
+            commitments = {auction_id: amount for auction_id, amount in res.all()}
+        # Unflushed bids are newer than what the database holds
+        for live in self.auctions.values():
+            if live.pending:
+                commitments.pop(live.auction_id, None)
+                if live.current_bidder_id == team_id:
+                    commitments[live.auction_id] = live.current_bid
+        return TeamPurse(
+            team_id=team.id,
+            manager_id=team.manager_id,
+            budget_spent=team.budget_spent or 0,
+            commitments=commitments,
+        )
+
+    # ----------------------------------------------------------- persistence
+
+    async def start(self) -> None:
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run_writer())
+
+    async def stop(self) -> None:
+        """Stop the writer and persist everything still pending."""
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        await self.flush_all()
+
+    async def flush(self, auction_id: str) -> None:
+        """Persist pending bids for one auction. Raises if the write fails."""
+        live = self.auctions.get(auction_id)
+        if live is None:
+            return
+        async with live.flush_lock:
+            if not live.pending:
+                return
+            batch, events = live.pending, live.pending_events
+            live.pending, live.pending_events = [], []
+            try:
+                await self._persist(live.auction_id, batch, events)
+            except Exception:
+                # Keep the batch at the head so ordering is preserved on retry
+                live.pending[:0] = batch
+                live.pending_events[:0] = events
+                raise
+
+    async def flush_all(self) -> None:
+        for auction_id in list(self.auctions):
+            try:
+                await self.flush(auction_id)
+            except Exception as exc:
+                logger.error("Failed to persist bids for auction %s: %s", auction_id, exc, exc_info=exc)
+
+    async def _run_writer(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await self.flush_all()
+            await asyncio.sleep(self.flush_interval)
+
+    async def _persist(self, auction_id: str, batch: List[Bid], events: List[AuctionEventEntry]) -> None:
+        last = batch[-1]
+        rows = [
+            {
+                "id": bid.id,
+                "auction_id": bid.auction_id,
+                "player_id": bid.player_id,
+                "team_id": bid.team_id,
+                "amount": bid.amount,
+                "is_winning": bid is last,
+                "bid_timestamp": bid.bid_timestamp,
+            }
+            for bid in batch
+        ]
+
+        async def unit():
+            # Auction row first, then bids: the canonical lock order
+            note_lock(session, Auction)
+            await session.execute(
+                update(Auction)
+                .where(Auction.id == auction_id)
+                .values(
+                    current_bid=last.amount,
+                    current_bidder_id=last.team_id,
+                    last_event_seq=events[-1].seq,
+                    version=Auction.version + 1,
+                )
+            )
+            note_lock(session, Bid)
+            await session.execute(
+                update(Bid)
+                .where(Bid.auction_id == auction_id, Bid.is_winning == True)
+                .values(is_winning=False)
+            )
+            await session.execute(insert(Bid), rows)
+            await session.execute(insert(AuctionEvent), [event.row() for event in events])
+            await record_commitment(session, auction_id, last.team_id, last.amount)
+
+        async with AsyncSessionLocal() as session:
+            await run_transaction(session, unit, "engine_flush")
+
+
+# Global engine instance
+auction_engine = AuctionEngine(flush_interval_ms=settings.engine_flush_interval_ms)
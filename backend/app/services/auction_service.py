@@ -1,17 +1,44 @@
 from __future__ import annotations
 
-from typing import Optional
+import json
+from typing import List, Optional, Tuple
 from uuid import uuid4
 from datetime import datetime
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fastapi import HTTPException, status
 
 from app.models import Auction, Bid, Team, Player
 from app.models.enums import AuctionStatusEnum, PlayerStatusEnum
-from app.websocket.manager import manager
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.db.transactions import run_transaction, lock_row, lock_rows, note_lock
+from app.services.auction_engine import auction_engine
+from app.services.bid_pipeline import BidPipeline, BidRequest
+from app.services.commitment_ledger import record_commitment, release_commitment, pending_commitments
+from app.services.event_dispatcher import event_dispatcher
+from app.services.event_log import AuctionEventEntry, append_event, bid_event_payload, next_event
+
+settings = get_settings()
+
+bid_latency = metrics.histogram(
+    "bid_latency_seconds",
+    "Time to accept or reject a bid, by the transport it arrived on",
+    ("transport", "outcome"),
+)
+
+BID_MODE_LOCKING = "locking"
+BID_MODE_ENGINE = "engine"
+BID_MODE_GROUP_COMMIT = "group_commit"
+BID_MODE_SINGLE_STATEMENT = "single_statement"
+
+# "pessimistic": SELECT ... FOR UPDATE on the auction row
+# "optimistic": unlocked read, compare-and-swap on Auction.version at commit
+CONCURRENCY_PESSIMISTIC = "pessimistic"
+CONCURRENCY_OPTIMISTIC = "optimistic"
 
 # IPL Style Budget Limit: 100 Crores
 BUDGET_LIMIT = 1000000000  # 100,00,00,000
@@ -28,45 +55,76 @@ async def create_auction(session: AsyncSession, name: str, description: Optional
         current_bidder_id=None,
         total_revenue=0,
     )
-    session.add(auction)
-    await session.commit()
+
+    async def unit():
+        session.add(auction)
+
+    await run_transaction(session, unit, "create_auction")
     await session.refresh(auction)
     return auction
 
 
+async def _publish(event: AuctionEventEntry) -> None:
+    """Hand a committed event to the dispatcher for the event log and the auction's WebSocket room."""
+    await event_dispatcher.dispatch(event)
+
+
+def _optimistic() -> bool:
+    return settings.auction_concurrency == CONCURRENCY_OPTIMISTIC
+
+
+async def _get_auction(session: AsyncSession, auction_id: str) -> Auction:
+    """Load the auction for a state change, raising 404 if missing.
+
+    Pessimistic mode locks the row. Optimistic mode reads it unlocked and relies
+    on the version check SQLAlchemy adds to the UPDATE (`version_id_col`).
+    """
+    auction = await lock_row(session, Auction, Auction.id == auction_id, lock=not _optimistic())
+    if not auction:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
+    return auction
+
+
 async def start_auction(session: AsyncSession, auction_id: str) -> Auction:
-    async with session.begin():
-        stmt = select(Auction).where(Auction.id == auction_id).with_for_update()
-        res = await session.execute(stmt)
-        auction = res.scalars().first()
-        if not auction:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
+    async def unit():
+        auction = await _get_auction(session, auction_id)
         if auction.status == AuctionStatusEnum.ONGOING.value:
-            return auction
+            return auction, None
         auction.status = AuctionStatusEnum.ONGOING.value
         auction.started_at = datetime.utcnow()
         session.add(auction)
+
+        # Restore the commitment of an unresolved lot (released when the auction ended)
+        if auction.current_bidder_id and auction.current_bid is not None:
+            res = await session.execute(select(Player.status).where(Player.id == auction.current_player_id))
+            if res.scalar() != PlayerStatusEnum.SOLD.value:
+                await record_commitment(session, auction_id, auction.current_bidder_id, auction.current_bid)
+
+        event = await append_event(session, auction, "auction_started", {
+            "status": auction.status,
+            "current_player_id": auction.current_player_id,
+            "current_bid": auction.current_bid,
+            "current_bidder_id": auction.current_bidder_id,
+            "started_at": auction.started_at.isoformat(),
+            "timestamp": datetime.utcnow().isoformat(),
+        })
+        return auction, event
+
+    async with auction_engine.transition(auction_id):
+        auction, event = await run_transaction(session, unit, "start_auction")
+    if event is None:
+        return auction
     await session.refresh(auction)
 
     # Broadcast after successful commit
-    payload = {
-        "type": "auction_started",
-        "auction_id": auction.id,
-        "status": auction.status,
-        "timestamp": datetime.utcnow().isoformat(),
-    }
-    await manager.broadcast_to_room(f"auction:{auction_id}", payload)
+    await _publish(event)
 
     return auction
 
 
 async def update_current_player(session: AsyncSession, auction_id: str, player_id: str) -> Auction:
-    async with session.begin():
-        stmt = select(Auction).where(Auction.id == auction_id).with_for_update()
-        res = await session.execute(stmt)
-        auction = res.scalars().first()
-        if not auction:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
+    async def unit():
+        auction = await _get_auction(session, auction_id)
 
         # Verify player exists
         stmt = select(Player).where(Player.id == player_id)
@@ -79,101 +137,129 @@ async def update_current_player(session: AsyncSession, auction_id: str, player_i
         auction.current_bid = None
         auction.current_bidder_id = None
         session.add(auction)
-
+        await release_commitment(session, auction_id)
+        event = await append_event(session, auction, "player_updated", {
+            "current_player_id": player_id,
+            "status": auction.status,
+            "timestamp": datetime.utcnow().isoformat(),
+        })
+        return auction, event
+
+    async with auction_engine.transition(auction_id):
+        auction, event = await run_transaction(session, unit, "update_current_player")
     await session.refresh(auction)
 
     # Broadcast
-    payload = {
-        "type": "player_updated",
-        "auction_id": auction.id,
-        "current_player_id": player_id,
-        "timestamp": datetime.utcnow().isoformat(),
-    }
-    await manager.broadcast_to_room(f"auction:{auction_id}", payload)
+    await _publish(event)
     return auction
 
 
-async def mark_player_unsold(session: AsyncSession, auction_id: str) -> Auction:
-    async with session.begin():
-        stmt = select(Auction).where(Auction.id == auction_id).with_for_update()
-        res = await session.execute(stmt)
-        auction = res.scalars().first()
-        if not auction:
-             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
+def _ensure_lot_open(
+    auction: Auction, player: Optional[Player], expected_player_id: Optional[str], unsold: bool = False
+) -> None:
+    """Automatic resolution only applies to the ongoing lot it was scheduled for.
+
+    With `unsold`, a lot that has a bid by now is not open to being passed in either.
+    """
+    if expected_player_id is None:
+        return
+    if (
+        auction.status != AuctionStatusEnum.ONGOING.value
+        or auction.current_player_id != expected_player_id
+        or player is None
+        or player.status != PlayerStatusEnum.AVAILABLE.value
+    ):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Lot was already resolved or changed")
+    if unsold and auction.current_bid is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Lot has a bid")
+
+
+async def mark_player_unsold(session: AsyncSession, auction_id: str, expected_player_id: Optional[str] = None) -> Auction:
+    """Marks the current player as UNSOLD.
+
+    With `expected_player_id` (the lot timer) the lot is only resolved if the
+    auction is still ongoing on that player and it is still available.
+    """
+    async def unit():
+        auction = await _get_auction(session, auction_id)
 
         if not auction.current_player_id:
              raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No active player")
 
         # Mark player Unsold
-        stmt = select(Player).where(Player.id == auction.current_player_id).with_for_update()
-        res = await session.execute(stmt)
-        player = res.scalars().first()
-
-        if player:
-            player.status = PlayerStatusEnum.UNSOLD.value
-            session.add(player)
-
-        auction.current_bid = None
-        auction.current_bidder_id = None
-        session.add(auction)
+        player = await lock_row(session, Player, Player.id == auction.current_player_id)
+        _ensure_lot_open(auction, player, expected_player_id, unsold=True)
+        event = await _unsell_current_lot(session, auction, player)
+        return auction, event
 
+    async with auction_engine.transition(auction_id):
+        auction, event = await run_transaction(session, unit, "mark_player_unsold")
     await session.refresh(auction)
 
     # Broadcast
-    payload = {
-        "type": "player_unsold",
-        "auction_id": auction.id,
-        "player_id": auction.current_player_id,
-        "timestamp": datetime.utcnow().isoformat(),
-    }
-    await manager.broadcast_to_room(f"auction:{auction_id}", payload)
+    await _publish(event)
 
     return auction
 
 
+async def _unsell_current_lot(session: AsyncSession, auction: Auction, player: Optional[Player]) -> AuctionEventEntry:
+    """Mark the (locked) current player unsold inside the caller's transaction."""
+    if player:
+        player.status = PlayerStatusEnum.UNSOLD.value
+        session.add(player)
+
+    auction.current_bid = None
+    auction.current_bidder_id = None
+    session.add(auction)
+    await release_commitment(session, auction.id)
+    return await append_event(session, auction, "player_unsold", {
+        "player_id": auction.current_player_id,
+        "timestamp": datetime.utcnow().isoformat(),
+    })
+
+
 async def pause_auction(session: AsyncSession, auction_id: str) -> Auction:
-    async with session.begin():
-        stmt = select(Auction).where(Auction.id == auction_id).with_for_update()
-        res = await session.execute(stmt)
-        auction = res.scalars().first()
-        if not auction:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
+    async def unit():
+        auction = await _get_auction(session, auction_id)
         auction.status = AuctionStatusEnum.PAUSED.value
         session.add(auction)
+        event = await append_event(session, auction, "auction_paused", {
+            "status": auction.status,
+            "timestamp": datetime.utcnow().isoformat(),
+        })
+        return auction, event
+
+    async with auction_engine.transition(auction_id):
+        auction, event = await run_transaction(session, unit, "pause_auction")
     await session.refresh(auction)
 
     # Broadcast after successful commit
-    payload = {
-        "type": "auction_paused",
-        "auction_id": auction.id,
-        "status": auction.status,
-        "timestamp": datetime.utcnow().isoformat(),
-    }
-    await manager.broadcast_to_room(f"auction:{auction_id}", payload)
+    await _publish(event)
 
     return auction
 
 
-async def _sum_pending_bids_other_auctions(session: AsyncSession, team_id: str, exclude_auction_id: str) -> int:
-    """Sum winning bids on other ongoing/paused auctions.
-    
-    Pending budget = SUM(Bid.amount) WHERE:
-    - Bid.is_winning = true
-    - Auction.status IN ('ongoing', 'paused')
-    - Auction.id != exclude_auction_id
-    """
-    stmt = (
-        select(func.coalesce(func.sum(Bid.amount), 0))
-        .join(Auction, Bid.auction_id == Auction.id)
-        .where(
-            Bid.team_id == team_id,
-            Bid.is_winning == True,
-            Auction.status.in_([AuctionStatusEnum.ONGOING.value, AuctionStatusEnum.PAUSED.value]),
-            Auction.id != exclude_auction_id,
-        )
-    )
-    res = await session.execute(stmt)
-    return int(res.scalar() or 0)
+def _validate_bid_amount(status_value: str, current_bid: Optional[int], base_price: Optional[int], amount: int, min_increment: int) -> None:
+    if status_value != AuctionStatusEnum.ONGOING.value:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Auction is not active")
+    if current_bid is None:
+        if base_price is not None and amount < base_price:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Bid must be at least base price {base_price}")
+    elif amount < current_bid + min_increment:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Bid increment too small")
+
+
+def _validate_ownership(manager_id: Optional[str], current_user) -> None:
+    # Ownership check: team_manager can only bid for their own team
+    if current_user and getattr(current_user, "role", "") == "team_manager":
+        if manager_id != getattr(current_user, "id", None):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not manager of the team")
+
+
+def _validate_budget(budget_spent: int, pending_other: int, amount: int) -> None:
+    total_committed = budget_spent + pending_other + amount
+    if total_committed > BUDGET_LIMIT:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient budget. Limit: {BUDGET_LIMIT}, Required: {total_committed}")
 
 
 async def place_bid(
@@ -184,62 +270,70 @@ async def place_bid(
     min_increment: int,
     current_user=None,
 ) -> Bid:
-    """Place a bid atomically following the rules in the service contract.
+    """Place a bid following the rules in the service contract.
 
-    Performs SELECT ... FOR UPDATE on auction and team, validates budget,
-    toggles previous winning bid, inserts new bid, updates auction current bid.
+    The bid path is selected by the BID_MODE setting; every path enforces the
+    same rules and broadcasts `bid_placed` once the bid is accepted.
     """
     if amount <= 0:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Amount must be positive")
 
-    async with session.begin():
+    if settings.bid_mode == BID_MODE_ENGINE:
+        bid, event = await _place_bid_in_memory(auction_id, team_id, amount, min_increment, current_user)
+    elif settings.bid_mode == BID_MODE_GROUP_COMMIT:
+        bid, event = await bid_pipeline.submit(auction_id, team_id, amount, min_increment, current_user)
+    elif settings.bid_mode == BID_MODE_SINGLE_STATEMENT:
+        bid, event = await _place_bid_single_statement(session, auction_id, team_id, amount, min_increment, current_user)
+    else:
+        bid, event = await _place_bid_locking(session, auction_id, team_id, amount, min_increment, current_user)
+
+    # Broadcast after the bid is accepted
+    await _publish(event)
+
+    return bid
+
+
+async def _place_bid_locking(
+    session: AsyncSession,
+    auction_id: str,
+    team_id: str,
+    amount: int,
+    min_increment: int,
+    current_user=None,
+) -> Tuple[Bid, AuctionEventEntry]:
+    """Performs SELECT ... FOR UPDATE on auction and team, validates budget,
+    toggles previous winning bid, inserts new bid, updates auction current bid.
+
+    In optimistic mode the auction row is read unlocked and the bid is retried
+    if another writer bumped its version first.
+    """
+    async def unit():
         # Lock auction
-        stmt = select(Auction).where(Auction.id == auction_id).with_for_update()
-        res = await session.execute(stmt)
-        auction = res.scalars().first()
-        if not auction:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
-        if auction.status != AuctionStatusEnum.ONGOING.value:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Auction is not active")
-
-        current_high = auction.current_bid or 0
-
-        # Check if first bid
-        if auction.current_bid is None:
-             if auction.current_player_id:
-                stmt = select(Player).where(Player.id == auction.current_player_id)
-                p_res = await session.execute(stmt)
-                player = p_res.scalars().first()
-                if player and amount < player.base_price:
-                     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Bid must be at least base price {player.base_price}")
-        elif amount < current_high + min_increment:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Bid increment too small")
+        auction = await _get_auction(session, auction_id)
+
+        # Base price only matters for the first bid
+        base_price = None
+        if auction.current_bid is None and auction.current_player_id:
+            stmt = select(Player).where(Player.id == auction.current_player_id)
+            p_res = await session.execute(stmt)
+            player = p_res.scalars().first()
+            if player:
+                base_price = player.base_price
+        _validate_bid_amount(auction.status, auction.current_bid, base_price, amount, min_increment)
 
         # Lock team
-        stmt = select(Team).where(Team.id == team_id).with_for_update()
-        res = await session.execute(stmt)
-        team = res.scalars().first()
+        team = await lock_row(session, Team, Team.id == team_id)
         if not team:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
 
-        # Ownership check: team_manager can only bid for their own team
-        if current_user and getattr(current_user, "role", "") == "team_manager":
-            if team.manager_id != getattr(current_user, "id", None):
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not manager of the team")
+        _validate_ownership(team.manager_id, current_user)
 
         # Budget enforcement
-        budget_spent = team.budget_spent or 0
-        pending_other = await _sum_pending_bids_other_auctions(session, team_id, auction_id)
-
-        total_committed = budget_spent + pending_other + amount
-        if total_committed > BUDGET_LIMIT:
-             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient budget. Limit: {BUDGET_LIMIT}, Required: {total_committed}")
+        pending_other = await pending_commitments(session, team_id, auction_id)
+        _validate_budget(team.budget_spent or 0, pending_other, amount)
 
         # Unset previous winning bid for this auction
-        stmt = select(Bid).where(Bid.auction_id == auction_id, Bid.is_winning == True).with_for_update()
-        res = await session.execute(stmt)
-        prev_bid = res.scalars().first()
-        if prev_bid:
+        for prev_bid in await lock_rows(session, Bid, Bid.auction_id == auction_id, Bid.is_winning == True):
             prev_bid.is_winning = False
             session.add(prev_bid)
 
@@ -258,135 +352,340 @@ async def place_bid(
         auction.current_bid = amount
         auction.current_bidder_id = team_id
         session.add(auction)
+        await record_commitment(session, auction_id, team_id, amount)
+        event = await append_event(session, auction, "bid_placed", bid_event_payload(team_id, amount))
+        return bid, event
 
+    bid, event = await run_transaction(session, unit, "place_bid")
     # transaction committed here
     await session.refresh(bid)
+    return bid, event
 
-    # Broadcast after successful commit
-    payload = {
-        "type": "bid_placed",
-        "auction_id": auction_id,
-        "current_bid": bid.amount,
-        "team_id": bid.team_id,
-        "timestamp": datetime.utcnow().isoformat(),
-    }
-    await manager.broadcast_to_room(f"auction:{auction_id}", payload)
 
-    return bid
+async def _place_bid_in_memory(
+    auction_id: str,
+    team_id: str,
+    amount: int,
+    min_increment: int,
+    current_user=None,
+) -> Tuple[Bid, AuctionEventEntry]:
+    """Validate and accept a bid against the in-memory engine state.
 
+    Everything after the load runs without awaiting, so validation and
+    acceptance are atomic with respect to other bids on this worker.
+    """
+    live, purse = await auction_engine.load(auction_id, team_id)
+    if not live:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
+    if not purse:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
+
+    _validate_bid_amount(live.status, live.current_bid, live.base_price, amount, min_increment)
+    _validate_ownership(purse.manager_id, current_user)
+    _validate_budget(purse.budget_spent, purse.pending_excluding(auction_id), amount)
+
+    return auction_engine.accept(live, purse, amount)
+
+
+_PLACE_BID_ATOMIC = text(
+    "SELECT * FROM place_bid_atomic("
+    ":auction_id, :team_id, :amount, :min_increment, :budget_limit, :manager_id, :bid_id, :event_payload)"
+)
+
+
+def _bid_rejection(row) -> HTTPException:
+    """Map a `place_bid_atomic` rejection to the error the locking path raises."""
+    code = row["result_code"]
+    if code == "auction_not_found":
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
+    if code == "auction_not_active":
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Auction is not active")
+    if code == "below_base_price":
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Bid must be at least base price {row['out_base_price']}")
+    if code == "increment_too_small":
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Bid increment too small")
+    if code == "team_not_found":
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
+    if code == "not_team_manager":
+        return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not manager of the team")
+    if code == "insufficient_budget":
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Insufficient budget. Limit: {BUDGET_LIMIT}, Required: {row['out_required']}")
+    return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Unexpected bid result {code}")
+
+
+async def _place_bid_single_statement(
+    session: AsyncSession,
+    auction_id: str,
+    team_id: str,
+    amount: int,
+    min_increment: int,
+    current_user=None,
+) -> Tuple[Bid, AuctionEventEntry]:
+    """Place a bid in one database round trip via the `place_bid_atomic` function."""
+    manager_id = None
+    if current_user and getattr(current_user, "role", "") == "team_manager":
+        manager_id = getattr(current_user, "id", None)
+
+    bid_id = str(uuid4())
+    # The function assigns the sequence number and stores the event with the bid
+    payload = {"type": "bid_placed", "auction_id": auction_id, **bid_event_payload(team_id, amount)}
+
+    async def unit():
+        # The function locks auction, then team, then bids: the canonical order
+        res = await session.execute(
+            _PLACE_BID_ATOMIC,
+            {
+                "auction_id": auction_id,
+                "team_id": team_id,
+                "amount": amount,
+                "min_increment": min_increment,
+                "budget_limit": BUDGET_LIMIT,
+                "manager_id": manager_id,
+                "bid_id": bid_id,
+                "event_payload": json.dumps(payload),
+            },
+        )
+        return res.mappings().one()
 
-async def finalize_sold_player(session: AsyncSession, auction_id: str) -> Auction:
-    """Marks the current player in the auction as SOLD to the highest bidder."""
-    async with session.begin():
-        stmt = select(Auction).where(Auction.id == auction_id).with_for_update()
-        res = await session.execute(stmt)
-        auction = res.scalars().first()
+    row = await run_transaction(session, unit, "place_bid_single_statement")
+
+    if row["result_code"] != "accepted":
+        raise _bid_rejection(row)
+
+    bid = Bid(
+        id=bid_id,
+        auction_id=auction_id,
+        player_id=row["out_player_id"],
+        team_id=team_id,
+        amount=amount,
+        is_winning=True,
+        bid_timestamp=row["out_bid_timestamp"],
+    )
+    event = AuctionEventEntry(auction_id, row["out_seq"], "bid_placed", payload)
+    return bid, event
+
+
+async def _resolve_bid_batch(auction_id: str, batch: List[BidRequest]) -> List[object]:
+    """Resolve queued bids for one auction in arrival order in a single transaction.
+
+    Locks the auction once and every bidding team once (in id order), applies
+    the same rules as the locking path to each bid against the running high
+    bid, then writes the accepted bids, their events and the final auction
+    state together. Returns a (Bid, event) pair or HTTPException per request.
+    """
+    async def unit():
+        auction = await lock_row(session, Auction, Auction.id == auction_id)
         if not auction:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
+            # One exception per waiter: each one raises (and so mutates) its own
+            return [HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found") for _ in batch]
+
+        base_price = None
+        if auction.current_bid is None and auction.current_player_id:
+            res = await session.execute(select(Player.base_price).where(Player.id == auction.current_player_id))
+            base_price = res.scalar()
+
+        team_ids = sorted({request.team_id for request in batch})
+        teams = {team.id: team for team in await lock_rows(session, Team, Team.id.in_(team_ids))}
+        pending_other = {
+            team_id: await pending_commitments(session, team_id, auction_id)
+            for team_id in teams
+        }
+
+        current_bid = auction.current_bid
+        now = datetime.utcnow()
+        accepted: List[Bid] = []
+        results: List[object] = []
+        for request in batch:
+            try:
+                _validate_bid_amount(auction.status, current_bid, base_price, request.amount, request.min_increment)
+                team = teams.get(request.team_id)
+                if not team:
+                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
+                _validate_ownership(team.manager_id, request.current_user)
+                _validate_budget(team.budget_spent or 0, pending_other[team.id], request.amount)
+            except HTTPException as exc:
+                results.append(exc)
+                continue
+
+            bid = Bid(
+                id=str(uuid4()),
+                auction_id=auction_id,
+                player_id=auction.current_player_id,
+                team_id=request.team_id,
+                amount=request.amount,
+                is_winning=False,
+                bid_timestamp=now,
+            )
+            event = await append_event(session, auction, "bid_placed", bid_event_payload(request.team_id, request.amount))
+            accepted.append(bid)
+            results.append((bid, event))
+            current_bid = request.amount
+
+        if accepted:
+            note_lock(session, Bid)
+            await session.execute(
+                update(Bid)
+                .where(Bid.auction_id == auction_id, Bid.is_winning == True)
+                .values(is_winning=False)
+            )
+            accepted[-1].is_winning = True
+            session.add_all(accepted)
+            auction.current_bid = accepted[-1].amount
+            auction.current_bidder_id = accepted[-1].team_id
+            session.add(auction)
+            await record_commitment(session, auction_id, auction.current_bidder_id, auction.current_bid)
+        return results
+
+    async with AsyncSessionLocal() as session:
+        return await run_transaction(session, unit, "place_bid_batch")
+
+
+bid_pipeline = BidPipeline(_resolve_bid_batch, interval_ms=settings.group_commit_interval_ms)
+
+
+async def _sell_current_lot(session: AsyncSession, auction: Auction, player: Optional[Player]) -> AuctionEventEntry:
+    """Sell the (locked) current player to the highest bidder inside the caller's transaction.
+
+    Locks the winning team and bid, continuing the canonical lock order.
+    """
+    team = None
+    if auction.current_bidder_id:
+        team = await lock_row(session, Team, Team.id == auction.current_bidder_id)
+
+    # Determine winning bid
+    winning = await lock_row(session, Bid, Bid.auction_id == auction.id, Bid.is_winning == True)
+
+    if not winning:
+         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No winning bid to sell")
+
+    # Verify bid matches auction state
+    if winning.team_id != auction.current_bidder_id or winning.amount != auction.current_bid:
+         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Auction state mismatch")
+
+    # Update Player
+    if player:
+        if player.status == PlayerStatusEnum.SOLD.value:
+            # Already sold. Check consistency.
+            if player.team_id == winning.team_id and player.sold_price == winning.amount:
+                # Idempotent success
+                pass
+            else:
+                # Sold to someone else?
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Player already sold to another team")
+        else:
+            player.team_id = winning.team_id
+            player.sold_price = winning.amount
+            player.status = PlayerStatusEnum.SOLD.value
+            session.add(player)
+
+            # Update Team Budget
+            if team:
+                team.budget_spent = (team.budget_spent or 0) + winning.amount
+                session.add(team)
+
+            # Update Auction stats
+            auction.total_revenue = (auction.total_revenue or 0) + (winning.amount or 0)
+
+    session.add(auction)
+    # The sale moved the amount into budget_spent
+    await release_commitment(session, auction.id)
+    return await append_event(session, auction, "player_sold", {
+        "player_id": auction.current_player_id,
+        "team_id": winning.team_id,
+        "amount": auction.current_bid,
+        # The resulting total, so replaying an idempotent re-sale cannot count it twice
+        "total_revenue": auction.total_revenue or 0,
+        "timestamp": datetime.utcnow().isoformat(),
+    })
+
+
+async def finalize_sold_player(session: AsyncSession, auction_id: str, expected_player_id: Optional[str] = None) -> Auction:
+    """Marks the current player in the auction as SOLD to the highest bidder.
+
+    `expected_player_id` guards automatic finalization as in `mark_player_unsold`.
+    """
+    async def unit():
+        auction = await _get_auction(session, auction_id)
 
         if not auction.current_player_id:
              raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No active player in auction")
 
-        # Determine winning bid
-        stmt = select(Bid).where(Bid.auction_id == auction_id, Bid.is_winning == True).with_for_update()
-        res = await session.execute(stmt)
-        winning = res.scalars().first()
+        # Take every lock up front in the canonical order: player, team, bid
+        player = await lock_row(session, Player, Player.id == auction.current_player_id)
+        _ensure_lot_open(auction, player, expected_player_id)
+        event = await _sell_current_lot(session, auction, player)
+        return auction, event
 
-        if not winning:
-             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No winning bid to sell")
+    async with auction_engine.transition(auction_id):
+        auction, event = await run_transaction(session, unit, "finalize_sold_player")
+    await session.refresh(auction)
 
-        # Verify bid matches auction state
-        if winning.team_id != auction.current_bidder_id or winning.amount != auction.current_bid:
-             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Auction state mismatch")
+    # Broadcast
+    await _publish(event)
 
-        # Update Player
-        stmt = select(Player).where(Player.id == auction.current_player_id).with_for_update()
-        res = await session.execute(stmt)
-        player = res.scalars().first()
+    return auction
 
-        if player:
-            if player.status == PlayerStatusEnum.SOLD.value:
-                # Already sold. Check consistency.
-                if player.team_id == winning.team_id and player.sold_price == winning.amount:
-                    # Idempotent success
-                    pass
-                else:
-                    # Sold to someone else?
-                    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Player already sold to another team")
-            else:
-                player.team_id = winning.team_id
-                player.sold_price = winning.amount
-                player.status = PlayerStatusEnum.SOLD.value
-                session.add(player)
-
-                # Update Team Budget
-                stmt = select(Team).where(Team.id == winning.team_id).with_for_update()
-                res = await session.execute(stmt)
-                team = res.scalars().first()
-                if team:
-                    team.budget_spent = (team.budget_spent or 0) + winning.amount
-                    session.add(team)
-
-                # Update Auction stats
-                auction.total_revenue = (auction.total_revenue or 0) + (winning.amount or 0)
 
-        session.add(auction)
-        winning_team_id = winning.team_id
+async def resolve_current_lot(session: AsyncSession, auction_id: str, expected_player_id: str) -> AuctionEventEntry:
+    """Sell the current lot to the highest bidder, or mark it unsold if nobody bid.
 
+    The outcome is read from the locked auction row, so a bid committed just
+    before resolution is sold rather than wiped. Guarded by
+    `expected_player_id` as in `mark_player_unsold`; returns the
+    `player_sold` or `player_unsold` event.
+    """
+    async def unit():
+        auction = await _get_auction(session, auction_id)
+        player = None
+        if auction.current_player_id:
+            # Player, then (when selling) team and bid: the canonical lock order
+            player = await lock_row(session, Player, Player.id == auction.current_player_id)
+        _ensure_lot_open(auction, player, expected_player_id)
+        if auction.current_bidder_id:
+            return auction, await _sell_current_lot(session, auction, player)
+        return auction, await _unsell_current_lot(session, auction, player)
+
+    async with auction_engine.transition(auction_id):
+        auction, event = await run_transaction(session, unit, "resolve_current_lot")
     await session.refresh(auction)
 
     # Broadcast
-    payload = {
-        "type": "player_sold",
-        "auction_id": auction.id,
-        "player_id": auction.current_player_id,
-        "team_id": winning_team_id,
-        "amount": auction.current_bid,
-        "timestamp": datetime.utcnow().isoformat(),
-    }
-    await manager.broadcast_to_room(f"auction:{auction_id}", payload)
+    await _publish(event)
 
-    return auction
+    return event
 
 
 async def end_auction(session: AsyncSession, auction_id: str, force: bool = False) -> Auction:
-    async with session.begin():
-        stmt = select(Auction).where(Auction.id == auction_id).with_for_update()
-        res = await session.execute(stmt)
-        auction = res.scalars().first()
-        if not auction:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
+    async def unit():
+        auction = await _get_auction(session, auction_id)
 
         auction.status = AuctionStatusEnum.COMPLETED.value
         auction.ended_at = datetime.utcnow()
         session.add(auction)
-
+        await release_commitment(session, auction_id)
+        event = await append_event(session, auction, "auction_ended", {
+            "status": auction.status,
+            "ended_at": auction.ended_at.isoformat(),
+            "timestamp": datetime.utcnow().isoformat(),
+        })
+        return auction, event
+
+    async with auction_engine.transition(auction_id):
+        auction, event = await run_transaction(session, unit, "end_auction")
     await session.refresh(auction)
 
     # Broadcast after successful commit
-    payload = {
-        "type": "auction_ended",
-        "auction_id": auction.id,
-        "status": auction.status,
-        "timestamp": datetime.utcnow().isoformat(),
-    }
-    await manager.broadcast_to_room(f"auction:{auction_id}", payload)
+    await _publish(event)
 
     return auction
 
 
 async def cancel_auction(session: AsyncSession, auction_id: str) -> Auction:
-    async with session.begin():
-        stmt = select(Auction).where(Auction.id == auction_id).with_for_update()
-        res = await session.execute(stmt)
-        auction = res.scalars().first()
-        if not auction:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
+    async def unit():
+        auction = await _get_auction(session, auction_id)
 
         # clear winning bids
-        stmt = select(Bid).where(Bid.auction_id == auction_id, Bid.is_winning == True).with_for_update()
-        res = await session.execute(stmt)
-        bids = res.scalars().all()
+        bids = await lock_rows(session, Bid, Bid.auction_id == auction_id, Bid.is_winning == True)
         for b in bids:
             b.is_winning = False
             session.add(b)
@@ -395,16 +694,18 @@ async def cancel_auction(session: AsyncSession, auction_id: str) -> Auction:
         auction.current_bid = None
         auction.current_bidder_id = None
         session.add(auction)
-
+        await release_commitment(session, auction_id)
+        event = await append_event(session, auction, "auction_cancelled", {
+            "status": auction.status,
+            "timestamp": datetime.utcnow().isoformat(),
+        })
+        return auction, event
+
+    async with auction_engine.transition(auction_id):
+        auction, event = await run_transaction(session, unit, "cancel_auction")
     await session.refresh(auction)
 
     # Broadcast after successful commit
-    payload = {
-        "type": "auction_cancelled",
-        "auction_id": auction.id,
-        "status": auction.status,
-        "timestamp": datetime.utcnow().isoformat(),
-    }
-    await manager.broadcast_to_room(f"auction:{auction_id}", payload)
+    await _publish(event)
 
     return auction
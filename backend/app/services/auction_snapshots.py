@@ -0,0 +1,246 @@
+"""In-memory auction snapshots.
+
+A projection of each auction an API worker has been asked about: status,
+current player (with its card), current bid and bidder, revenue. It is
+loaded once from the database and then kept current from the auction's
+events as they are published (`event_log.subscribe`), so the initial
+WebSocket snapshot and `GET /auctions/{id}` are served without queries.
+
+Snapshots are versioned by event sequence number:
+
+- an event is applied only if it directly follows the snapshot
+  (`seq == last_seq + 1`); a gap drops the snapshot;
+- a snapshot is served only if it is at least as new as the latest event
+  this process has seen for the auction, otherwise it is reloaded and
+  brought forward from the event ring buffer;
+- when the cross-worker broker reconnects (notifications may have been
+  lost, e.g. a database failover) every snapshot is dropped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.models import Auction, Player
+from app.models.enums import AuctionStatusEnum, PlayerStatusEnum
+from app.schemas.auction import LotPlayerCard
+from app.services.auction_engine import auction_engine
+from app.services.event_log import AuctionEventEntry, event_log
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+snapshot_reads = metrics.counter("auction_snapshot_reads_total", "Auction snapshot reads", ("result",))
+snapshot_drops = metrics.counter("auction_snapshot_invalidations_total", "Auction snapshots dropped", ("reason",))
+
+
+@dataclass
+class AuctionSnapshot:
+    """Current state of one auction, as of event `last_seq`."""
+
+    id: str
+    name: str
+    description: Optional[str]
+    status: str
+    started_at: Optional[datetime]
+    ended_at: Optional[datetime]
+    current_player_id: Optional[str]
+    current_player: Optional[Dict[str, Any]]
+    current_bid: Optional[int]
+    current_bidder_id: Optional[str]
+    total_revenue: int
+    created_at: datetime
+    updated_at: datetime
+    last_seq: int
+
+    def message(self) -> Dict[str, Any]:
+        """The snapshot as sent to WebSocket clients."""
+        return {
+            "type": "snapshot",
+            "auction_id": self.id,
+            "status": self.status,
+            "current_player_id": self.current_player_id,
+            "current_player": self.current_player,
+            "current_bid": self.current_bid,
+            "current_bidder_id": self.current_bidder_id,
+            "total_revenue": self.total_revenue,
+            "last_seq": self.last_seq,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+
+
+def _card(player: Optional[Player]) -> Optional[Dict[str, Any]]:
+    if player is None:
+        return None
+    return LotPlayerCard.model_validate(player, from_attributes=True).model_dump(mode="json")
+
+
+def _set_card_status(snapshot: AuctionSnapshot, player_id: Optional[str], status: str) -> None:
+    card = snapshot.current_player
+    if card is not None and card["id"] == player_id:
+        # Cards can be shared with the lot catalog cache: replace, don't mutate
+        snapshot.current_player = {**card, "status": status}
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+class AuctionSnapshotStore:
+    """Event-maintained auction snapshots, least recently used evicted first."""
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._snapshots: "OrderedDict[str, AuctionSnapshot]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._running = False
+
+    async def start(self) -> None:
+        if not self._running:
+            self._running = True
+            event_log.subscribe(self.on_event)
+
+    async def stop(self) -> None:
+        if self._running:
+            self._running = False
+            event_log.unsubscribe(self.on_event)
+            self._snapshots.clear()
+
+    def invalidate(self, auction_id: Optional[str] = None, reason: str = "manual") -> None:
+        """Drop one snapshot, or all of them."""
+        if auction_id is None:
+            if self._snapshots:
+                snapshot_drops.inc(len(self._snapshots), reason=reason)
+            self._snapshots.clear()
+        elif self._snapshots.pop(auction_id, None) is not None:
+            snapshot_drops.inc(reason=reason)
+
+    async def get(self, auction_id: str) -> Optional[AuctionSnapshot]:
+        """The auction's current snapshot, or None if it does not exist."""
+        snapshot = self._snapshots.get(auction_id)
+        if self._running and snapshot is not None and snapshot.last_seq >= event_log.last_seq(auction_id):
+            self._snapshots.move_to_end(auction_id)
+            snapshot_reads.inc(result="hit")
+            return snapshot
+
+        snapshot_reads.inc(result="load")
+        task = self._loading.get(auction_id)
+        if task is None:
+            task = self._loading[auction_id] = asyncio.create_task(self._load(auction_id))
+            task.add_done_callback(lambda _task: self._loading.pop(auction_id, None))
+        return await asyncio.shield(task)
+
+    async def _load(self, auction_id: str) -> Optional[AuctionSnapshot]:
+        # Engine mode: persist accepted bids so the row is not behind the events
+        await auction_engine.flush(auction_id)
+        async with AsyncSessionLocal() as session:
+            res = await session.execute(select(Auction).where(Auction.id == auction_id))
+            auction = res.scalars().first()
+            if auction is None:
+                return None
+            player = None
+            if auction.current_player_id:
+                res = await session.execute(select(Player).where(Player.id == auction.current_player_id))
+                player = res.scalars().first()
+
+        snapshot = AuctionSnapshot(
+            id=auction.id,
+            name=auction.name,
+            description=auction.description,
+            status=auction.status,
+            started_at=auction.started_at,
+            ended_at=auction.ended_at,
+            current_player_id=auction.current_player_id,
+            current_player=_card(player),
+            current_bid=auction.current_bid,
+            current_bidder_id=auction.current_bidder_id,
+            total_revenue=auction.total_revenue or 0,
+            created_at=auction.created_at,
+            updated_at=auction.updated_at,
+            last_seq=auction.last_event_seq or 0,
+        )
+        # Events committed while the row was being read
+        for event in event_log.replay(auction_id, snapshot.last_seq) or ():
+            if not await self._apply(snapshot, event):
+                break
+        if self._running:
+            self._snapshots[auction_id] = snapshot
+            self._snapshots.move_to_end(auction_id)
+            while len(self._snapshots) > self.capacity:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    async def on_event(self, event: AuctionEventEntry) -> None:
+        snapshot = self._snapshots.get(event.auction_id)
+        if snapshot is None or event.seq <= snapshot.last_seq:
+            return
+        if event.seq != snapshot.last_seq + 1:
+            self.invalidate(event.auction_id, reason="gap")
+            return
+        try:
+            applied = await self._apply(snapshot, event)
+        except Exception as exc:
+            logger.warning("Could not apply %s#%d to its snapshot: %s", event.auction_id, event.seq, exc)
+            applied = False
+        if not applied:
+            self.invalidate(event.auction_id, reason="unapplied_event")
+
+    async def _apply(self, snapshot: AuctionSnapshot, event: AuctionEventEntry) -> bool:
+        """Apply the event that follows `snapshot`; False if it cannot be projected."""
+        payload = event.payload
+        kind = event.type
+        if kind == "bid_placed":
+            snapshot.current_bid = payload["current_bid"]
+            snapshot.current_bidder_id = payload["team_id"]
+        elif kind == "player_updated":
+            player_id = payload["current_player_id"]
+            card = payload.get("player")
+            if card is None and player_id:
+                async with AsyncSessionLocal() as session:
+                    res = await session.execute(select(Player).where(Player.id == player_id))
+                    card = _card(res.scalars().first())
+            snapshot.current_player_id = player_id
+            snapshot.current_player = card
+            snapshot.current_bid = None
+            snapshot.current_bidder_id = None
+        elif kind == "player_sold":
+            if "total_revenue" in payload:
+                snapshot.total_revenue = payload["total_revenue"]
+            else:
+                snapshot.total_revenue += payload.get("amount") or 0
+            _set_card_status(snapshot, payload.get("player_id"), PlayerStatusEnum.SOLD.value)
+        elif kind == "player_unsold":
+            snapshot.current_bid = None
+            snapshot.current_bidder_id = None
+            _set_card_status(snapshot, payload.get("player_id"), PlayerStatusEnum.UNSOLD.value)
+        elif kind == "auction_started":
+            snapshot.status = payload["status"]
+            snapshot.current_player_id = payload.get("current_player_id", snapshot.current_player_id)
+            snapshot.started_at = _parse_time(payload.get("started_at")) or snapshot.started_at
+        elif kind in ("auction_paused", "auction_cancelled"):
+            snapshot.status = payload["status"]
+            if kind == "auction_cancelled":
+                snapshot.current_bid = None
+                snapshot.current_bidder_id = None
+        elif kind == "auction_ended":
+            snapshot.status = AuctionStatusEnum.COMPLETED.value
+            snapshot.ended_at = _parse_time(payload.get("ended_at")) or snapshot.ended_at
+        else:
+            return False
+        snapshot.last_seq = event.seq
+        snapshot.updated_at = _parse_time(payload.get("timestamp")) or datetime.utcnow()
+        return True
+
+
+# Global snapshot store instance
+auction_snapshots = AuctionSnapshotStore(capacity=settings.auction_snapshot_capacity)
@@ -0,0 +1,156 @@
+"""Team commitment ledger.
+
+Keeps one `team_commitments` row per auction whose current lot has a
+winning bid, so the budget check in `auction_service` is an indexed lookup
+on a team's handful of rows instead of a join-and-SUM over bid history.
+
+The ledger is written in the same transaction as the bid, sold, unsold,
+cancel and end transitions. `CommitmentReconciler` periodically compares it
+with what the `bids`, `auctions` and `players` tables imply and repairs any
+drift under the auction row lock.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select, update, delete, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal
+from app.db.transactions import run_transaction, lock_row
+from app.models import Auction, Bid, Player, TeamCommitment
+from app.models.enums import AuctionStatusEnum, PlayerStatusEnum
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+LIVE_STATUSES = [AuctionStatusEnum.ONGOING.value, AuctionStatusEnum.PAUSED.value]
+
+
+async def record_commitment(session: AsyncSession, auction_id: str, team_id: str, amount: int) -> None:
+    """Set the winning commitment for an auction. Caller holds the auction row lock."""
+    res = await session.execute(
+        update(TeamCommitment)
+        .where(TeamCommitment.auction_id == auction_id)
+        .values(team_id=team_id, amount=amount)
+    )
+    if res.rowcount == 0:
+        session.add(TeamCommitment(auction_id=auction_id, team_id=team_id, amount=amount))
+        await session.flush()
+
+
+async def release_commitment(session: AsyncSession, auction_id: str) -> None:
+    """Drop the commitment for an auction whose lot was resolved."""
+    await session.execute(delete(TeamCommitment).where(TeamCommitment.auction_id == auction_id))
+
+
+async def pending_commitments(session: AsyncSession, team_id: str, exclude_auction_id: str) -> int:
+    """Sum of a team's winning amounts on unresolved lots of other auctions."""
+    stmt = select(func.coalesce(func.sum(TeamCommitment.amount), 0)).where(
+        TeamCommitment.team_id == team_id,
+        TeamCommitment.auction_id != exclude_auction_id,
+    )
+    res = await session.execute(stmt)
+    return int(res.scalar() or 0)
+
+
+def _expected_commitments_stmt():
+    """Winning bids on the current, unsold lot of ongoing/paused auctions."""
+    return (
+        select(Bid.auction_id, Bid.team_id, Bid.amount)
+        .join(Auction, and_(
+            Bid.auction_id == Auction.id,
+            Bid.player_id == Auction.current_player_id,
+            Bid.team_id == Auction.current_bidder_id,
+        ))
+        .join(Player, Player.id == Bid.player_id)
+        .where(
+            Bid.is_winning == True,
+            Auction.status.in_(LIVE_STATUSES),
+            Player.status != PlayerStatusEnum.SOLD.value,
+        )
+    )
+
+
+async def reconcile_auction(session: AsyncSession, auction_id: str) -> bool:
+    """Recompute one auction's commitment from the bids table. Returns True if repaired."""
+    async def unit():
+        await lock_row(session, Auction, Auction.id == auction_id)
+        res = await session.execute(_expected_commitments_stmt().where(Bid.auction_id == auction_id))
+        expected = res.first()
+        res = await session.execute(select(TeamCommitment).where(TeamCommitment.auction_id == auction_id))
+        actual = res.scalars().first()
+
+        if expected is None and actual is None:
+            return False
+        if expected is not None and actual is not None and (actual.team_id, actual.amount) == (expected.team_id, expected.amount):
+            return False
+
+        if expected is None:
+            await release_commitment(session, auction_id)
+        else:
+            await record_commitment(session, auction_id, expected.team_id, expected.amount)
+        return True
+
+    return await run_transaction(session, unit, "reconcile_commitment")
+
+
+async def reconcile(session: AsyncSession) -> int:
+    """Compare the whole ledger with the bids table and repair drifted auctions.
+
+    The comparison is a cheap unlocked read; only auctions that differ are
+    re-checked and repaired under their row lock, so in-flight bids are never
+    overwritten by a stale view.
+    """
+    res = await session.execute(_expected_commitments_stmt())
+    expected: Dict[str, Tuple[str, int]] = {row.auction_id: (row.team_id, row.amount) for row in res.all()}
+    res = await session.execute(select(TeamCommitment.auction_id, TeamCommitment.team_id, TeamCommitment.amount))
+    actual: Dict[str, Tuple[str, int]] = {row.auction_id: (row.team_id, row.amount) for row in res.all()}
+    await session.rollback()
+
+    suspects = {key for key in expected.keys() | actual.keys() if expected.get(key) != actual.get(key)}
+    repaired = 0
+    for auction_id in sorted(suspects):
+        if await reconcile_auction(session, auction_id):
+            repaired += 1
+    if repaired:
+        logger.warning("Commitment ledger repaired for %d auction(s)", repaired)
+    return repaired
+
+
+class CommitmentReconciler:
+    """Background task running `reconcile` every `interval_seconds`."""
+
+    def __init__(self, interval_seconds: int = 60):
+        self.interval = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                async with AsyncSessionLocal() as session:
+                    await reconcile(session)
+            except Exception as exc:
+                logger.error("Commitment ledger reconciliation failed: %s", exc, exc_info=exc)
+
+
+# Global reconciler instance
+commitment_reconciler = CommitmentReconciler(interval_seconds=settings.ledger_reconcile_interval_seconds)
@@ -0,0 +1,134 @@
+"""Post-commit delivery of auction events.
+
+Services hand committed events to `event_dispatcher.dispatch` and return
+straight away; a background task per auction then publishes each event to
+the event log (and its subscribers) and broadcasts it to the auction's
+WebSocket room. The bidder's response no longer waits for fan-out.
+
+- Ordering: one delivery task per auction, so an auction's events are
+  delivered one at a time, in `seq` order when concurrent commits hand
+  them over out of order. Auctions do not wait on each other.
+- Memory: at most ``EVENT_DISPATCH_MAX_PENDING`` events are queued across
+  all auctions; `dispatch` waits for room only when that limit is reached.
+- Shutdown: `stop` stops taking new work and drains what is queued for up
+  to ``EVENT_DISPATCH_DRAIN_SECONDS``.
+
+When the dispatcher is not running (scripts, tests without the app
+lifespan) events are delivered inline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.services.event_log import AuctionEventEntry, event_log
+from app.websocket.manager import manager
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+dispatch_pending = metrics.gauge("event_dispatch_pending", "Committed events waiting to be delivered")
+dispatch_delay = metrics.histogram(
+    "event_dispatch_delay_seconds",
+    "Time from commit hand-off to delivery of an auction event",
+)
+dispatch_failures = metrics.counter("event_dispatch_failures_total", "Auction events whose delivery raised")
+
+
+class EventDispatcher:
+    """Bounded, per-auction ordered delivery of committed events."""
+
+    def __init__(self, max_pending: int = 10000, drain_seconds: float = 5.0):
+        self.max_pending = max_pending
+        self.drain_seconds = drain_seconds
+        self._queues: Dict[str, Deque[Tuple[AuctionEventEntry, float]]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._running = False
+
+    async def start(self) -> None:
+        if not self._running:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._running = True
+
+    async def stop(self) -> None:
+        """Stop taking new work and deliver what is already queued."""
+        if not self._running:
+            return
+        self._running = False
+        tasks = list(self._tasks.values())
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=self.drain_seconds)
+            if pending:
+                dropped = sum(len(queue) for queue in self._queues.values())
+                logger.warning("Event dispatcher drain timed out; %d events not delivered", dropped)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        self._queues.clear()
+        dispatch_pending.set(0)
+
+    async def dispatch(self, event: AuctionEventEntry) -> None:
+        """Queue a committed event for delivery."""
+        if not self._running:
+            await self._deliver(event)
+            return
+
+        await self._slots.acquire()
+        dispatch_pending.inc()
+        queue = self._queues.setdefault(event.auction_id, deque())
+        item = (event, time.perf_counter())
+        if queue and queue[-1][0].seq > event.seq:
+            # A concurrent commit handed over a later seq first
+            index = len(queue)
+            while index and queue[index - 1][0].seq > event.seq:
+                index -= 1
+            queue.insert(index, item)
+        else:
+            queue.append(item)
+
+        if event.auction_id not in self._tasks:
+            self._tasks[event.auction_id] = asyncio.create_task(self._run(event.auction_id))
+
+    async def flush(self, auction_id: str) -> None:
+        """Wait until every event queued for `auction_id` has been delivered."""
+        task = self._tasks.get(auction_id)
+        if task is not None:
+            await asyncio.shield(task)
+
+    async def _run(self, auction_id: str) -> None:
+        queue = self._queues[auction_id]
+        try:
+            while queue:
+                event, queued_at = queue.popleft()
+                try:
+                    await self._deliver(event)
+                finally:
+                    self._slots.release()
+                    dispatch_pending.dec()
+                dispatch_delay.observe(time.perf_counter() - queued_at)
+        finally:
+            self._tasks.pop(auction_id, None)
+            if not queue:
+                self._queues.pop(auction_id, None)
+
+    async def _deliver(self, event: AuctionEventEntry) -> None:
+        try:
+            await event_log.publish(event)
+            await manager.broadcast_to_room(f"auction:{event.auction_id}", event.message)
+        except Exception as exc:
+            dispatch_failures.inc()
+            logger.error("Delivering %s#%d failed: %s", event.auction_id, event.seq, exc, exc_info=exc)
+
+
+# Global dispatcher instance
+event_dispatcher = EventDispatcher(
+    max_pending=settings.event_dispatch_max_pending,
+    drain_seconds=settings.event_dispatch_drain_seconds,
+)
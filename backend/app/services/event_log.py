@@ -0,0 +1,286 @@
+"""Per-auction event log.
+
+Every auction state change appends an event to `auction_events` in the same
+transaction as the change. Its sequence number comes from
+`auctions.last_event_seq`, bumped under the auction row lock (or version
+check), so an auction's events are numbered 1, 2, 3, ... in commit order.
+
+After commit the event is published into a bounded in-memory ring buffer
+per auction and handed to in-process subscribers; with a cross-worker
+WebSocket broker, events committed by other workers arrive through
+`ingest_remote` as well. `events_after` serves
+"events after seq N" from the ring buffer when it covers the range and
+falls back to the table otherwise, so a client that missed messages can
+catch up without reloading the whole auction; `replay` serves WebSocket
+resumes from the ring buffer alone.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal
+from app.models import Auction, AuctionEvent
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class AuctionEventEntry:
+    """A committed (or about to be committed) auction event."""
+
+    auction_id: str
+    seq: int
+    type: str
+    payload: Dict[str, Any]
+
+    @property
+    def message(self) -> Dict[str, Any]:
+        """The event as sent to clients."""
+        return {**self.payload, "seq": self.seq}
+
+    def row(self) -> Dict[str, Any]:
+        """Column values for inserting the event."""
+        return {
+            "auction_id": self.auction_id,
+            "seq": self.seq,
+            "type": self.type,
+            "payload": json.dumps(self.payload),
+        }
+
+    @classmethod
+    def from_row(cls, row: AuctionEvent) -> "AuctionEventEntry":
+        return cls(row.auction_id, row.seq, row.type, json.loads(row.payload))
+
+
+Subscriber = Callable[[AuctionEventEntry], Awaitable[None]]
+
+
+def next_event(auction_id: str, last_seq: int, event_type: str, payload: Dict[str, Any]) -> AuctionEventEntry:
+    """Build the event following `last_seq`. The caller persists it and the new sequence."""
+    return AuctionEventEntry(
+        auction_id=auction_id,
+        seq=last_seq + 1,
+        type=event_type,
+        payload={"type": event_type, "auction_id": auction_id, **payload},
+    )
+
+
+def bid_event_payload(team_id: str, amount: int, proxy: bool = False) -> Dict[str, Any]:
+    """Payload of the `bid_placed` event, shared by every bid path.
+
+    `proxy` marks bids the server placed from a team's proxy (max) bid.
+    """
+    return {
+        "current_bid": amount,
+        "team_id": team_id,
+        "proxy": proxy,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+async def append_event(session: AsyncSession, auction: Auction, event_type: str, payload: Dict[str, Any]) -> AuctionEventEntry:
+    """Append an event for `auction` in the caller's transaction.
+
+    The caller must hold the auction row lock, or rely on its version check,
+    so no other transaction can take the same sequence number.
+    """
+    event = next_event(auction.id, auction.last_event_seq or 0, event_type, payload)
+    auction.last_event_seq = event.seq
+    session.add(auction)
+    session.add(AuctionEvent(**event.row()))
+    return event
+
+
+class EventRing:
+    """The most recent events of one auction, ordered by sequence number."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._events: Deque[AuctionEventEntry] = deque()
+        self._seqs: Deque[int] = deque()
+        self._published: set = set()  # seqs already handed to subscribers
+
+    @property
+    def last_seq(self) -> int:
+        return self._seqs[-1] if self._seqs else 0
+
+    def add(self, event: AuctionEventEntry) -> bool:
+        """Insert an event; returns False if it was already present."""
+        if not self._seqs or event.seq > self._seqs[-1]:
+            self._events.append(event)
+            self._seqs.append(event.seq)
+        else:
+            # Late arrival (concurrent publishers or a table backfill)
+            index = bisect.bisect_left(self._seqs, event.seq)
+            if index < len(self._seqs) and self._seqs[index] == event.seq:
+                return False
+            if index == 0 and len(self._seqs) >= self.capacity:
+                return False
+            self._events.insert(index, event)
+            self._seqs.insert(index, event.seq)
+        while len(self._events) > self.capacity:
+            self._events.popleft()
+            self._published.discard(self._seqs.popleft())
+        return True
+
+    def mark_published(self, seq: int) -> bool:
+        """Record that subscribers saw `seq`; returns False if they already had."""
+        if seq in self._published or (self._seqs and seq < self._seqs[0]):
+            return False
+        self._published.add(seq)
+        return True
+
+    def after(self, after_seq: int, up_to: int) -> Optional[List[AuctionEventEntry]]:
+        """Events in (after_seq, up_to], or None if the ring does not hold all of them."""
+        if after_seq >= up_to:
+            return []
+        start = bisect.bisect_right(self._seqs, after_seq)
+        events = []
+        expected = after_seq + 1
+        for index in range(start, len(self._events)):
+            event = self._events[index]
+            if event.seq > up_to:
+                break
+            if event.seq != expected:
+                return None
+            events.append(event)
+            expected += 1
+        if expected != up_to + 1:
+            return None
+        return events
+
+
+class EventLog:
+    """Ring buffers of recent events per auction plus in-process subscribers."""
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self._rings: Dict[str, EventRing] = {}
+        self._subscribers: List[Subscriber] = []
+
+    def subscribe(self, callback: Subscriber) -> None:
+        """Call `callback(event)` for every event published in this process.
+
+        Events of one auction can reach subscribers slightly out of order when
+        several requests publish at once; use `event.seq` to order them.
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Subscriber) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _ring(self, auction_id: str) -> EventRing:
+        ring = self._rings.get(auction_id)
+        if ring is None:
+            ring = self._rings[auction_id] = EventRing(self.capacity)
+        return ring
+
+    def last_seq(self, auction_id: str) -> int:
+        """Highest sequence number this process has seen for an auction."""
+        ring = self._rings.get(auction_id)
+        return ring.last_seq if ring else 0
+
+    def replay(self, auction_id: str, after_seq: int) -> Optional[List[AuctionEventEntry]]:
+        """Events after `after_seq` up to the latest seen, from memory only.
+
+        None if the ring buffer does not cover the range (or holds nothing
+        for the auction); the caller then falls back to a snapshot.
+        """
+        ring = self._rings.get(auction_id)
+        if ring is None or not ring.last_seq:
+            return None
+        return ring.after(after_seq, ring.last_seq)
+
+    async def publish(self, event: AuctionEventEntry) -> None:
+        """Record a committed event and notify subscribers. Duplicates are ignored."""
+        ring = self._ring(event.auction_id)
+        ring.add(event)
+        if not ring.mark_published(event.seq):
+            return
+        for callback in list(self._subscribers):
+            try:
+                await callback(event)
+            except Exception as exc:
+                logger.error("Event subscriber failed for %s#%d: %s", event.auction_id, event.seq, exc, exc_info=exc)
+
+    async def ingest_remote(self, room: str, message: Dict[str, Any]) -> None:
+        """Publish an event another worker committed and broadcast.
+
+        Auction events are the room messages that carry a `seq`; the rest
+        (countdowns, lot previews, ...) are ignored.
+        """
+        if not room.startswith("auction:") or "seq" not in message or "type" not in message:
+            return
+        payload = {key: value for key, value in message.items() if key != "seq"}
+        await self.publish(AuctionEventEntry(room.split(":", 1)[1], message["seq"], message["type"], payload))
+
+    async def load_message(self, room: str, reference: Dict[str, Any]) -> Optional[str]:
+        """The broadcast of the event `reference` names, for messages too large for the broker.
+
+        Used with `broker.set_reference_loader("auction:", ...)`.
+        """
+        auction_id, seq = room.split(":", 1)[1], reference.get("seq")
+        if not isinstance(seq, int):
+            return None
+        ring = self._rings.get(auction_id)
+        events = ring.after(seq - 1, seq) if ring is not None else None
+        if events:
+            return json.dumps(events[0].message)
+        async with AsyncSessionLocal() as session:
+            res = await session.execute(
+                select(AuctionEvent).where(AuctionEvent.auction_id == auction_id, AuctionEvent.seq == seq)
+            )
+            row = res.scalars().first()
+        return json.dumps(AuctionEventEntry.from_row(row).message) if row is not None else None
+
+    async def events_after(
+        self,
+        session: AsyncSession,
+        auction_id: str,
+        after_seq: int,
+        limit: int = 100,
+    ) -> Optional[Tuple[List[AuctionEventEntry], int]]:
+        """Return `(events, last_seq)` for events after `after_seq`, or None if the auction is unknown.
+
+        At most `limit` events are returned; ask again from the last returned
+        seq to page through a longer gap.
+        """
+        res = await session.execute(select(Auction.last_event_seq).where(Auction.id == auction_id))
+        last_seq = res.scalar()
+        if last_seq is None:
+            return None
+
+        up_to = min(last_seq, after_seq + limit)
+        ring = self._rings.get(auction_id)
+        if ring is not None:
+            events = ring.after(after_seq, up_to)
+            if events is not None:
+                return events, last_seq
+
+        res = await session.execute(
+            select(AuctionEvent)
+            .where(AuctionEvent.auction_id == auction_id, AuctionEvent.seq > after_seq, AuctionEvent.seq <= up_to)
+            .order_by(AuctionEvent.seq)
+        )
+        events = [AuctionEventEntry.from_row(row) for row in res.scalars().all()]
+        ring = self._ring(auction_id)
+        for event in events:
+            ring.add(event)
+        return events, last_seq
+
+
+# Global event log instance
+event_log = EventLog(capacity=settings.event_ring_size)
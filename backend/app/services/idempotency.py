@@ -0,0 +1,281 @@
+"""Idempotency-Key support for retried requests.
+
+A request sent with an `Idempotency-Key` header runs once per (user, key).
+Its JSON response is kept in a bounded in-process LRU/TTL cache and in the
+`idempotency_keys` table, so a retry returns the original response without
+running the request again (for bids: without touching any auction lock).
+
+Lookups go memory -> in-flight -> table. A duplicate that arrives while the
+first request is still running waits for its outcome instead of racing it.
+Reusing a key for a different request is rejected with 422. Only successful
+responses are stored; a failed request can be retried with the same key.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ScopedKey = Tuple[str, str]  # (user_id, idempotency key)
+
+idempotency_requests = metrics.counter(
+    "idempotency_requests_total",
+    "Requests carrying an Idempotency-Key by outcome",
+    ("result",),
+)
+cache_evictions = metrics.counter(
+    "idempotency_cache_evictions_total",
+    "Entries evicted from the idempotency cache",
+    ("reason",),
+)
+cache_entries = metrics.gauge("idempotency_cache_entries", "Entries in the idempotency cache")
+cache_bytes = metrics.gauge("idempotency_cache_bytes", "Approximate bytes held by the idempotency cache")
+
+
+def request_fingerprint(*parts: object) -> str:
+    """Hash of the request a key was used for, to detect key reuse."""
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+
+
+@dataclass
+class StoredResponse:
+    request_hash: str
+    status_code: int
+    body: str  # JSON text
+    expires_at: float  # time.time()
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + len(self.request_hash)
+
+
+@dataclass(frozen=True)
+class _Failure:
+    """How the first request with a key failed, for the duplicates waiting on it."""
+
+    status_code: int
+    detail: Any
+    headers: Optional[Dict[str, str]] = None
+
+    @classmethod
+    def of(cls, exc: BaseException) -> "_Failure":
+        if isinstance(exc, HTTPException):
+            return cls(exc.status_code, exc.detail, exc.headers)
+        return cls(status.HTTP_500_INTERNAL_SERVER_ERROR, "Request could not be processed")
+
+    def error(self) -> HTTPException:
+        # A fresh exception per waiter: raising one instance from several tasks corrupts its traceback
+        return HTTPException(
+            status_code=self.status_code,
+            detail=self.detail,
+            headers=dict(self.headers) if self.headers else None,
+        )
+
+
+class IdempotencyCache:
+    """LRU cache with a TTL, bounded by entry count and by total body bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[ScopedKey, StoredResponse]" = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: ScopedKey) -> Optional[StoredResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._remove(key, "ttl")
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: ScopedKey, entry: StoredResponse) -> None:
+        if entry.size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key, None)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)), "lru")
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)), "size")
+        self._update_gauges()
+
+    def _remove(self, key: ScopedKey, reason: Optional[str]) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        if reason:
+            cache_evictions.inc(reason=reason)
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        cache_entries.set(len(self._entries))
+        cache_bytes.set(self._bytes)
+
+
+class IdempotencyStore:
+    """Runs keyed requests at most once, backed by the cache and the table."""
+
+    def __init__(self, cache: IdempotencyCache, ttl_seconds: int, purge_interval_seconds: int = 300):
+        self.cache = cache
+        self.ttl = ttl_seconds
+        self.purge_interval = purge_interval_seconds
+        # Futures resolve to the response body, or to a _Failure
+        self._inflight: Dict[ScopedKey, Tuple[str, "asyncio.Future[Union[str, _Failure]]"]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def run(
+        self,
+        user_id: str,
+        key: str,
+        request_hash: str,
+        execute: Callable[[], Awaitable[dict]],
+        status_code: int = status.HTTP_201_CREATED,
+    ) -> Tuple[dict, bool]:
+        """Return `(body, replayed)`; `execute` only runs if the key is new."""
+        scoped = (user_id, key)
+
+        entry = self.cache.get(scoped)
+        if entry is not None:
+            self._check_hash(entry.request_hash, request_hash)
+            idempotency_requests.inc(result="memory_hit")
+            return json.loads(entry.body), True
+
+        inflight = self._inflight.get(scoped)
+        if inflight is not None:
+            self._check_hash(inflight[0], request_hash)
+            idempotency_requests.inc(result="inflight_hit")
+            outcome = await asyncio.shield(inflight[1])
+            if isinstance(outcome, _Failure):
+                raise outcome.error()
+            return json.loads(outcome), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[scoped] = (request_hash, future)
+        try:
+            entry = await self._load(scoped)
+            if entry is not None:
+                self._check_hash(entry.request_hash, request_hash)
+                self.cache.put(scoped, entry)
+                idempotency_requests.inc(result="db_hit")
+                future.set_result(entry.body)
+                return json.loads(entry.body), True
+
+            idempotency_requests.inc(result="miss")
+            body = json.dumps(await execute())
+            entry = StoredResponse(request_hash, status_code, body, time.time() + self.ttl)
+            await self._save(scoped, entry)
+            self.cache.put(scoped, entry)
+            future.set_result(body)
+            return json.loads(body), False
+        except BaseException as exc:
+            if not future.done():
+                future.set_result(_Failure.of(exc))
+            raise
+        finally:
+            self._inflight.pop(scoped, None)
+
+    @staticmethod
+    def _check_hash(stored: str, request_hash: str) -> None:
+        if stored != request_hash:
+            idempotency_requests.inc(result="mismatch")
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request",
+            )
+
+    async def _load(self, scoped: ScopedKey) -> Optional[StoredResponse]:
+        async with AsyncSessionLocal() as session:
+            res = await session.execute(
+                select(IdempotencyKey).where(
+                    IdempotencyKey.user_id == scoped[0],
+                    IdempotencyKey.key == scoped[1],
+                    IdempotencyKey.expires_at > datetime.utcnow(),
+                )
+            )
+            row = res.scalars().first()
+        if row is None:
+            return None
+        ttl_left = (row.expires_at.replace(tzinfo=None) - datetime.utcnow()).total_seconds()
+        return StoredResponse(row.request_hash, row.status_code, row.response, time.time() + ttl_left)
+
+    async def _save(self, scoped: ScopedKey, entry: StoredResponse) -> None:
+        # The request already succeeded; failing to record it must not fail the response
+        try:
+            async with AsyncSessionLocal() as session:
+                session.add(IdempotencyKey(
+                    user_id=scoped[0],
+                    key=scoped[1],
+                    request_hash=entry.request_hash,
+                    status_code=entry.status_code,
+                    response=entry.body,
+                    expires_at=datetime.utcnow() + timedelta(seconds=self.ttl),
+                ))
+                await session.commit()
+        except IntegrityError:
+            # Another worker recorded the same key first
+            pass
+        except Exception as exc:
+            logger.error("Failed to store idempotency key: %s", exc, exc_info=exc)
+
+    async def purge_expired(self) -> int:
+        async with AsyncSessionLocal() as session:
+            res = await session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow()))
+            await session.commit()
+        return res.rowcount or 0
+
+    async def start(self) -> None:
+        if self._task is None and self.purge_interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.purge_interval)
+            try:
+                await self.purge_expired()
+            except Exception as exc:
+                logger.error("Idempotency key purge failed: %s", exc, exc_info=exc)
+
+
+# Global store instance
+idempotency_store = IdempotencyStore(
+    IdempotencyCache(
+        max_entries=settings.idempotency_cache_max_entries,
+        max_bytes=settings.idempotency_cache_max_bytes,
+    ),
+    ttl_seconds=settings.idempotency_ttl_seconds,
+)
@@ -0,0 +1,273 @@
+"""Auction lot catalog and advance-to-next-lot.
+
+An auction's running order is an ordered list of players (`auction_lots`),
+optionally grouped into pools such as role-based rounds. `advance_lot`
+resolves the current lot (sold to the highest bidder, or unsold) and opens
+the next available one in a single transaction, so there is no gap between
+lots and no separate admin call.
+
+The next few lots' player cards are prefetched into memory and pushed to
+the auction room as `upcoming_lots` whenever the current lot changes.
+Clients render the next lot from that push, and `advance_lot` puts the
+cached card into its `player_updated` event instead of loading the player
+again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal
+from app.db.transactions import run_transaction, lock_row, note_lock
+from app.models import Auction, AuctionLot, Player
+from app.models.enums import AuctionStatusEnum, PlayerStatusEnum
+from app.schemas.auction import LotPlayerCard
+from app.services.auction_engine import auction_engine
+from app.services.auction_service import _get_auction, _publish, _sell_current_lot, _unsell_current_lot
+from app.services.commitment_ledger import release_commitment
+from app.services.event_log import AuctionEventEntry, append_event, event_log
+from app.websocket.manager import manager
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+LotEntry = Dict[str, Any]  # {"position", "pool", "player": card}
+
+
+def player_card(player: Player) -> Dict[str, Any]:
+    """Public, JSON-ready view of a player for lot announcements."""
+    return LotPlayerCard.model_validate(player, from_attributes=True).model_dump(mode="json")
+
+
+def _lot_entry(lot: AuctionLot, player: Player) -> LotEntry:
+    return {"position": lot.position, "pool": lot.pool, "player": player_card(player)}
+
+
+async def _position_of(session: AsyncSession, auction_id: str, player_id: Optional[str]) -> int:
+    """Catalog position of a player, or 0 if it is not in the catalog."""
+    if not player_id:
+        return 0
+    res = await session.execute(
+        select(AuctionLot.position).where(AuctionLot.auction_id == auction_id, AuctionLot.player_id == player_id)
+    )
+    return res.scalar() or 0
+
+
+def _available_after(auction_id: str, position: int, exclude_player_id: Optional[str], *columns):
+    """Lots after `position` whose player is still available, in running order."""
+    stmt = (
+        select(*(columns or (AuctionLot, Player)))
+        .join(Player, Player.id == AuctionLot.player_id)
+        .where(
+            AuctionLot.auction_id == auction_id,
+            AuctionLot.position > position,
+            Player.status == PlayerStatusEnum.AVAILABLE.value,
+        )
+        .order_by(AuctionLot.position)
+    )
+    if exclude_player_id:
+        stmt = stmt.where(AuctionLot.player_id != exclude_player_id)
+    return stmt
+
+
+class LotCatalog:
+    """Upcoming lots per auction, kept warm and pushed to the auction room."""
+
+    def __init__(self, prefetch_count: int = 3):
+        self.prefetch_count = prefetch_count
+        self._upcoming: Dict[str, List[LotEntry]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._dirty: Set[str] = set()
+        self._running = False
+
+    async def start(self) -> None:
+        if not self._running:
+            self._running = True
+            event_log.subscribe(self.on_event)
+
+    async def stop(self) -> None:
+        if not self._running:
+            return
+        self._running = False
+        event_log.unsubscribe(self.on_event)
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def on_event(self, event: AuctionEventEntry) -> None:
+        if event.type in ("auction_started", "player_updated"):
+            self.schedule(event.auction_id)
+        elif event.type == "auction_ended":
+            self._upcoming.pop(event.auction_id, None)
+
+    def schedule(self, auction_id: str) -> None:
+        """Refresh and push the upcoming lots in the background."""
+        if auction_id in self._tasks:
+            self._dirty.add(auction_id)
+            return
+        self._tasks[auction_id] = asyncio.create_task(self._run(auction_id))
+
+    async def _run(self, auction_id: str) -> None:
+        try:
+            while True:
+                self._dirty.discard(auction_id)
+                try:
+                    await self.refresh(auction_id)
+                except Exception as exc:
+                    logger.warning("Prefetching lots for auction %s failed: %s", auction_id, exc)
+                if auction_id not in self._dirty:
+                    break
+        finally:
+            self._tasks.pop(auction_id, None)
+
+    def cached_card(self, auction_id: str, player_id: str) -> Optional[Dict[str, Any]]:
+        for entry in self._upcoming.get(auction_id, ()):
+            if entry["player"]["id"] == player_id:
+                return entry["player"]
+        return None
+
+    async def upcoming(self, auction_id: str) -> List[LotEntry]:
+        entries = self._upcoming.get(auction_id)
+        if entries is None:
+            entries = await self.refresh(auction_id, push=False)
+        return entries
+
+    async def refresh(self, auction_id: str, push: bool = True) -> List[LotEntry]:
+        """Load the next lots after the current one, cache them and optionally push them."""
+        async with AsyncSessionLocal() as session:
+            res = await session.execute(select(Auction.current_player_id).where(Auction.id == auction_id))
+            current_player_id = res.scalar()
+            position = await _position_of(session, auction_id, current_player_id)
+            res = await session.execute(
+                _available_after(auction_id, position, current_player_id).limit(self.prefetch_count)
+            )
+            entries = [_lot_entry(lot, player) for lot, player in res.all()]
+
+        self._upcoming[auction_id] = entries
+        if push:
+            # Every worker refreshes on the same events and pushes to its own sockets
+            await manager.broadcast_local(f"auction:{auction_id}", {
+                "type": "upcoming_lots",
+                "auction_id": auction_id,
+                "current_player_id": current_player_id,
+                "lots": entries,
+                "timestamp": datetime.utcnow().isoformat(),
+            })
+        return entries
+
+
+async def set_lots(session: AsyncSession, auction_id: str, lots: List[Tuple[str, Optional[str]]]) -> List[LotEntry]:
+    """Replace an auction's catalog with `lots` [(player_id, pool), ...] in running order."""
+    player_ids = [player_id for player_id, _ in lots]
+    if len(set(player_ids)) != len(player_ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A player can only appear once in the catalog")
+
+    async def unit():
+        auction = await _get_auction(session, auction_id)
+        if auction.status == AuctionStatusEnum.COMPLETED.value:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Auction has ended")
+
+        res = await session.execute(select(Player.id).where(Player.id.in_(player_ids)))
+        missing = set(player_ids) - set(res.scalars().all())
+        if missing:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Player not found: {sorted(missing)[0]}")
+
+        note_lock(session, AuctionLot)
+        await session.execute(delete(AuctionLot).where(AuctionLot.auction_id == auction_id))
+        await session.execute(insert(AuctionLot), [
+            {"auction_id": auction_id, "position": position, "player_id": player_id, "pool": pool}
+            for position, (player_id, pool) in enumerate(lots, start=1)
+        ])
+
+    await run_transaction(session, unit, "set_lots")
+    await lot_catalog.refresh(auction_id)
+    return await list_lots(session, auction_id)
+
+
+async def list_lots(session: AsyncSession, auction_id: str) -> List[LotEntry]:
+    res = await session.execute(select(Auction.id).where(Auction.id == auction_id))
+    if res.scalar() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
+    res = await session.execute(
+        select(AuctionLot, Player)
+        .join(Player, Player.id == AuctionLot.player_id)
+        .where(AuctionLot.auction_id == auction_id)
+        .order_by(AuctionLot.position)
+    )
+    return [_lot_entry(lot, player) for lot, player in res.all()]
+
+
+async def advance_lot(session: AsyncSession, auction_id: str) -> Auction:
+    """Resolve the current lot and open the next available lot of the catalog.
+
+    The current player is sold to the highest bidder, or marked unsold if
+    nobody bid; a lot that was already resolved is left as is. If the
+    catalog has no available lot left the auction is left without a
+    current player.
+    """
+    async def unit():
+        auction = await _get_auction(session, auction_id)
+        if auction.status == AuctionStatusEnum.COMPLETED.value:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Auction has ended")
+
+        events: List[AuctionEventEntry] = []
+        current_player_id = auction.current_player_id
+        position = await _position_of(session, auction_id, current_player_id)
+        if current_player_id:
+            player = await lock_row(session, Player, Player.id == current_player_id)
+            if player is not None and player.status == PlayerStatusEnum.AVAILABLE.value:
+                if auction.current_bidder_id:
+                    events.append(await _sell_current_lot(session, auction, player))
+                else:
+                    events.append(await _unsell_current_lot(session, auction, player))
+
+        res = await session.execute(
+            _available_after(
+                auction_id, position, current_player_id,
+                AuctionLot.position, AuctionLot.pool, AuctionLot.player_id,
+            ).limit(1)
+        )
+        next_lot = res.first()
+
+        auction.current_player_id = next_lot.player_id if next_lot else None
+        auction.current_bid = None
+        auction.current_bidder_id = None
+        session.add(auction)
+        await release_commitment(session, auction_id)
+
+        card = None
+        if next_lot is not None:
+            card = lot_catalog.cached_card(auction_id, next_lot.player_id)
+            if card is None:
+                res = await session.execute(select(Player).where(Player.id == next_lot.player_id))
+                card = player_card(res.scalars().one())
+        events.append(await append_event(session, auction, "player_updated", {
+            "current_player_id": auction.current_player_id,
+            "status": auction.status,
+            "position": next_lot.position if next_lot else None,
+            "pool": next_lot.pool if next_lot else None,
+            "player": card,
+            "timestamp": datetime.utcnow().isoformat(),
+        }))
+        return auction, events
+
+    async with auction_engine.transition(auction_id):
+        auction, events = await run_transaction(session, unit, "advance_lot")
+    await session.refresh(auction)
+
+    for event in events:
+        await _publish(event)
+    return auction
+
+
+# Global catalog instance
+lot_catalog = LotCatalog(prefetch_count=settings.lot_prefetch_count)
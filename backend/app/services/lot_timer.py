@@ -0,0 +1,225 @@
+"""Automatic lot countdown.
+
+Enabled with ``LOT_TIMER_ENABLED``. Every ongoing auction whose current
+player is still up for sale has a countdown of ``LOT_COUNTDOWN_SECONDS``
+that restarts on each accepted bid. While it runs, `lot_countdown`
+messages go to the auction room once per ``LOT_TICK_INTERVAL_MS`` and at
+each phase change (open -> going_once -> going_twice). When it reaches
+zero the lot is sold to the highest bidder, or marked unsold if nobody bid;
+which one is decided from the locked auction row, not from the events this
+worker has seen, so a bid that lands at the deadline is never wiped.
+
+The countdown follows the event log (`event_log.subscribe`): it arms on
+auction_started / player_updated, restarts on bid_placed and disarms when
+the lot is resolved or the auction is paused, cancelled or ended. All
+countdowns share one `TimingWheel` task; restarting a countdown only moves
+its deadline.
+
+Resolution passes `expected_player_id`, so a countdown that lost a race
+with an admin action (or another worker) is rejected instead of resolving
+the next lot.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Set
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.core.timing_wheel import TimingWheel
+from app.db.session import AsyncSessionLocal
+from app.models import Auction, Player
+from app.models.enums import AuctionStatusEnum, PlayerStatusEnum
+from app.services.auction_service import resolve_current_lot
+from app.services.event_log import AuctionEventEntry, event_log
+from app.websocket.manager import manager
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PHASE_OPEN = "open"
+PHASE_GOING_ONCE = "going_once"
+PHASE_GOING_TWICE = "going_twice"
+
+# Events that end the current countdown
+_DISARM_EVENTS = {"auction_paused", "auction_cancelled", "auction_ended", "player_sold", "player_unsold"}
+
+active_lots = metrics.gauge("lot_timer_active", "Lots with a running countdown")
+expirations = metrics.counter("lot_timer_expirations_total", "Countdowns that reached zero by outcome", ("outcome",))
+
+
+@dataclass
+class LotCountdown:
+    auction_id: str
+    player_id: str
+    deadline: float  # loop time
+
+
+class LotTimer:
+    """Countdowns for every ongoing lot, driven by one timing wheel."""
+
+    def __init__(
+        self,
+        countdown_seconds: float,
+        going_once_seconds: float,
+        going_twice_seconds: float,
+        tick_interval_ms: int,
+        wheel: TimingWheel,
+    ):
+        self.countdown = countdown_seconds
+        self.going_once = going_once_seconds
+        self.going_twice = going_twice_seconds
+        self.tick_interval = tick_interval_ms / 1000
+        self.wheel = wheel
+        self.lots: Dict[str, LotCountdown] = {}
+        self._last_seq: Dict[str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._running = False
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        event_log.subscribe(self.on_event)
+        await self.wheel.start()
+        await self._recover()
+
+    async def stop(self) -> None:
+        if not self._running:
+            return
+        self._running = False
+        event_log.unsubscribe(self.on_event)
+        await self.wheel.stop()
+        for auction_id in list(self.lots):
+            self._disarm(auction_id)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------- events
+
+    async def on_event(self, event: AuctionEventEntry) -> None:
+        auction_id = event.auction_id
+        if event.seq <= self._last_seq.get(auction_id, 0):
+            return
+        self._last_seq[auction_id] = event.seq
+
+        if event.type == "auction_started":
+            self._arm(auction_id, event.payload.get("current_player_id"))
+        elif event.type == "player_updated":
+            if event.payload.get("status") == AuctionStatusEnum.ONGOING.value:
+                self._arm(auction_id, event.payload.get("current_player_id"))
+            else:
+                self._disarm(auction_id)
+        elif event.type == "bid_placed":
+            lot = self.lots.get(auction_id)
+            if lot is not None:
+                lot.deadline = self._now() + self.countdown
+        elif event.type in _DISARM_EVENTS:
+            self._disarm(auction_id)
+            if event.type == "auction_ended":
+                self._last_seq.pop(auction_id, None)
+
+    async def _recover(self) -> None:
+        """Arm a full countdown for lots left open by a previous process."""
+        async with AsyncSessionLocal() as session:
+            res = await session.execute(
+                select(Auction.id, Auction.current_player_id, Auction.last_event_seq)
+                .join(Player, Player.id == Auction.current_player_id)
+                .where(
+                    Auction.status == AuctionStatusEnum.ONGOING.value,
+                    Player.status == PlayerStatusEnum.AVAILABLE.value,
+                )
+            )
+            rows = res.all()
+        for row in rows:
+            if row.id in self.lots:
+                continue
+            self._last_seq[row.id] = max(self._last_seq.get(row.id, 0), row.last_event_seq or 0)
+            self._arm(row.id, row.current_player_id)
+
+    # ---------------------------------------------------------- countdown
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+    def _arm(self, auction_id: str, player_id: Optional[str]) -> None:
+        if not player_id:
+            self._disarm(auction_id)
+            return
+        self.lots[auction_id] = LotCountdown(auction_id, player_id, self._now() + self.countdown)
+        active_lots.set(len(self.lots))
+        self._on_timer(auction_id)
+
+    def _disarm(self, auction_id: str) -> None:
+        self.wheel.cancel(auction_id)
+        if self.lots.pop(auction_id, None) is not None:
+            active_lots.set(len(self.lots))
+
+    def _phase(self, remaining: float) -> str:
+        if remaining <= self.going_twice:
+            return PHASE_GOING_TWICE
+        if remaining <= self.going_once:
+            return PHASE_GOING_ONCE
+        return PHASE_OPEN
+
+    def _on_timer(self, auction_id: str) -> None:
+        lot = self.lots.get(auction_id)
+        if lot is None:
+            return
+        remaining = lot.deadline - self._now()
+        if remaining <= self.wheel.tick / 2:
+            self._disarm(auction_id)
+            self._spawn(self._expire(lot))
+            return
+
+        # Every worker runs the same countdown from the shared event stream
+        self._spawn(manager.broadcast_local(f"auction:{auction_id}", {
+            "type": "lot_countdown",
+            "auction_id": auction_id,
+            "player_id": lot.player_id,
+            "remaining": round(remaining, 1),
+            "phase": self._phase(remaining),
+            "timestamp": datetime.utcnow().isoformat(),
+        }))
+
+        # Next tick, or sooner if a phase boundary or the deadline comes first
+        delay = self.tick_interval
+        for boundary in (self.going_once, self.going_twice, 0):
+            if remaining - boundary > 1e-3:
+                delay = min(delay, remaining - boundary)
+        self.wheel.schedule(auction_id, delay, lambda: self._on_timer(auction_id))
+
+    async def _expire(self, lot: LotCountdown) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                event = await resolve_current_lot(session, lot.auction_id, expected_player_id=lot.player_id)
+            expirations.inc(outcome="sold" if event.type == "player_sold" else "unsold")
+        except HTTPException as exc:
+            expirations.inc(outcome="skipped")
+            logger.info("Lot countdown for auction %s not applied: %s", lot.auction_id, exc.detail)
+        except Exception as exc:
+            expirations.inc(outcome="failed")
+            logger.error("Lot countdown for auction %s failed: %s", lot.auction_id, exc, exc_info=exc)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+# Global lot timer instance
+lot_timer = LotTimer(
+    countdown_seconds=settings.lot_countdown_seconds,
+    going_once_seconds=settings.lot_going_once_seconds,
+    going_twice_seconds=settings.lot_going_twice_seconds,
+    tick_interval_ms=settings.lot_tick_interval_ms,
+    wheel=TimingWheel(tick_ms=settings.timer_wheel_tick_ms, slots=settings.timer_wheel_slots),
+)
@@ -0,0 +1,486 @@
+"""In-memory match scoreboards.
+
+A match's score is a fold over its events (`match_events`). Instead of
+replaying every ball on each update or read, each worker keeps the folded
+state of the matches it serves and applies each new event to it in O(1):
+
+- an append (`match_service.append_match_event`) validates the event against
+  the scoreboard at the match's current sequence number, applies it to a
+  copy inside the transaction, and installs the copy once committed;
+- a scoreboard is rebuilt only when this worker has none at the match's
+  current sequence number (first use, eviction, or an event another worker
+  appended that has not reached this one yet). Rebuilding starts from the
+  match's latest snapshot (`match_snapshots`, stored with every
+  ``MATCH_SNAPSHOT_INTERVAL``-th event) and replays only the events after
+  it, so it costs the same for a T20 and a five-day Test;
+- match events broadcast by other workers carry the event and its sequence
+  number (plus a compact delta for clients, never the whole scoreboard, which
+  would outgrow a NOTIFY on a long match). A worker applies such an event to
+  its scoreboard when it directly follows it; on a gap it drops the
+  scoreboard so the next read rebuilds it (`ingest_remote`). When the broker
+  reconnects (messages may have been lost) every scoreboard is dropped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.models import Match, MatchEvent, MatchSnapshot
+from app.models.enums import EventTypeEnum, MatchStatusEnum
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+scoreboard_reads = metrics.counter("match_scoreboard_reads_total", "Match scoreboard lookups", ("result",))
+scoreboard_replays = metrics.counter("match_scoreboard_replayed_events_total", "Match events replayed to rebuild scoreboards")
+snapshot_writes = metrics.counter("match_snapshots_written_total", "Match scoreboard snapshots stored")
+scoreboard_drops = metrics.counter("match_scoreboard_invalidations_total", "Match scoreboards dropped", ("reason",))
+
+EXTRA_LABELS = {"wide": "wd", "no_ball": "nb", "bye": "b", "leg_bye": "lb"}
+NOT_A_DELIVERY = ("wide", "no_ball")  # extras that do not count as a ball of the over
+NOT_OFF_THE_BAT = ("wide", "bye", "leg_bye")  # runs not credited to the batter
+NOT_THE_BOWLERS_RUNS = ("bye", "leg_bye")
+NOT_THE_BOWLERS_WICKET = ("run_out",)
+MAX_WICKETS = 10
+DELTA_OVER_LABELS = 24  # `this_over` entries a delta carries; only runaway overs have more
+
+
+def _invalid(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def _conflict(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
+def _count(data: Dict[str, Any], key: str, upper: int) -> int:
+    value = data.get(key, 0)
+    if not isinstance(value, int) or isinstance(value, bool) or not 0 <= value <= upper:
+        raise _invalid(f"{key} must be an integer from 0 to {upper}")
+    return value
+
+
+def _player(data: Dict[str, Any], key: str) -> Optional[str]:
+    value = data.get(key)
+    if value is not None and (not isinstance(value, str) or len(value) > 36):
+        raise _invalid(f"{key} must be a player id")
+    return value
+
+
+# Figures are immutable: scoreboard copies share them and replace the ones that change
+
+
+@dataclass(frozen=True)
+class BattingFigures:
+    player_id: str
+    runs: int = 0
+    balls: int = 0
+    fours: int = 0
+    sixes: int = 0
+    out: Optional[str] = None  # how the batter was dismissed
+
+
+@dataclass(frozen=True)
+class BowlingFigures:
+    player_id: str
+    balls: int = 0  # legal deliveries
+    runs: int = 0
+    wickets: int = 0
+
+
+@dataclass
+class InningsScore:
+    number: int
+    batting_team_id: str
+    runs: int = 0
+    wickets: int = 0
+    balls: int = 0  # legal deliveries
+    extras: int = 0
+    closed: bool = False
+    batting: Dict[str, BattingFigures] = field(default_factory=dict)  # in batting order
+    bowling: Dict[str, BowlingFigures] = field(default_factory=dict)  # in bowling order
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "number": self.number,
+            "batting_team_id": self.batting_team_id,
+            "runs": self.runs,
+            "wickets": self.wickets,
+            "balls": self.balls,
+            "overs": f"{self.balls // 6}.{self.balls % 6}",
+            "extras": self.extras,
+            "closed": self.closed,
+            "batting": [asdict(figures) for figures in self.batting.values()],
+            "bowling": [asdict(figures) for figures in self.bowling.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InningsScore":
+        batting = [BattingFigures(**item) for item in data.get("batting", ())]
+        bowling = [BowlingFigures(**item) for item in data.get("bowling", ())]
+        return cls(
+            number=data["number"],
+            batting_team_id=data["batting_team_id"],
+            runs=data["runs"],
+            wickets=data["wickets"],
+            balls=data["balls"],
+            extras=data["extras"],
+            closed=data["closed"],
+            batting={figures.player_id: figures for figures in batting},
+            bowling={figures.player_id: figures for figures in bowling},
+        )
+
+
+@dataclass
+class Scoreboard:
+    """State of one match as of event `last_seq`."""
+
+    match_id: str
+    status: str
+    team_1_id: str
+    team_2_id: str
+    innings: List[InningsScore] = field(default_factory=list)
+    this_over: List[str] = field(default_factory=list)
+    totals: Dict[str, int] = field(default_factory=dict)  # team id -> runs over all its innings
+    winner_team_id: Optional[str] = None
+    last_seq: int = 0
+
+    @classmethod
+    def empty(cls, match: Match) -> "Scoreboard":
+        """The scoreboard of `match` before any event."""
+        return cls(
+            match_id=match.id,
+            status=MatchStatusEnum.SCHEDULED.value,
+            team_1_id=match.team_1_id,
+            team_2_id=match.team_2_id,
+            totals={match.team_1_id: 0, match.team_2_id: 0},
+        )
+
+    def copy(self) -> "Scoreboard":
+        # At most four innings of at most a few dozen figures: bounded, not
+        # growing with the number of events
+        return replace(
+            self,
+            innings=[
+                replace(innings, batting=dict(innings.batting), bowling=dict(innings.bowling))
+                for innings in self.innings
+            ],
+            this_over=list(self.this_over),
+            totals=dict(self.totals),
+        )
+
+    @property
+    def current_innings(self) -> Optional[InningsScore]:
+        if self.innings and not self.innings[-1].closed:
+            return self.innings[-1]
+        return None
+
+    def apply(self, seq: int, event_type: str, data: Dict[str, Any]) -> None:
+        """Apply the event that follows this scoreboard.
+
+        Raises 409 when the event does not fit the state of the match and 400
+        when its data is invalid; the scoreboard is unchanged in both cases.
+        """
+        if event_type == EventTypeEnum.MATCH_STARTED.value:
+            if self.status != MatchStatusEnum.SCHEDULED.value:
+                raise _conflict("Match has already started")
+            self.status = MatchStatusEnum.ONGOING.value
+        elif event_type == EventTypeEnum.MATCH_ENDED.value:
+            if self.status != MatchStatusEnum.ONGOING.value:
+                raise _conflict("Match is not in progress")
+            winner = data.get("winner_team_id")
+            if winner is not None and winner not in (self.team_1_id, self.team_2_id):
+                raise _invalid("winner_team_id must be one of the match's teams")
+            if self.current_innings is not None:
+                self.current_innings.closed = True
+            self.status = MatchStatusEnum.COMPLETED.value
+            self.winner_team_id = winner
+            self.this_over = []
+        else:
+            if self.status != MatchStatusEnum.ONGOING.value:
+                raise _conflict("Match is not in progress")
+            self._apply_play(event_type, data)
+        self.last_seq = seq
+
+    def _apply_play(self, event_type: str, data: Dict[str, Any]) -> None:
+        innings = self.current_innings
+        if event_type == EventTypeEnum.INNINGS_STARTED.value:
+            if innings is not None:
+                raise _conflict("An innings is already in progress")
+            team_id = data.get("batting_team_id")
+            if team_id not in (self.team_1_id, self.team_2_id):
+                raise _invalid("batting_team_id must be one of the match's teams")
+            self.innings.append(InningsScore(number=len(self.innings) + 1, batting_team_id=team_id))
+            self.this_over = []
+            return
+
+        if innings is None:
+            raise _conflict("No innings in progress")
+        if event_type == EventTypeEnum.OVER_COMPLETED.value:
+            self.this_over = []
+        elif event_type == EventTypeEnum.INNINGS_ENDED.value:
+            innings.closed = True
+            self.this_over = []
+        elif event_type in (EventTypeEnum.RUN_SCORED.value, EventTypeEnum.WICKET.value):
+            wicket = event_type == EventTypeEnum.WICKET.value
+            if wicket and innings.wickets >= MAX_WICKETS:
+                raise _conflict("All wickets have fallen")
+            runs = _count(data, "runs", 7)
+            extras = _count(data, "extras", 7)
+            extra_type = data.get("extra_type")
+            if extra_type is not None and extra_type not in EXTRA_LABELS:
+                raise _invalid(f"extra_type must be one of {', '.join(EXTRA_LABELS)}")
+            batter_id = _player(data, "batter_id")
+            bowler_id = _player(data, "bowler_id")
+            batter = (innings.batting.get(batter_id) or BattingFigures(batter_id)) if batter_id else None
+            if batter is not None and batter.out:
+                raise _conflict("Batter is already out")
+
+            delivery = extra_type not in NOT_A_DELIVERY
+            off_the_bat = runs if extra_type not in NOT_OFF_THE_BAT else 0
+            conceded = (runs if extra_type not in NOT_THE_BOWLERS_RUNS else 0) + (extras if not delivery else 0)
+            innings.runs += runs + extras
+            innings.extras += extras + (runs - off_the_bat)
+            innings.wickets += wicket
+            innings.balls += delivery
+            self.totals[innings.batting_team_id] = self.totals.get(innings.batting_team_id, 0) + runs + extras
+            if batter is not None:
+                innings.batting[batter_id] = replace(
+                    batter,
+                    runs=batter.runs + off_the_bat,
+                    balls=batter.balls + (extra_type != "wide"),
+                    fours=batter.fours + (off_the_bat == 4),
+                    sixes=batter.sixes + (off_the_bat == 6),
+                    out=str(data.get("kind") or "out") if wicket else None,
+                )
+            if bowler_id is not None:
+                bowler = innings.bowling.get(bowler_id) or BowlingFigures(bowler_id)
+                innings.bowling[bowler_id] = replace(
+                    bowler,
+                    balls=bowler.balls + delivery,
+                    runs=bowler.runs + conceded,
+                    wickets=bowler.wickets + (wicket and data.get("kind") not in NOT_THE_BOWLERS_WICKET),
+                )
+
+            label = str(runs + extras) if runs + extras or not wicket else ""
+            if extra_type is not None:
+                label = f"{label}{EXTRA_LABELS[extra_type]}"
+            self.this_over.append(f"{label}W" if wicket else label)
+        else:
+            raise _invalid(f"Unknown event type {event_type}")
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The scoreboard as returned by the API and sent on the match's WebSocket room."""
+        return {
+            "match_id": self.match_id,
+            "status": self.status,
+            "team_1_id": self.team_1_id,
+            "team_2_id": self.team_2_id,
+            "team_1_score": self.totals.get(self.team_1_id, 0),
+            "team_2_score": self.totals.get(self.team_2_id, 0),
+            "innings": [innings.as_dict() for innings in self.innings],
+            "this_over": list(self.this_over),
+            "winner_team_id": self.winner_team_id,
+            "last_seq": self.last_seq,
+        }
+
+    def delta(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """What the event with `data` left changed, small enough for any match.
+
+        The score line, the latest innings without its figures, and the
+        figures of the batter and bowler the event names.
+        """
+        delta = {
+            "status": self.status,
+            "team_1_score": self.totals.get(self.team_1_id, 0),
+            "team_2_score": self.totals.get(self.team_2_id, 0),
+            "innings": None,
+            "this_over": self.this_over[-DELTA_OVER_LABELS:],
+            "winner_team_id": self.winner_team_id,
+            "last_seq": self.last_seq,
+        }
+        if self.innings:
+            innings = self.innings[-1]
+            batter = innings.batting.get(data.get("batter_id"))
+            bowler = innings.bowling.get(data.get("bowler_id"))
+            delta["innings"] = dict(
+                innings.as_dict(),
+                batting=[asdict(batter)] if batter else [],
+                bowling=[asdict(bowler)] if bowler else [],
+            )
+        return delta
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Scoreboard":
+        innings = [InningsScore.from_dict(item) for item in data["innings"]]
+        return cls(
+            match_id=data["match_id"],
+            status=data["status"],
+            team_1_id=data["team_1_id"],
+            team_2_id=data["team_2_id"],
+            innings=innings,
+            this_over=list(data["this_over"]),
+            totals={data["team_1_id"]: data["team_1_score"], data["team_2_id"]: data["team_2_score"]},
+            winner_team_id=data.get("winner_team_id"),
+            last_seq=data["last_seq"],
+        )
+
+
+def parse_event_data(raw: Optional[str]) -> Dict[str, Any]:
+    """The JSON object stored in `MatchEvent.event_data` (empty when missing)."""
+    if not raw:
+        return {}
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        raise _invalid("event_data must be a JSON object")
+    if not isinstance(data, dict):
+        raise _invalid("event_data must be a JSON object")
+    return data
+
+
+def snapshot_due(seq: int) -> bool:
+    """Whether the event numbered `seq` is stored with a snapshot."""
+    interval = settings.match_snapshot_interval
+    return interval > 0 and seq % interval == 0
+
+
+def snapshot_row(board: Scoreboard) -> MatchSnapshot:
+    snapshot_writes.inc()
+    return MatchSnapshot(match_id=board.match_id, sequence_number=board.last_seq, state=json.dumps(board.as_dict()))
+
+
+async def latest_snapshot(session: AsyncSession, match: Match) -> Optional[Scoreboard]:
+    """The scoreboard from the match's most recent snapshot, if any is usable."""
+    res = await session.execute(
+        select(MatchSnapshot.state)
+        .where(MatchSnapshot.match_id == match.id, MatchSnapshot.sequence_number <= (match.last_event_seq or 0))
+        .order_by(MatchSnapshot.sequence_number.desc())
+        .limit(1)
+    )
+    state = res.scalar()
+    if state is None:
+        return None
+    try:
+        return Scoreboard.from_dict(json.loads(state))
+    except (ValueError, KeyError, TypeError) as exc:
+        logger.warning("Ignoring unreadable snapshot of match %s: %s", match.id, exc)
+        return None
+
+
+async def replay(session: AsyncSession, match: Match, use_snapshots: bool = True) -> Scoreboard:
+    """Rebuild the scoreboard of `match`: its latest snapshot, then the events after it."""
+    board = await latest_snapshot(session, match) if use_snapshots else None
+    if board is None:
+        board = Scoreboard.empty(match)
+    res = await session.execute(
+        select(MatchEvent.sequence_number, MatchEvent.event_type, MatchEvent.event_data)
+        .where(MatchEvent.match_id == match.id, MatchEvent.sequence_number > board.last_seq)
+        .order_by(MatchEvent.sequence_number)
+    )
+    replayed = 0
+    for seq, event_type, raw in res.all():
+        replayed += 1
+        try:
+            board.apply(seq, event_type, parse_event_data(raw))
+        except HTTPException as exc:
+            # Recorded before validation existed (e.g. by an external tool): skip its effect
+            logger.warning("Skipping match %s event #%d (%s): %s", match.id, seq, event_type, exc.detail)
+            board.last_seq = seq
+    scoreboard_replays.inc(replayed)
+    return board
+
+
+class MatchScoreboardStore:
+    """Scoreboards of recently used matches, least recently used evicted first."""
+
+    def __init__(self, capacity: int = 200):
+        self.capacity = capacity
+        self._boards: "OrderedDict[str, Scoreboard]" = OrderedDict()
+        self._gates: Dict[str, asyncio.Lock] = {}
+
+    def gate(self, match_id: str) -> asyncio.Lock:
+        """Serializes this worker's appends (and their broadcasts) for one match."""
+        return self._gates.setdefault(match_id, asyncio.Lock())
+
+    def at(self, match_id: str, seq: int) -> Optional[Scoreboard]:
+        """The cached scoreboard if it is exactly at `seq`."""
+        board = self._boards.get(match_id)
+        if board is not None and board.last_seq == seq:
+            scoreboard_reads.inc(result="hit")
+            return board
+        return None
+
+    def latest(self, match_id: str) -> Optional[Scoreboard]:
+        """The cached scoreboard, however old; never loads."""
+        return self._boards.get(match_id)
+
+    def install(self, board: Scoreboard) -> None:
+        """Keep `board` unless a newer scoreboard of the match is already cached."""
+        current = self._boards.get(board.match_id)
+        if current is not None and current.last_seq > board.last_seq:
+            return
+        self._boards[board.match_id] = board
+        self._boards.move_to_end(board.match_id)
+        while len(self._boards) > self.capacity:
+            self._boards.popitem(last=False)
+
+    def clear(self) -> None:
+        self._boards.clear()
+
+    async def get(self, session: AsyncSession, match_id: str) -> Optional[Scoreboard]:
+        """The match's scoreboard, or None if the match does not exist."""
+        board = self._boards.get(match_id)
+        if board is not None:
+            self._boards.move_to_end(match_id)
+            scoreboard_reads.inc(result="hit")
+            return board
+        async with self.gate(match_id):
+            board = self._boards.get(match_id)
+            if board is not None:
+                scoreboard_reads.inc(result="hit")
+                return board
+            res = await session.execute(select(Match).where(Match.id == match_id))
+            match = res.scalars().first()
+            if match is None:
+                return None
+            scoreboard_reads.inc(result="replay")
+            board = await replay(session, match)
+            self.install(board)
+            return board
+
+    async def ingest_remote(self, room: str, message: Dict[str, Any]) -> None:
+        """Apply a match event another worker appended and broadcast."""
+        if not room.startswith("match:") or "seq" not in message:
+            return
+        match_id = room.split(":", 1)[1]
+        board = self._boards.get(match_id)
+        if board is None or not isinstance(message["seq"], int) or message["seq"] <= board.last_seq:
+            return
+        if message["seq"] == board.last_seq + 1:
+            board = board.copy()
+            try:
+                board.apply(message["seq"], message["type"], message.get("data") or {})
+            except (HTTPException, KeyError, TypeError) as exc:
+                logger.warning("Could not apply %s#%d to its scoreboard: %s", match_id, message["seq"], exc)
+            else:
+                self.install(board)
+                return
+        # Missed events (or one that does not apply): rebuild on the next read
+        if self._boards.pop(match_id, None) is not None:
+            scoreboard_drops.inc(reason="gap")
+
+
+# Global scoreboard store instance
+match_scoreboards = MatchScoreboardStore(capacity=settings.match_scoreboard_capacity)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.transactions import lock_row, run_transaction
+from app.models import Match, MatchEvent, Team
+from app.models.enums import EventTypeEnum, MatchStatusEnum
+from app.schemas.match import MatchCreate, MatchEventCreate
+from app.services.match_scoreboard import (
+    Scoreboard,
+    match_scoreboards,
+    parse_event_data,
+    replay,
+    scoreboard_reads,
+    snapshot_due,
+    snapshot_row,
+)
+from app.websocket.manager import manager
+
+
+async def create_match(session: AsyncSession, payload: MatchCreate) -> Match:
+    if payload.team_1_id == payload.team_2_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A match needs two different teams")
+    team_ids = [str(payload.team_1_id), str(payload.team_2_id)]
+    res = await session.execute(select(Team.id).where(Team.id.in_(team_ids)))
+    if len(res.scalars().all()) != 2:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
+
+    match = Match(
+        id=str(uuid4()),
+        name=payload.name,
+        match_type=payload.match_type,
+        status=MatchStatusEnum.SCHEDULED.value,
+        team_1_id=team_ids[0],
+        team_2_id=team_ids[1],
+        scheduled_at=payload.scheduled_at,
+        team_1_score=0,
+        team_2_score=0,
+        last_event_seq=0,
+    )
+
+    async def unit():
+        session.add(match)
+
+    await run_transaction(session, unit, "create_match")
+    await session.refresh(match)
+    return match
+
+
+async def list_matches(session: AsyncSession, status_filter: Optional[str] = None, limit: int = 100, offset: int = 0) -> List[Match]:
+    stmt = select(Match).order_by(Match.scheduled_at).limit(limit).offset(offset)
+    if status_filter:
+        stmt = stmt.where(Match.status == status_filter)
+    result = await session.execute(stmt)
+    return result.scalars().all()
+
+
+async def get_match(session: AsyncSession, match_id: str) -> Optional[Match]:
+    result = await session.execute(select(Match).where(Match.id == match_id))
+    return result.scalars().first()
+
+
+async def list_match_events(session: AsyncSession, match_id: str, after_seq: int = 0, limit: int = 100) -> List[MatchEvent]:
+    result = await session.execute(
+        select(MatchEvent)
+        .where(MatchEvent.match_id == match_id, MatchEvent.sequence_number > after_seq)
+        .order_by(MatchEvent.sequence_number)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+def _event_message(event: MatchEvent, data: Dict[str, Any], board: Scoreboard) -> Dict[str, Any]:
+    """What the match's WebSocket room (and every other worker) receives for an appended event.
+
+    Only the event and a delta: the whole scoreboard grows with the match and
+    would not fit the cross-worker broker's messages.
+    """
+    return {
+        "type": event.event_type,
+        "match_id": event.match_id,
+        "seq": event.sequence_number,
+        "data": data,
+        "delta": board.delta(data),
+        "timestamp": event.event_timestamp.isoformat(),
+    }
+
+
+def _apply_to_match(match: Match, board: Scoreboard, event_type: str, now: datetime) -> None:
+    """Bring the match row in line with the scoreboard after `event_type`."""
+    match.status = board.status
+    match.team_1_score = board.totals.get(match.team_1_id, 0)
+    match.team_2_score = board.totals.get(match.team_2_id, 0)
+    match.last_event_seq = board.last_seq
+    if event_type == EventTypeEnum.MATCH_STARTED.value:
+        match.started_at = now
+    elif event_type == EventTypeEnum.MATCH_ENDED.value:
+        match.ended_at = now
+        match.winner_team_id = board.winner_team_id
+
+
+async def append_match_event(session: AsyncSession, match_id: str, payload: MatchEventCreate) -> MatchEvent:
+    """Append the next event of a match and update its scoreboard.
+
+    The event is validated against the in-memory scoreboard, which is only
+    rebuilt (latest snapshot plus the events after it) when this worker does
+    not have it at the match's current sequence number. Every
+    MATCH_SNAPSHOT_INTERVAL-th event also stores a snapshot. The match row is
+    locked, so appends from every worker get consecutive sequence numbers.
+    """
+    data = parse_event_data(payload.event_data)
+
+    async def unit() -> Tuple[Match, MatchEvent, Scoreboard]:
+        match = await lock_row(session, Match, Match.id == match_id)
+        if not match:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Match not found")
+        seq = (match.last_event_seq or 0) + 1
+        if payload.expected_sequence_number is not None and payload.expected_sequence_number != seq:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Expected sequence number {payload.expected_sequence_number}, next is {seq}",
+            )
+
+        board = match_scoreboards.at(match.id, seq - 1)
+        if board is None:
+            scoreboard_reads.inc(result="replay")
+            board = await replay(session, match)
+        board = board.copy()
+        board.apply(seq, payload.event_type, data)
+
+        now = datetime.utcnow()
+        event = MatchEvent(
+            id=str(uuid4()),
+            match_id=match.id,
+            event_type=payload.event_type,
+            sequence_number=seq,
+            event_timestamp=now,
+            event_data=json.dumps(data) if data else None,
+        )
+        session.add(event)
+        if snapshot_due(seq):
+            session.add(snapshot_row(board))
+        _apply_to_match(match, board, payload.event_type, now)
+        session.add(match)
+        return match, event, board
+
+    async with match_scoreboards.gate(match_id):
+        match, event, board = await run_transaction(session, unit, "append_match_event")
+        # Committed: later appends (and reads) start from this scoreboard
+        match_scoreboards.install(board)
+        await manager.broadcast_to_room(f"match:{match_id}", _event_message(event, data, board))
+    await session.refresh(event)
+    return event
@@ -0,0 +1,133 @@
+"""Cached authenticated principals.
+
+Every authenticated request (each bid, each `GET /players` poll) needs to
+know who the caller is: id, role, whether the account is active and, for a
+team manager, their team. `principal_cache` keeps that per user id for
+PRINCIPAL_CACHE_TTL_SECONDS instead of selecting the user on every request.
+
+Changes are pushed rather than waited out: code that changes a user's role
+or active flag, or a team's manager, calls `invalidate(user_id)`, which drops
+the entry here and, through the WebSocket broker, on every other worker. The
+TTL bounds how long changes made outside the API (scripts, manual SQL) go
+unnoticed. A load that was in flight when an invalidation happened is
+returned but not cached.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.models import Team, User
+from app.websocket.manager import manager
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+INVALIDATION_ROOM = "principals"
+
+principal_reads = metrics.counter("principal_cache_reads_total", "Principal lookups by authenticated requests", ("result",))
+principal_drops = metrics.counter("principal_cache_invalidations_total", "Cached principals dropped", ("reason",))
+principal_entries = metrics.gauge("principal_cache_entries", "Principals cached by this worker")
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The user an access token belongs to, as far as authorization needs."""
+
+    id: str
+    role: str
+    is_active: bool
+    team_id: Optional[str] = None  # the team a team manager runs
+
+
+async def load_principal(session: AsyncSession, user_id: str) -> Optional[Principal]:
+    res = await session.execute(
+        select(User.id, User.role, User.is_active, Team.id)
+        .outerjoin(Team, Team.manager_id == User.id)
+        .where(User.id == user_id)
+        .limit(1)
+    )
+    row = res.first()
+    if row is None:
+        return None
+    return Principal(id=row[0], role=row[1] or "", is_active=bool(row[2]), team_id=row[3])
+
+
+class PrincipalCache:
+    """Principals by user id, expiring after `ttl_seconds`, least recently used evicted first."""
+
+    def __init__(self, ttl_seconds: float = 30, max_entries: int = 10000):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._generation = 0  # bumped by every invalidation
+
+    async def get(self, session: AsyncSession, user_id: str) -> Optional[Principal]:
+        """The user's principal, or None if the user does not exist."""
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(user_id)
+            principal_reads.inc(result="hit")
+            return entry[1]
+
+        principal_reads.inc(result="miss")
+        generation = self._generation
+        principal = await load_principal(session, user_id)
+        if principal is None:
+            self._entries.pop(user_id, None)
+        elif self.ttl > 0 and generation == self._generation:
+            self._entries[user_id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        principal_entries.set(len(self._entries))
+        return principal
+
+    def discard(self, *user_ids: str, reason: str = "changed") -> None:
+        """Drop principals on this worker only."""
+        self._generation += 1
+        for user_id in user_ids:
+            if self._entries.pop(user_id, None) is not None:
+                principal_drops.inc(reason=reason)
+        principal_entries.set(len(self._entries))
+
+    async def invalidate(self, *user_ids: Optional[str]) -> None:
+        """Drop principals on every worker; call after committing a change to them."""
+        user_ids = tuple(user_id for user_id in user_ids if user_id)
+        if not user_ids:
+            return
+        self.discard(*user_ids)
+        await manager.broadcast_to_room(INVALIDATION_ROOM, {"type": "principals_changed", "user_ids": list(user_ids)})
+
+    def clear(self, reason: str = "broker_reconnect") -> None:
+        """Drop every principal, e.g. when invalidations from other workers may have been lost."""
+        self._generation += 1
+        principal_drops.inc(len(self._entries), reason=reason)
+        self._entries.clear()
+        principal_entries.set(0)
+
+    async def ingest_remote(self, room: str, message: Dict[str, Any]) -> None:
+        """Apply an invalidation another worker broadcast."""
+        if room != INVALIDATION_ROOM:
+            return
+        user_ids = message.get("user_ids")
+        if not isinstance(user_ids, list):
+            logger.warning("Ignoring malformed principal invalidation: %s", message)
+            return
+        self.discard(*(str(user_id) for user_id in user_ids), reason="remote")
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+    max_entries=settings.principal_cache_max_entries,
+)
@@ -0,0 +1,400 @@
+"""Proxy (max) bidding.
+
+A team manager registers a ceiling for a player instead of re-sending
+`/bid` during a bidding war. Whenever the player's lot is open and a
+competing bid or ceiling appears, the server resolves all ceilings for the
+lot in one transaction and writes only the bids that matter: the runner-up
+at the highest amount it could reach and the winner one increment above it
+(or at its own ceiling). One resolution settles the lot until a new bid or
+ceiling arrives.
+
+A team's effective ceiling is also capped by `BUDGET_LIMIT` minus its spent
+budget and its pending commitments on other auctions. Equal ceilings go to
+the team that set theirs first; a team already holding the lot without a
+proxy bid keeps it at its current bid.
+
+Resolution runs after registering a ceiling and, through the event log,
+after every manual bid and lot change in this process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import uuid4
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.db.transactions import run_transaction, lock_row, lock_rows, note_lock
+from app.models import Auction, Bid, Player, ProxyBid, Team
+from app.models.enums import AuctionStatusEnum, PlayerStatusEnum
+from app.services.auction_engine import auction_engine
+from app.services.auction_service import (
+    BUDGET_LIMIT,
+    _get_auction,
+    _publish,
+    _validate_bid_amount,
+    _validate_budget,
+    _validate_ownership,
+)
+from app.services.commitment_ledger import record_commitment, pending_commitments
+from app.services.event_log import AuctionEventEntry, append_event, bid_event_payload, event_log
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+resolutions = metrics.counter("proxy_bid_resolutions_total", "Proxy bid resolutions by outcome", ("result",))
+proxy_bids_placed = metrics.counter("proxy_bids_placed_total", "Bids placed from proxy ceilings")
+
+
+@dataclass
+class Contender:
+    team_id: str
+    cap: int  # ceiling after budget limits
+    since: Optional[datetime]  # registration time; earlier wins ties, None before everyone
+    proxy: bool = True  # False for the incumbent bidder without a ceiling
+
+
+def plan_proxy_bids(
+    current_bid: Optional[int],
+    current_bidder_id: Optional[str],
+    base_price: Optional[int],
+    increment: int,
+    contenders: List[Contender],
+) -> List[Tuple[str, int]]:
+    """Compressed bid sequence `[(team_id, amount), ...]` that settles a lot.
+
+    Equivalent to the teams outbidding each other one increment at a time,
+    keeping only the runner-up's last bid and the winner's final bid.
+    """
+    need = (base_price or increment) if current_bid is None else current_bid + increment
+    field = [c for c in contenders if c.team_id != current_bidder_id and c.cap >= need]
+    if not field:
+        return []
+
+    incumbent = None
+    if current_bidder_id is not None:
+        own = next((c for c in contenders if c.team_id == current_bidder_id), None)
+        if own is None or own.cap < current_bid:
+            # Holds the lot at its current bid and wins ties against later ceilings
+            incumbent = Contender(current_bidder_id, current_bid, None, proxy=False)
+        else:
+            incumbent = own
+    ranked = sorted(
+        field + ([incumbent] if incumbent else []),
+        key=lambda c: (-c.cap, c.since is not None, c.since or 0),
+    )
+
+    winner = ranked[0]
+    runner_up = ranked[1] if len(ranked) > 1 else None
+    if runner_up is None:
+        return [(winner.team_id, need)]
+
+    if runner_up.cap >= winner.cap:
+        final = winner.cap
+    else:
+        final = max(need, min(winner.cap, runner_up.cap + increment))
+
+    plan = []
+    runner_up_amount = min(runner_up.cap, final - increment)
+    if runner_up.proxy and runner_up_amount >= need:
+        plan.append((runner_up.team_id, runner_up_amount))
+    plan.append((winner.team_id, final))
+    return plan
+
+
+async def _has_work(auction_id: str) -> bool:
+    """Unlocked pre-check: could any ceiling beat the current bid?"""
+    # In engine mode the latest bids may not be in the table yet
+    await auction_engine.flush(auction_id)
+    async with AsyncSessionLocal() as session:
+        res = await session.execute(
+            select(Auction.status, Auction.current_player_id, Auction.current_bid, Auction.current_bidder_id)
+            .where(Auction.id == auction_id)
+        )
+        row = res.first()
+        if row is None or row.status != AuctionStatusEnum.ONGOING.value or not row.current_player_id:
+            return False
+        criteria = [
+            ProxyBid.auction_id == auction_id,
+            ProxyBid.player_id == row.current_player_id,
+            ProxyBid.is_active == True,
+        ]
+        if row.current_bid is not None:
+            criteria.append(ProxyBid.max_amount >= row.current_bid + settings.proxy_bid_increment)
+        if row.current_bidder_id is not None:
+            criteria.append(ProxyBid.team_id != row.current_bidder_id)
+        res = await session.execute(select(exists().where(*criteria)))
+        return bool(res.scalar())
+
+
+async def resolve_proxy_bids(auction_id: str) -> List[Bid]:
+    """Resolve the ceilings on the current lot and persist the resulting bids."""
+    if not await _has_work(auction_id):
+        return []
+
+    async def unit():
+        auction = await _get_auction(session, auction_id)
+        if auction.status != AuctionStatusEnum.ONGOING.value or not auction.current_player_id:
+            return [], []
+        player_id = auction.current_player_id
+
+        res = await session.execute(select(Player.status, Player.base_price).where(Player.id == player_id))
+        player = res.first()
+        if player is None or player.status != PlayerStatusEnum.AVAILABLE.value:
+            return [], []
+
+        res = await session.execute(
+            select(ProxyBid).where(
+                ProxyBid.auction_id == auction_id,
+                ProxyBid.player_id == player_id,
+                ProxyBid.is_active == True,
+            )
+        )
+        proxies = list(res.scalars().all())
+        if not proxies:
+            return [], []
+
+        teams = {
+            team.id: team
+            for team in await lock_rows(session, Team, Team.id.in_(sorted({p.team_id for p in proxies})))
+        }
+        contenders = []
+        for proxy in proxies:
+            team = teams.get(proxy.team_id)
+            if team is None:
+                continue
+            headroom = BUDGET_LIMIT - (team.budget_spent or 0) - await pending_commitments(session, team.id, auction_id)
+            contenders.append(Contender(team.id, min(proxy.max_amount, headroom), proxy.registered_at))
+
+        increment = settings.proxy_bid_increment
+        plan = plan_proxy_bids(auction.current_bid, auction.current_bidder_id, player.base_price, increment, contenders)
+
+        now = datetime.utcnow()
+        current_bid = auction.current_bid
+        accepted: List[Bid] = []
+        events: List[AuctionEventEntry] = []
+        for team_id, amount in plan:
+            # Same rules as a manual bid; the plan should never break them
+            team = teams[team_id]
+            _validate_bid_amount(auction.status, current_bid, player.base_price, amount, increment)
+            _validate_budget(team.budget_spent or 0, await pending_commitments(session, team_id, auction_id), amount)
+            accepted.append(Bid(
+                id=str(uuid4()),
+                auction_id=auction_id,
+                player_id=player_id,
+                team_id=team_id,
+                amount=amount,
+                is_winning=False,
+                bid_timestamp=now,
+            ))
+            events.append(await append_event(session, auction, "bid_placed", bid_event_payload(team_id, amount, proxy=True)))
+            current_bid = amount
+
+        # Ceilings that can no longer win are spent
+        leader = accepted[-1].team_id if accepted else auction.current_bidder_id
+        need = (current_bid or 0) + increment
+        outbid = [p.team_id for p in proxies if p.team_id != leader and p.max_amount < need]
+        if outbid:
+            note_lock(session, ProxyBid)
+            await session.execute(
+                update(ProxyBid)
+                .where(
+                    ProxyBid.auction_id == auction_id,
+                    ProxyBid.player_id == player_id,
+                    ProxyBid.team_id.in_(outbid),
+                )
+                .values(is_active=False)
+            )
+
+        if accepted:
+            note_lock(session, Bid)
+            await session.execute(
+                update(Bid)
+                .where(Bid.auction_id == auction_id, Bid.is_winning == True)
+                .values(is_winning=False)
+            )
+            accepted[-1].is_winning = True
+            session.add_all(accepted)
+            auction.current_bid = accepted[-1].amount
+            auction.current_bidder_id = accepted[-1].team_id
+            session.add(auction)
+            await record_commitment(session, auction_id, auction.current_bidder_id, auction.current_bid)
+        return accepted, events
+
+    async with auction_engine.transition(auction_id):
+        async with AsyncSessionLocal() as session:
+            accepted, events = await run_transaction(session, unit, "resolve_proxy_bids")
+
+    resolutions.inc(result="bids" if accepted else "noop")
+    proxy_bids_placed.inc(len(accepted))
+    for event in events:
+        await _publish(event)
+    return accepted
+
+
+async def set_proxy_bid(
+    session: AsyncSession,
+    auction_id: str,
+    team_id: str,
+    max_amount: int,
+    player_id: Optional[str] = None,
+    current_user=None,
+) -> ProxyBid:
+    """Register or change a team's ceiling for a player (default: the current lot).
+
+    Changing the amount moves the ceiling to the back of the tie order.
+    """
+    if max_amount <= 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Amount must be positive")
+
+    async def unit():
+        auction = await lock_row(session, Auction, Auction.id == auction_id, lock=False)
+        if not auction:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auction not found")
+        if auction.status == AuctionStatusEnum.COMPLETED.value:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Auction is closed")
+        target = player_id or auction.current_player_id
+        if not target:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No active player")
+
+        player = await lock_row(session, Player, Player.id == target, lock=False)
+        if not player:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Player not found")
+        if player.status != PlayerStatusEnum.AVAILABLE.value:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Player is not available")
+
+        team = await lock_row(session, Team, Team.id == team_id, lock=False)
+        if not team:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
+        _validate_ownership(team.manager_id, current_user)
+        if (team.budget_spent or 0) + max_amount > BUDGET_LIMIT:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Insufficient budget. Limit: {BUDGET_LIMIT}, Required: {(team.budget_spent or 0) + max_amount}",
+            )
+
+        proxy = await lock_row(
+            session, ProxyBid,
+            ProxyBid.auction_id == auction_id, ProxyBid.player_id == target, ProxyBid.team_id == team_id,
+        )
+        if proxy is None:
+            proxy = ProxyBid(auction_id=auction_id, player_id=target, team_id=team_id, registered_at=datetime.utcnow())
+        elif max_amount != proxy.max_amount or not proxy.is_active:
+            proxy.registered_at = datetime.utcnow()
+        proxy.max_amount = max_amount
+        proxy.is_active = True
+        session.add(proxy)
+        return proxy, target == auction.current_player_id
+
+    proxy, is_current_lot = await run_transaction(session, unit, "set_proxy_bid")
+    if is_current_lot:
+        await resolve_proxy_bids(auction_id)
+    await session.refresh(proxy)
+    return proxy
+
+
+async def cancel_proxy_bid(
+    session: AsyncSession,
+    auction_id: str,
+    team_id: str,
+    player_id: Optional[str] = None,
+    current_user=None,
+) -> None:
+    """Withdraw a team's ceiling. Bids already placed from it stand."""
+    async def unit():
+        team = await lock_row(session, Team, Team.id == team_id, lock=False)
+        if not team:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
+        _validate_ownership(team.manager_id, current_user)
+
+        target = player_id
+        if target is None:
+            res = await session.execute(select(Auction.current_player_id).where(Auction.id == auction_id))
+            target = res.scalar()
+        proxy = await lock_row(
+            session, ProxyBid,
+            ProxyBid.auction_id == auction_id, ProxyBid.player_id == target, ProxyBid.team_id == team_id,
+        )
+        if proxy is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Proxy bid not found")
+        await session.delete(proxy)
+
+    await run_transaction(session, unit, "cancel_proxy_bid")
+
+
+async def list_proxy_bids(session: AsyncSession, auction_id: str, team_id: str, current_user=None) -> List[ProxyBid]:
+    res = await session.execute(select(Team.manager_id).where(Team.id == team_id))
+    manager_id = res.first()
+    if manager_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
+    _validate_ownership(manager_id[0], current_user)
+    res = await session.execute(
+        select(ProxyBid)
+        .where(ProxyBid.auction_id == auction_id, ProxyBid.team_id == team_id)
+        .order_by(ProxyBid.registered_at)
+    )
+    return list(res.scalars().all())
+
+
+class ProxyBidResolver:
+    """Re-resolves ceilings after manual bids and lot changes, one task per busy auction."""
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._dirty: Set[str] = set()
+        self._running = False
+
+    async def start(self) -> None:
+        if not self._running:
+            self._running = True
+            event_log.subscribe(self.on_event)
+
+    async def stop(self) -> None:
+        if not self._running:
+            return
+        self._running = False
+        event_log.unsubscribe(self.on_event)
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def on_event(self, event: AuctionEventEntry) -> None:
+        if event.type == "bid_placed" and event.payload.get("proxy"):
+            return
+        if event.type in ("bid_placed", "auction_started", "player_updated"):
+            self.schedule(event.auction_id)
+
+    def schedule(self, auction_id: str) -> None:
+        """Resolve soon; requests arriving while a resolution runs are folded into one more pass."""
+        if auction_id in self._tasks:
+            self._dirty.add(auction_id)
+            return
+        self._tasks[auction_id] = asyncio.create_task(self._run(auction_id))
+
+    async def _run(self, auction_id: str) -> None:
+        try:
+            while True:
+                self._dirty.discard(auction_id)
+                try:
+                    await resolve_proxy_bids(auction_id)
+                except Exception as exc:
+                    resolutions.inc(result="error")
+                    logger.warning("Proxy bid resolution for auction %s failed: %s", auction_id, exc)
+                if auction_id not in self._dirty:
+                    break
+        finally:
+            self._tasks.pop(auction_id, None)
+
+
+# Global resolver instance
+proxy_bid_resolver = ProxyBidResolver()
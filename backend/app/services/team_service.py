@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Team, User
 from app.schemas.team import TeamCreate, TeamUpdate
+from app.services.principal_cache import principal_cache
 
 
 async def create_team(session: AsyncSession, payload: TeamCreate) -> Team:
@@ -29,6 +30,7 @@ async def create_team(session: AsyncSession, payload: TeamCreate) -> Team:
     )
     session.add(team)
     await session.commit()
+    await principal_cache.invalidate(team.manager_id)
     await session.refresh(team)
     return team
 
@@ -48,6 +50,7 @@ async def update_team(session: AsyncSession, team_id: str, payload: TeamUpdate)
     if not team:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
 
+    previous_manager_id = team.manager_id
     if payload.manager_id is not None:
         result = await session.execute(select(User).where(User.id == str(payload.manager_id)))
         manager = result.scalars().first()
@@ -64,6 +67,8 @@ async def update_team(session: AsyncSession, team_id: str, payload: TeamUpdate)
 
     session.add(team)
     await session.commit()
+    if team.manager_id != previous_manager_id:
+        await principal_cache.invalidate(previous_manager_id, team.manager_id)
     await session.refresh(team)
     return team
 
@@ -72,5 +77,7 @@ async def delete_team(session: AsyncSession, team_id: str) -> None:
     team = await get_team(session, team_id)
     if not team:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
+    manager_id = team.manager_id
     await session.delete(team)
     await session.commit()
+    await principal_cache.invalidate(manager_id)
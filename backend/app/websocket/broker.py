@@ -0,0 +1,247 @@
+"""Pub/sub backends for WebSocket broadcasts.
+
+`ConnectionManager.broadcast_to_room` hands each message to a broker. The
+broker delivers it to this worker's sockets and to every other worker,
+and each worker then fans it out to its own sockets. A message is
+serialized once and published once, however many workers and sockets
+there are.
+
+- `InProcessBroker` (``WS_BROKER=memory``): single worker, delivers locally.
+- `PostgresBroker` (``WS_BROKER=postgres``): LISTEN/NOTIFY on
+  ``WS_BROKER_CHANNEL``. The publishing worker delivers locally at once
+  and ignores its own notifications. Other workers receive them in
+  publish order on one listener connection, which reconnects with backoff
+  when it drops. A message too large for a NOTIFY payload is sent as a
+  reference (its `seq`) when a loader is registered for its room
+  (`set_reference_loader`); receiving workers load the message from where
+  it is stored, e.g. auction events from `auction_events`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+BROKER_MEMORY = "memory"
+BROKER_POSTGRES = "postgres"
+
+# NOTIFY payloads must stay below 8000 bytes
+MAX_NOTIFY_BYTES = 7900
+
+Deliver = Callable[[str, str, bool], Awaitable[None]]  # (room, payload, remote)
+ReconnectHandler = Callable[[], None]
+ReferenceLoader = Callable[[str, Dict[str, Any]], Awaitable[Optional[str]]]  # (room, reference) -> payload
+
+broker_messages = metrics.counter(
+    "ws_broker_messages_total",
+    "Messages passed through the WebSocket broker",
+    ("direction",),
+)
+broker_reconnects = metrics.counter("ws_broker_reconnects_total", "WebSocket broker listener reconnects")
+
+
+class InProcessBroker:
+    """Delivers straight to this worker's sockets."""
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    def attach(self, deliver: Deliver) -> None:
+        """Set the local delivery callback (the connection manager's fan-out)."""
+        self._deliver = deliver
+
+    def on_reconnect(self, handler: ReconnectHandler) -> None:
+        """Call `handler()` when messages from other workers may have been missed.
+
+        Never happens in process.
+        """
+
+    def set_reference_loader(self, prefix: str, loader: ReferenceLoader) -> None:
+        """Messages are never too large in process."""
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, room: str, payload: str) -> None:
+        if self._deliver is not None:
+            await self._deliver(room, payload, False)
+
+
+class PostgresBroker:
+    """Cross-worker fan-out over Postgres LISTEN/NOTIFY."""
+
+    def __init__(self, dsn: str, channel: str):
+        self.dsn = dsn
+        self.channel = channel
+        self.origin = uuid4().hex
+        self._deliver: Optional[Deliver] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._inbox: "asyncio.Queue[tuple]" = asyncio.Queue()
+        self._publish_conn = None
+        self._publish_lock = asyncio.Lock()
+        self._reconnect_handlers: List[ReconnectHandler] = []
+        self._loaders: Dict[str, ReferenceLoader] = {}
+
+    def attach(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    def on_reconnect(self, handler: ReconnectHandler) -> None:
+        """Call `handler()` after the listener reconnects: notifications sent
+        while it was down (e.g. during a database failover) are lost."""
+        if handler not in self._reconnect_handlers:
+            self._reconnect_handlers.append(handler)
+
+    def set_reference_loader(self, prefix: str, loader: ReferenceLoader) -> None:
+        """Send too-large messages with a `seq` to rooms starting with `prefix` as
+        `{"seq": n}`; other workers call `loader(room, reference)` for the payload."""
+        self._loaders[prefix] = loader
+
+    def _loader(self, room: str) -> Optional[ReferenceLoader]:
+        for prefix, loader in self._loaders.items():
+            if room.startswith(prefix):
+                return loader
+        return None
+
+    def _reference(self, room: str, payload: str) -> Optional[Dict[str, Any]]:
+        if self._loader(room) is None:
+            return None
+        message = json.loads(payload)
+        seq = message.get("seq") if isinstance(message, dict) else None
+        return {"seq": seq} if isinstance(seq, int) else None
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+            self._consumer = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        for task in (self._listener, self._consumer):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._listener = self._consumer = None
+        if self._publish_conn is not None:
+            await self._publish_conn.close()
+            self._publish_conn = None
+
+    async def publish(self, room: str, payload: str) -> None:
+        if self._deliver is not None:
+            await self._deliver(room, payload, False)
+        if self._listener is None:
+            return  # not started: single-process use
+
+        envelope = json.dumps({"o": self.origin, "r": room, "m": payload})
+        if len(envelope.encode()) > MAX_NOTIFY_BYTES:
+            reference = self._reference(room, payload)
+            if reference is None:
+                broker_messages.inc(direction="oversized")
+                logger.warning("Broadcast to %s is too large for NOTIFY (%d bytes); delivered locally only", room, len(envelope))
+                return
+            broker_messages.inc(direction="by_reference")
+            envelope = json.dumps({"o": self.origin, "r": room, "ref": reference})
+
+        async with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publish_conn is None or self._publish_conn.is_closed():
+                        self._publish_conn = await self._connect()
+                    await self._publish_conn.execute("SELECT pg_notify($1, $2)", self.channel, envelope)
+                    broker_messages.inc(direction="published")
+                    return
+                except Exception as exc:
+                    self._publish_conn = None
+                    if attempt:
+                        broker_messages.inc(direction="publish_failed")
+                        logger.error("Failed to publish broadcast to %s: %s", room, exc)
+
+    async def _connect(self):
+        import asyncpg
+
+        return await asyncpg.connect(self.dsn)
+
+    async def _listen(self) -> None:
+        backoff = 0.5
+        reconnecting = False
+        while True:
+            conn = None
+            try:
+                conn = await self._connect()
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _conn: lost.set())
+                await conn.add_listener(self.channel, self._on_notify)
+                backoff = 0.5
+                if reconnecting:
+                    for handler in self._reconnect_handlers:
+                        handler()
+                reconnecting = True
+                await lost.wait()
+                logger.warning("WebSocket broker listener connection lost")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error("WebSocket broker listener failed: %s", exc)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            broker_reconnects.inc()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 10)
+
+    def _on_notify(self, _conn, _pid, _channel, raw: str) -> None:
+        try:
+            envelope = json.loads(raw)
+        except ValueError:
+            return
+        if envelope.get("o") == self.origin:
+            return
+        broker_messages.inc(direction="received")
+        self._inbox.put_nowait((envelope["r"], envelope.get("m"), envelope.get("ref")))
+
+    async def _consume(self) -> None:
+        # One consumer keeps notifications in publish order
+        while True:
+            room, payload, reference = await self._inbox.get()
+            try:
+                if payload is None:
+                    payload = await self._load(room, reference)
+                    if payload is None:
+                        continue
+                await self._deliver(room, payload, True)
+            except Exception as exc:
+                logger.error("Delivering broadcast to %s failed: %s", room, exc, exc_info=exc)
+
+
+    async def _load(self, room: str, reference: Any) -> Optional[str]:
+        loader = self._loader(room)
+        payload = await loader(room, reference) if loader is not None and isinstance(reference, dict) else None
+        if payload is None:
+            broker_messages.inc(direction="reference_missed")
+            logger.error("Could not load broadcast %s to %s; it is lost on this worker", reference, room)
+        return payload
+
+
+def asyncpg_dsn(database_url: str) -> str:
+    """SQLAlchemy URL -> plain DSN for asyncpg."""
+    return database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+def create_broker():
+    if settings.ws_broker == BROKER_POSTGRES:
+        return PostgresBroker(asyncpg_dsn(settings.database_url), settings.ws_broker_channel)
+    return InProcessBroker()
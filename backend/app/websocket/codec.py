@@ -0,0 +1,129 @@
+"""WebSocket frame encodings.
+
+Clients pick an encoding with the WebSocket subprotocol header
+(``new WebSocket(url, ["msgpack+deflate", "json"])``); the first one the
+server supports wins. Without a subprotocol the connection uses plain
+JSON text frames, as before.
+
+- ``json``: JSON text frames.
+- ``json+deflate``: zlib-compressed JSON in binary frames.
+- ``msgpack`` / ``msgpack+deflate``: MessagePack binary frames. ``msgpack``
+  is in requirements.txt; an install without it offers only the JSON
+  encodings.
+
+Frames from the client are decoded with the same encoding (`decode`);
+text frames are always JSON.
+
+A broadcast is encoded at most once per encoding (`FrameSet`) and the
+same frame object is queued for every socket using that encoding, so the
+cost of a broadcast no longer grows with the number of sockets. The
+compressed encodings are compressed once here rather than per socket by
+the server's permessage-deflate, which compresses every frame again for
+every connection.
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any, Dict, Iterable, Optional, Union
+
+from app.core.metrics import metrics
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+ENCODING_JSON = "json"
+ENCODING_JSON_DEFLATE = "json+deflate"
+ENCODING_MSGPACK = "msgpack"
+ENCODING_MSGPACK_DEFLATE = "msgpack+deflate"
+
+SUPPORTED_ENCODINGS = (ENCODING_JSON, ENCODING_JSON_DEFLATE) + (
+    (ENCODING_MSGPACK, ENCODING_MSGPACK_DEFLATE) if msgpack is not None else ()
+)
+
+# Level 6 is zlib's default; broadcasts are small, so higher levels buy little
+DEFLATE_LEVEL = 6
+# Client messages are small (bids, pongs, tokens); refuse to inflate past this
+MAX_INBOUND_BYTES = 64 * 1024
+
+Frame = Union[str, bytes]  # str -> text frame, bytes -> binary frame
+
+frames_encoded = metrics.counter("ws_frames_encoded_total", "Broadcast frames encoded, by encoding", ("encoding",))
+
+
+def negotiate(offered: Iterable[str]) -> Optional[str]:
+    """First supported encoding among the client's subprotocols, or None."""
+    for protocol in offered:
+        if protocol in SUPPORTED_ENCODINGS:
+            return protocol
+    return None
+
+
+def encode(message: Any, encoding: str) -> Frame:
+    """Encode one message for one encoding."""
+    if encoding == ENCODING_JSON:
+        return json.dumps(message)
+    if encoding == ENCODING_JSON_DEFLATE:
+        return zlib.compress(json.dumps(message).encode(), DEFLATE_LEVEL)
+    if encoding == ENCODING_MSGPACK:
+        return msgpack.packb(message)
+    if encoding == ENCODING_MSGPACK_DEFLATE:
+        return zlib.compress(msgpack.packb(message), DEFLATE_LEVEL)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def _inflate(data: bytes) -> bytes:
+    inflater = zlib.decompressobj()
+    try:
+        inflated = inflater.decompress(data, MAX_INBOUND_BYTES)
+    except zlib.error as exc:
+        raise ValueError(f"Invalid deflate frame: {exc}") from exc
+    if inflater.unconsumed_tail:
+        raise ValueError("Frame too large")
+    return inflated
+
+
+def decode(frame: Frame, encoding: str) -> Any:
+    """Decode one client frame; raises ValueError if it is not a valid message."""
+    if isinstance(frame, str):
+        return json.loads(frame)
+    if encoding in (ENCODING_JSON_DEFLATE, ENCODING_MSGPACK_DEFLATE):
+        frame = _inflate(frame)
+    if encoding in (ENCODING_MSGPACK, ENCODING_MSGPACK_DEFLATE):
+        try:
+            return msgpack.unpackb(frame)
+        except Exception as exc:  # msgpack raises several unrelated types
+            raise ValueError(f"Invalid msgpack frame: {exc}") from exc
+    return json.loads(frame)
+
+
+class FrameSet:
+    """One broadcast, encoded lazily and at most once per encoding."""
+
+    __slots__ = ("_message", "_frames")
+
+    def __init__(self, text: Optional[str] = None, message: Any = None):
+        self._message = message
+        self._frames: Dict[str, Frame] = {}
+        if text is not None:
+            self._frames[ENCODING_JSON] = text
+
+    def get(self, encoding: str) -> Frame:
+        frame = self._frames.get(encoding)
+        if frame is None:
+            if encoding == ENCODING_JSON_DEFLATE and ENCODING_JSON in self._frames:
+                frame = zlib.compress(self._frames[ENCODING_JSON].encode(), DEFLATE_LEVEL)
+            else:
+                frame = encode(self.message, encoding)
+            self._frames[encoding] = frame
+            frames_encoded.inc(encoding=encoding)
+        return frame
+
+    @property
+    def message(self) -> Any:
+        if self._message is None:
+            self._message = json.loads(self._frames[ENCODING_JSON])
+        return self._message
@@ -1,72 +1,308 @@
 """WebSocket endpoints for real-time updates.
 
-Authenticated, read-only connections for auction and match events.
+Authenticated connections for auction and match events.
+
+Resuming: a client that reconnects passes the last `seq` it applied
+(``?last_seq=N``). If this worker's event ring buffer still holds every
+event after N, those events are replayed, followed by a `resumed` message,
+and no database query is made. Otherwise (gap too large, or no events in
+memory for the auction) the client gets a snapshot from the in-memory
+snapshot store (`app.services.auction_snapshots`). Live events may
+overlap the replay; clients drop anything with `seq` <= the last applied.
+
+Admins and team managers get every event. Other users, and anyone who
+asks for ``?stream=spectator`` (e.g. a venue screen), get the conflated
+spectator stream (see `app.websocket.manager`).
+
+Bidding: team managers (and admins) can bid over the auction socket
+instead of `POST /auctions/{id}/bid`. The user is authenticated once at
+connect; each bid then skips the HTTP request, token decode and user
+lookup but goes through the same rate limit, `place_bid` rules and team
+ownership checks:
+
+    -> {"type": "bid", "client_id": "c-17", "team_id": "...", "amount": 1500000, "min_increment": 1}
+    <- {"type": "bid_ack", "client_id": "c-17", "bid": {...}, "replayed": false}
+    <- {"type": "bid_rejected", "client_id": "c-17", "status": 400, "detail": "..."}
+
+`client_id` is also the bid's idempotency key: resending it (e.g. after a
+reconnect) returns the original outcome instead of bidding again. Bids
+from one socket are handled in the order they are sent.
+
+Liveness: the server sends ``{"type": "ping"}`` every few seconds; clients
+answer ``{"type": "pong"}``. Sockets that stay silent past the idle
+timeout are closed with 1001, and the socket is closed with 1008 "Token
+expired" when the access token it connected with expires. To stay
+connected, send a fresh access token for the same user before then:
+
+    -> {"type": "auth", "token": "<access token>"}
+    <- {"type": "auth_ok", "expires_at": 1760000000}
+    <- {"type": "auth_rejected", "detail": "..."}
+
+Other incoming messages are ignored.
+
+Match sockets (``/ws/matches/{id}``) are read-only: a `scoreboard` message
+on connect, then one message per scoring event carrying the event, its
+`seq` and a `delta` (score line, latest innings, the figures the event
+touched). A client that sees `seq` skip refetches
+``GET /matches/{id}/scoreboard``.
 """
 
+import time
 from datetime import datetime
-from fastapi import WebSocket, WebSocketDisconnect, status
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Optional, Tuple
 
+from fastapi import HTTPException, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+
+from app.core.metrics import metrics
+from app.core.rate_limit import bid_limiter
 from app.core.security import decode_token
-from app.db.session import get_session
-from app.models import Auction
-from app.websocket.manager import manager
+from app.db.session import AsyncSessionLocal
+from app.dependencies.rbac import require_team_manager
+from app.models.enums import RoleEnum
+from app.schemas.auction import BidCreate, BidRead
+from app.services.auction_service import bid_latency, place_bid
+from app.services.auction_snapshots import auction_snapshots
+from app.services.idempotency import idempotency_store, request_fingerprint
+from app.services.match_scoreboard import Scoreboard, match_scoreboards
+from app.services.principal_cache import Principal, principal_cache
+from app.services.event_log import event_log
+from app.websocket.codec import ENCODING_JSON, decode, negotiate
+from app.websocket.manager import SUBSCRIPTION_FULL, SUBSCRIPTION_SPECTATOR, manager
+
+ws_joins = metrics.counter("ws_auction_joins_total", "Auction socket joins by how the client was brought up to date", ("outcome",))
 
 
 async def _get_current_user_from_token(token: str):
-    """Decode and validate JWT token, return user_id if valid."""
+    """Decode and validate JWT token, return its claims if valid."""
     try:
         payload = decode_token(token, expected_type="access")
-        return payload.get("sub")
     except Exception:
         return None
+    return payload if payload.get("sub") else None
+
+
+async def _renew_token(room: str, websocket: WebSocket, user: Principal, message: Dict[str, Any]) -> Dict[str, Any]:
+    """Extend the connection's lifetime to a new access token's expiry."""
+    claims = await _get_current_user_from_token(message.get("token") or "")
+    if claims is None or claims["sub"] != user.id:
+        return {"type": "auth_rejected", "detail": "Invalid token"}
+    manager.set_expiry(room, websocket, claims.get("exp"))
+    return {"type": "auth_ok", "expires_at": claims.get("exp")}
+
+
+async def _load_user(user_id: str) -> Optional[Principal]:
+    """The active user behind a token, looked up once per connection."""
+    async with AsyncSessionLocal() as session:
+        user = await principal_cache.get(session, user_id)
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+def _subscription_for(user: Principal, requested: Optional[str]) -> str:
+    """Full stream for admins and team managers, unless they ask for the spectator one."""
+    if requested == SUBSCRIPTION_SPECTATOR:
+        return SUBSCRIPTION_SPECTATOR
+    if user.role in (RoleEnum.ADMIN.value, RoleEnum.TEAM_MANAGER.value):
+        return SUBSCRIPTION_FULL
+    return SUBSCRIPTION_SPECTATOR
+
+
+async def _handle_bid(websocket: WebSocket, auction_id: str, user: Principal, message: Dict[str, Any]) -> Dict[str, Any]:
+    """Place a bid sent over the socket; returns the ack or reject message."""
+    client_id = message.get("client_id")
+    if not isinstance(client_id, str) or not client_id or len(client_id) > 255:
+        return {"type": "bid_rejected", "client_id": client_id, "status": 400, "detail": "client_id is required"}
+
+    started = time.perf_counter()
+    try:
+        await require_team_manager(user)
+        if not bid_limiter.is_allowed(websocket, "auction:bid"):
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Rate limit exceeded")
+        try:
+            payload = BidCreate.model_validate(message)
+        except ValidationError as exc:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=exc.errors(include_url=False)[0]["msg"])
+
+        async def execute():
+            async with AsyncSessionLocal() as session:
+                bid = await place_bid(session, auction_id, str(payload.team_id), payload.amount, payload.min_increment, user)
+                return BidRead.model_validate(bid, from_attributes=True).model_dump(mode="json")
+
+        fingerprint = request_fingerprint("auction:bid", auction_id, payload.team_id, payload.amount, payload.min_increment)
+        body, replayed = await idempotency_store.run(user.id, f"ws:{client_id}", fingerprint, execute)
+        reply = {"type": "bid_ack", "client_id": client_id, "bid": body, "replayed": replayed}
+        outcome = "accepted"
+    except HTTPException as exc:
+        reply = {"type": "bid_rejected", "client_id": client_id, "status": exc.status_code, "detail": exc.detail}
+        outcome = "rejected"
+    bid_latency.observe(time.perf_counter() - started, transport="websocket", outcome=outcome)
+    return reply
+
+
+async def _open(websocket: WebSocket, token: str) -> Optional[Tuple[Dict[str, Any], Principal, Optional[str]]]:
+    """Check the token, frame encoding and user of a new socket.
+
+    Returns (token claims, user, negotiated encoding), or None once the
+    socket has been closed with the reason.
+    """
+    claims = await _get_current_user_from_token(token)
+    if not claims:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid token")
+        return None
+
+    offered = websocket.scope.get("subprotocols") or []
+    encoding = negotiate(offered)
+    if offered and encoding is None:
+        await websocket.close(code=status.WS_1002_PROTOCOL_ERROR, reason="Unsupported encoding")
+        return None
+
+    user = await _load_user(claims["sub"])
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="User not found or inactive")
+        return None
+    return claims, user, encoding
 
 
-async def websocket_auction_endpoint(websocket: WebSocket, auction_id: str, token: str) -> None:
+async def _receive(websocket: WebSocket, encoding: Optional[str]) -> Any:
+    """The next client message, text or binary, decoded with the socket's encoding.
+
+    Returns None for a frame that does not decode; raises WebSocketDisconnect
+    when the client goes away.
+    """
+    frame = await websocket.receive()
+    if frame["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(frame.get("code", status.WS_1000_NORMAL_CLOSURE))
+    raw = frame.get("text") if frame.get("text") is not None else frame.get("bytes")
+    try:
+        return decode(raw, encoding or ENCODING_JSON)
+    except ValueError:
+        return None
+
+
+async def auction_room_snapshot(room: str) -> Optional[dict]:
+    """Snapshot provider for `auction:{id}` rooms (used to resync slow clients)."""
+    snapshot = await auction_snapshots.get(room.split(":", 1)[1])
+    return snapshot.message() if snapshot else None
+
+
+async def _bring_up_to_date(room: str, websocket: WebSocket, auction_id: str, last_seq: Optional[int]) -> None:
+    if last_seq is not None:
+        # No await between joining the room and reading the ring: nothing falls in between
+        events = event_log.replay(auction_id, last_seq)
+        if events is not None:
+            for event in events:
+                await manager.send_personal(room, websocket, event.message)
+            await manager.send_personal(room, websocket, {
+                "type": "resumed",
+                "auction_id": auction_id,
+                "from_seq": last_seq,
+                "replayed": len(events),
+                "timestamp": datetime.utcnow().isoformat(),
+            })
+            ws_joins.inc(outcome="replay")
+            return
+
+    snapshot = await auction_snapshots.get(auction_id)
+    if snapshot:
+        await manager.send_personal(room, websocket, snapshot.message())
+    ws_joins.inc(outcome="snapshot" if last_seq is None else "resume_snapshot")
+
+
+async def websocket_auction_endpoint(
+    websocket: WebSocket,
+    auction_id: str,
+    token: str,
+    last_seq: Optional[int] = None,
+    stream: Optional[str] = None,
+) -> None:
     """WebSocket endpoint for auction updates.
-    
-    Requires JWT token as query parameter. Sends auction snapshots and event updates.
+
+    Requires JWT token as query parameter. Sends auction snapshots and event updates,
+    or only the missed events when resuming from `last_seq`.
+    The frame encoding is negotiated through the WebSocket subprotocol header
+    (see `app.websocket.codec`); JSON text frames when none is offered.
     """
     # Authenticate
-    user_id = await _get_current_user_from_token(token)
-    if not user_id:
-        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid token")
+    opened = await _open(websocket, token)
+    if opened is None:
         return
+    claims, user, encoding = opened
 
     room = f"auction:{auction_id}"
-    
+    subscription = _subscription_for(user, stream)
+
     try:
-        await manager.connect(room, websocket)
-
-        # Send initial snapshot of auction
-        async with AsyncSession(bind=None) as session:
-            # Get the auction to send initial state
-            stmt = select(Auction).where(Auction.id == auction_id)
-            result = await session.execute(stmt)
-            auction = result.scalars().first()
-
-            if auction:
-                snapshot = {
-                    "type": "snapshot",
-                    "auction_id": auction.id,
-                    "status": auction.status,
-                    "current_bid": auction.current_bid,
-                    "current_bidder_id": auction.current_bidder_id,
-                    "total_revenue": auction.total_revenue,
-                    "timestamp": datetime.utcnow().isoformat(),
-                }
-                await websocket.send_json(snapshot)
-
-        # Keep connection open; messages are ignored (read-only)
+        await manager.connect(
+            room,
+            websocket,
+            encoding or ENCODING_JSON,
+            subprotocol=encoding,
+            subscription=subscription,
+            expires_at=claims.get("exp"),
+        )
+        await _bring_up_to_date(room, websocket, auction_id, last_seq)
+
         while True:
-            # Receive but ignore any incoming messages
-            await websocket.receive_text()
+            message = await _receive(websocket, encoding)
+            manager.touch(room, websocket)
+            if not isinstance(message, dict):
+                continue
+            if message.get("type") == "bid":
+                reply = await _handle_bid(websocket, auction_id, user, message)
+                await manager.send_personal(room, websocket, reply)
+            elif message.get("type") == "auth":
+                await manager.send_personal(room, websocket, await _renew_token(room, websocket, user, message))
 
     except WebSocketDisconnect:
         await manager.disconnect(room, websocket)
     except Exception as e:
-        await manager.disconnect(room, websocket)
-        await websocket.close(code=status.WS_1011_SERVER_ERROR)
+        await manager.disconnect(room, websocket, code=status.WS_1011_INTERNAL_ERROR)
+
 
+def _scoreboard_message(board: Scoreboard) -> dict:
+    return {"type": "scoreboard", **board.as_dict(), "timestamp": datetime.utcnow().isoformat()}
 
+
+async def match_room_snapshot(room: str) -> Optional[dict]:
+    """Snapshot provider for `match:{id}` rooms."""
+    async with AsyncSessionLocal() as session:
+        board = await match_scoreboards.get(session, room.split(":", 1)[1])
+    return _scoreboard_message(board) if board else None
+
+
+async def websocket_match_endpoint(websocket: WebSocket, match_id: str, token: str) -> None:
+    """WebSocket endpoint for live match scoring.
+
+    Requires JWT token as query parameter. Sends the scoreboard, then every
+    scoring event with the delta it made.
+    """
+    opened = await _open(websocket, token)
+    if opened is None:
+        return
+    claims, user, encoding = opened
+
+    async with AsyncSessionLocal() as session:
+        board = await match_scoreboards.get(session, match_id)
+    if board is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Match not found")
+        return
+
+    room = f"match:{match_id}"
+    try:
+        await manager.connect(room, websocket, encoding or ENCODING_JSON, subprotocol=encoding, expires_at=claims.get("exp"))
+        # No await between joining the room and reading the latest scoreboard:
+        # every later event reaches this socket, none is older than the snapshot
+        await manager.send_personal(room, websocket, _scoreboard_message(match_scoreboards.latest(match_id) or board))
+
+        while True:
+            message = await _receive(websocket, encoding)
+            manager.touch(room, websocket)
+            if isinstance(message, dict) and message.get("type") == "auth":
+                await manager.send_personal(room, websocket, await _renew_token(room, websocket, user, message))
+
+    except WebSocketDisconnect:
+        await manager.disconnect(room, websocket)
+    except Exception as e:
+        await manager.disconnect(room, websocket, code=status.WS_1011_INTERNAL_ERROR)
@@ -1,64 +1,480 @@
 """WebSocket connection manager for real-time updates.
 
 Tracks active connections, groups by room, broadcasts events.
+Broadcasts go through a broker (see `app.websocket.broker`) so they reach
+sockets connected to every worker, not just this one.
+
+Every connection has a bounded send queue drained by its own writer task,
+so a broadcast only enqueues (O(room size), no network awaits) and one
+slow client cannot hold up the room or the request that broadcast. When a
+client's queue is full, ``WS_OVERFLOW_POLICY`` decides what happens:
+
+- ``drop_oldest``: discard the oldest queued message.
+- ``conflate``: discard the whole backlog and send a fresh room snapshot
+  (from the provider registered with `set_snapshot_provider`) in its
+  place; the client continues from the snapshot's `last_seq`.
+- ``disconnect``: close the socket (1013, try again later); the client
+  reconnects and resyncs.
+
+Each connection has an encoding (see `app.websocket.codec`); a broadcast
+is encoded once per encoding in use and the frames are shared.
+
+Each connection also has a subscription class. ``full`` connections
+(bidders, admins) get every message. ``spectator`` connections get
+high-frequency state messages (``WS_CONFLATED_TYPES``, e.g. `bid_placed`)
+conflated: at most one flush per ``1 / WS_SPECTATOR_HZ`` seconds per
+room, carrying only the latest message of each such type. Other messages
+(lifecycle events) are delivered at once, after flushing anything held
+back, so spectators still see them in order; spectators see gaps in `seq`.
+
+Liveness: every ``WS_HEARTBEAT_SECONDS`` each connection is sent a
+``{"type": "ping"}`` message, which clients answer with ``{"type": "pong"}``
+(any message counts). A connection that has sent nothing for
+``WS_IDLE_TIMEOUT_SECONDS`` is closed (1001), so half-open sockets (e.g. a
+phone gone to sleep) are dropped instead of being written to on every
+broadcast. A connection whose access token expires is closed with 1008
+"Token expired" unless the client renewed it (see `set_expiry`). All of
+these timers run on one timing wheel.
 """
 
-from typing import Dict, Set
-from fastapi import WebSocket
+import asyncio
 import json
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import WebSocket, status
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.core.timing_wheel import TimingWheel
+from app.websocket.broker import create_broker
+from app.websocket.codec import ENCODING_JSON, Frame, FrameSet, encode
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_CONFLATE = "conflate"
+OVERFLOW_DISCONNECT = "disconnect"
+
+SUBSCRIPTION_FULL = "full"
+SUBSCRIPTION_SPECTATOR = "spectator"
+
+RemoteHandler = Callable[[str, dict], Awaitable[None]]
+SnapshotProvider = Callable[[str], Awaitable[Optional[dict]]]
+
+fanout_latency = metrics.histogram(
+    "ws_fanout_seconds",
+    "Time from broadcast to the message being written to a socket",
+    ("room",),
+)
+broadcast_seconds = metrics.histogram(
+    "ws_broadcast_enqueue_seconds",
+    "Time to enqueue one broadcast for every connection of a room",
+    ("room",),
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05),
+)
+queue_overflows = metrics.counter("ws_send_queue_overflows_total", "Send queue overflows by policy applied", ("policy",))
+frames_queued = metrics.counter("ws_frames_queued_total", "Broadcast frames queued to sockets", ("subscription",))
+frames_conflated = metrics.counter("ws_frames_conflated_total", "Spectator frames replaced by a newer message before sending")
+connections_gauge = metrics.gauge("ws_connections", "Open WebSocket connections", ("subscription",))
+rooms_gauge = metrics.gauge("ws_rooms", "Rooms with at least one open WebSocket connection")
+connections_reaped = metrics.counter("ws_connections_reaped_total", "Connections closed by the server's liveness checks", ("reason",))
+
+# Heartbeat message, encoded at most once per encoding
+_PING = FrameSet(message={"type": "ping"})
+
+# Queue marker: send a fresh snapshot here
+_RESYNC = object()
+
+
+class ClientConnection:
+    """One socket with a bounded outbound queue and the task that drains it."""
+
+    def __init__(
+        self,
+        manager: "ConnectionManager",
+        room: str,
+        websocket: WebSocket,
+        max_queue: int,
+        policy: str,
+        encoding: str = ENCODING_JSON,
+        subscription: str = SUBSCRIPTION_FULL,
+    ):
+        self.manager = manager
+        self.room = room
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.policy = policy
+        self.encoding = encoding
+        self.subscription = subscription
+        self.queue: Deque[Tuple[Any, float]] = deque()  # (frame or _RESYNC, enqueued at)
+        self.closed = False
+        self.last_seen = asyncio.get_running_loop().time()
+        self.expires_at: Optional[float] = None  # unix time the client's token expires
+        self.next_ping = 0.0
+        self._ready = asyncio.Event()
+        self._writer = asyncio.create_task(self._write())
+
+    def enqueue(self, frame: Frame, enqueued_at: float) -> None:
+        if self.closed:
+            return
+        if len(self.queue) >= self.max_queue:
+            if not self._overflow():
+                return
+        self.queue.append((frame, enqueued_at))
+        self._ready.set()
+
+    def _overflow(self) -> bool:
+        """Apply the overflow policy; returns False if the message must not be queued."""
+        policy = self.policy
+        if policy == OVERFLOW_CONFLATE and self.manager.snapshot_provider(self.room) is None:
+            policy = OVERFLOW_DROP_OLDEST
+        queue_overflows.inc(policy=policy)
+
+        if policy == OVERFLOW_DISCONNECT:
+            self.closed = True
+            self.queue.clear()
+            self.manager._spawn(self.manager.disconnect(self.room, self.websocket, code=status.WS_1013_TRY_AGAIN_LATER))
+            return False
+        if policy == OVERFLOW_CONFLATE:
+            # The snapshot covers the dropped backlog; newer messages queue behind it
+            self.queue.clear()
+            self.queue.append((_RESYNC, time.perf_counter()))
+            return True
+        self.queue.popleft()
+        return True
+
+    async def _write(self) -> None:
+        try:
+            while True:
+                while not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                frame, enqueued_at = self.queue.popleft()
+                if frame is _RESYNC:
+                    snapshot = await self.manager.snapshot_provider(self.room)(self.room)
+                    if snapshot is None:
+                        continue
+                    frame = encode(snapshot, self.encoding)
+                if isinstance(frame, str):
+                    await self.websocket.send_text(frame)
+                else:
+                    await self.websocket.send_bytes(frame)
+                fanout_latency.observe(time.perf_counter() - enqueued_at, room=self.room)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Connection closed or errored
+            self.closed = True
+            self.manager._spawn(self.manager.disconnect(self.room, self.websocket))
+
+    async def close(self, code: Optional[int] = None, reason: Optional[str] = None) -> None:
+        self.closed = True
+        self.manager._wheel.cancel(self)
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        if code is not None:
+            try:
+                await self.websocket.close(code=code, reason=reason)
+            except Exception:
+                pass
+
+
+class _Conflation:
+    """Spectator messages of one room held back until the next flush."""
+
+    __slots__ = ("pending", "handle", "last_flush")
+
+    def __init__(self):
+        self.pending: Dict[str, FrameSet] = {}  # latest message per type
+        self.handle: Optional[asyncio.TimerHandle] = None
+        self.last_flush = 0.0
 
 
 class ConnectionManager:
     """Manages WebSocket connections grouped by rooms.
-    
+
     Rooms are identified as:
     - auction:{auction_id}
     - match:{match_id}
-    
+
     Thread-safe for concurrent connections.
     """
 
-    def __init__(self):
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
+    def __init__(
+        self,
+        broker=None,
+        max_queue: int = 256,
+        overflow_policy: str = OVERFLOW_CONFLATE,
+        spectator_hz: float = 4,
+        conflated_types: Iterable[str] = ("bid_placed", "lot_countdown"),
+        heartbeat_seconds: float = 20,
+        idle_timeout_seconds: float = 60,
+        wheel: Optional[TimingWheel] = None,
+    ):
+        self.active_connections: Dict[str, Dict[WebSocket, ClientConnection]] = {}
+        self.broker = broker if broker is not None else create_broker()
+        self.broker.attach(self._deliver)
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+        self.spectator_interval = 1 / spectator_hz if spectator_hz > 0 else 0
+        self.conflated_types = frozenset(conflated_types)
+        self._remote_handlers: List[RemoteHandler] = []
+        self._snapshot_providers: Dict[str, SnapshotProvider] = {}
+        self._spectators: Dict[str, int] = {}
+        self._conflation: Dict[str, _Conflation] = {}
+        self.heartbeat_interval = heartbeat_seconds if heartbeat_seconds > 0 else 0
+        self.idle_timeout = idle_timeout_seconds if idle_timeout_seconds > 0 else 0
+        self._wheel = wheel if wheel is not None else TimingWheel(tick_ms=500, slots=256)
+        self._tasks: Set[asyncio.Task] = set()  # disconnects nobody awaits
+
+    async def start(self) -> None:
+        await self.broker.start()
+        await self._wheel.start()
+
+    async def stop(self) -> None:
+        await self.broker.stop()
+        await self._wheel.stop()
+        for state in self._conflation.values():
+            if state.handle is not None:
+                state.handle.cancel()
+        self._conflation.clear()
+        for connections in list(self.active_connections.values()):
+            for connection in list(connections.values()):
+                await connection.close()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def on_remote_message(self, handler: RemoteHandler) -> None:
+        """Call `handler(room, message)` for broadcasts published by other workers."""
+        if handler not in self._remote_handlers:
+            self._remote_handlers.append(handler)
+
+    def set_snapshot_provider(self, prefix: str, provider: SnapshotProvider) -> None:
+        """Register `provider(room)` returning the current state of rooms starting with `prefix`."""
+        self._snapshot_providers[prefix] = provider
+
+    def snapshot_provider(self, room: str) -> Optional[SnapshotProvider]:
+        for prefix, provider in self._snapshot_providers.items():
+            if room.startswith(prefix):
+                return provider
+        return None
+
+    async def connect(
+        self,
+        room: str,
+        websocket: WebSocket,
+        encoding: str = ENCODING_JSON,
+        subprotocol: Optional[str] = None,
+        subscription: str = SUBSCRIPTION_FULL,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """Add a connection to a room, sending frames in `encoding`.
 
-    async def connect(self, room: str, websocket: WebSocket) -> None:
-        """Add a connection to a room."""
-        await websocket.accept()
+        `expires_at` (unix time, e.g. the token's `exp`) closes the
+        connection at that time unless moved with `set_expiry`.
+        """
+        await websocket.accept(subprotocol=subprotocol)
         if room not in self.active_connections:
-            self.active_connections[room] = set()
-        self.active_connections[room].add(websocket)
+            self.active_connections[room] = {}
+            rooms_gauge.set(len(self.active_connections))
+        connection = ClientConnection(self, room, websocket, self.max_queue, self.overflow_policy, encoding, subscription)
+        connection.expires_at = expires_at
+        connection.next_ping = connection.last_seen + self.heartbeat_interval
+        self.active_connections[room][websocket] = connection
+        connections_gauge.inc(subscription=subscription)
+        if subscription == SUBSCRIPTION_SPECTATOR:
+            self._spectators[room] = self._spectators.get(room, 0) + 1
+        self._schedule_check(connection)
 
-    async def disconnect(self, room: str, websocket: WebSocket) -> None:
+    async def disconnect(
+        self,
+        room: str,
+        websocket: WebSocket,
+        code: Optional[int] = None,
+        reason: Optional[str] = None,
+    ) -> None:
         """Remove a connection from a room and clean up empty rooms."""
-        if room in self.active_connections:
-            self.active_connections[room].discard(websocket)
-            if not self.active_connections[room]:
-                del self.active_connections[room]
+        connections = self.active_connections.get(room)
+        if connections is None:
+            return
+        connection = connections.pop(websocket, None)
+        if connection is not None:
+            connections_gauge.dec(subscription=connection.subscription)
+        if connection is not None and connection.subscription == SUBSCRIPTION_SPECTATOR:
+            self._spectators[room] -= 1
+            if not self._spectators[room]:
+                del self._spectators[room]
+                state = self._conflation.pop(room, None)
+                if state is not None and state.handle is not None:
+                    state.handle.cancel()
+        if not connections:
+            del self.active_connections[room]
+            rooms_gauge.set(len(self.active_connections))
+            fanout_latency.remove(room=room)
+            broadcast_seconds.remove(room=room)
+        if connection is not None:
+            await connection.close(code, reason)
+
+    def touch(self, room: str, websocket: WebSocket) -> None:
+        """Record that the client sent something (any message, including `pong`)."""
+        connection = self.active_connections.get(room, {}).get(websocket)
+        if connection is not None:
+            connection.last_seen = asyncio.get_running_loop().time()
+
+    def set_expiry(self, room: str, websocket: WebSocket, expires_at: Optional[float]) -> None:
+        """Move the time the connection is closed for an expired token (None: never)."""
+        connection = self.active_connections.get(room, {}).get(websocket)
+        if connection is not None:
+            connection.expires_at = expires_at
+            self._schedule_check(connection)
+
+    def _schedule_check(self, connection: ClientConnection) -> None:
+        """Arm the connection's timer for its next ping or token expiry, whichever is first."""
+        loop_now = asyncio.get_running_loop().time()
+        delays = []
+        if self.heartbeat_interval:
+            delays.append(connection.next_ping - loop_now)
+        if connection.expires_at is not None:
+            delays.append(connection.expires_at - time.time())
+        if delays:
+            self._wheel.schedule(connection, max(0.0, min(delays)), lambda: self._check(connection))
+        else:
+            self._wheel.cancel(connection)
+
+    def _check(self, connection: ClientConnection) -> None:
+        """Timer callback: reap the connection if expired or idle, else ping it."""
+        if connection.closed:
+            return
+        loop_now = asyncio.get_running_loop().time()
+        if connection.expires_at is not None and time.time() >= connection.expires_at:
+            self._reap(connection, "token_expired", status.WS_1008_POLICY_VIOLATION, "Token expired")
+            return
+        if self.idle_timeout and loop_now - connection.last_seen > self.idle_timeout:
+            self._reap(connection, "idle", status.WS_1001_GOING_AWAY, "Idle timeout")
+            return
+        if self.heartbeat_interval and loop_now >= connection.next_ping - self._wheel.tick:
+            connection.enqueue(_PING.get(connection.encoding), time.perf_counter())
+            connection.next_ping = loop_now + self.heartbeat_interval
+        self._schedule_check(connection)
+
+    def _reap(self, connection: ClientConnection, reason: str, code: int, detail: str) -> None:
+        connections_reaped.inc(reason=reason)
+        connection.closed = True
+        self._spawn(self.disconnect(connection.room, connection.websocket, code=code, reason=detail))
+
+    async def send_personal(self, room: str, websocket: WebSocket, message: dict) -> None:
+        """Queue a message for one connection, behind anything already queued for it."""
+        connection = self.active_connections.get(room, {}).get(websocket)
+        if connection is not None:
+            connection.enqueue(encode(message, connection.encoding), time.perf_counter())
 
     async def broadcast_to_room(self, room: str, message: dict) -> None:
-        """Broadcast a message to all connections in a room.
-        
+        """Broadcast a message to all connections in a room, on every worker.
+
         Args:
             room: Room identifier (e.g., auction:123abc, match:456def)
             message: JSON-serializable dict to broadcast
         """
-        if room not in self.active_connections:
+        await self.broker.publish(room, json.dumps(message))
+
+    async def broadcast_local(self, room: str, message: dict) -> None:
+        """Broadcast to this worker's connections only.
+
+        For messages every worker produces itself (e.g. countdown ticks
+        driven by the shared event stream).
+        """
+        self._fan_out(room, FrameSet(message=message))
+
+    async def _deliver(self, room: str, payload: str, remote: bool) -> None:
+        frames = FrameSet(text=payload)
+        if remote and self._remote_handlers:
+            # Handlers first, so a socket resuming from the event log never
+            # misses a message that was fanned out before it was logged
+            message = frames.message
+            for handler in self._remote_handlers:
+                try:
+                    await handler(room, message)
+                except Exception as exc:
+                    logger.error("Remote broadcast handler failed for %s: %s", room, exc, exc_info=exc)
+        self._fan_out(room, frames)
+
+    def _fan_out(self, room: str, frames: FrameSet) -> None:
+        connections = self.active_connections.get(room)
+        if not connections:
             return
+        started = time.perf_counter()
+        spectators = self._spectators.get(room, 0) if self.spectator_interval else 0
+        conflate = False
+        if spectators:
+            conflate = frames.message.get("type") in self.conflated_types
+            if not conflate:
+                # Anything held back goes first, so spectators keep event order
+                self._flush_conflated(room)
 
-        payload = json.dumps(message)
-        disconnected = []
+        for connection in list(connections.values()):
+            if conflate and connection.subscription == SUBSCRIPTION_SPECTATOR:
+                continue
+            connection.enqueue(frames.get(connection.encoding), started)
 
-        for connection in self.active_connections[room]:
-            try:
-                await connection.send_text(payload)
-            except Exception as e:
-                # Connection closed or errored; mark for removal
-                disconnected.append(connection)
+        frames_queued.inc(len(connections) - spectators, subscription=SUBSCRIPTION_FULL)
+        if conflate:
+            self._hold(room, frames)
+        elif spectators:
+            frames_queued.inc(spectators, subscription=SUBSCRIPTION_SPECTATOR)
+        broadcast_seconds.observe(time.perf_counter() - started, room=room)
+
+    def _hold(self, room: str, frames: FrameSet) -> None:
+        """Keep `frames` as the latest message of its type for the room's spectators."""
+        state = self._conflation.get(room)
+        if state is None:
+            state = self._conflation[room] = _Conflation()
+        kind = frames.message.get("type")
+        if kind in state.pending:
+            frames_conflated.inc(self._spectators.get(room, 0))
+        state.pending[kind] = frames
+        if state.handle is None:
+            loop = asyncio.get_running_loop()
+            delay = max(0.0, state.last_flush + self.spectator_interval - loop.time())
+            state.handle = loop.call_later(delay, self._flush_conflated, room)
+
+    def _flush_conflated(self, room: str) -> None:
+        state = self._conflation.get(room)
+        if state is None or not state.pending:
+            return
+        if state.handle is not None:
+            state.handle.cancel()
+            state.handle = None
+        state.last_flush = asyncio.get_running_loop().time()
+        pending = list(state.pending.values())
+        state.pending.clear()
 
-        # Clean up disconnected connections
-        for connection in disconnected:
-            await self.disconnect(room, connection)
+        started = time.perf_counter()
+        spectators = [
+            connection
+            for connection in self.active_connections.get(room, {}).values()
+            if connection.subscription == SUBSCRIPTION_SPECTATOR
+        ]
+        for frames in pending:
+            for connection in spectators:
+                connection.enqueue(frames.get(connection.encoding), started)
+        frames_queued.inc(len(spectators) * len(pending), subscription=SUBSCRIPTION_SPECTATOR)
 
 
 # Global connection manager instance
-manager = ConnectionManager()
+manager = ConnectionManager(
+    max_queue=settings.ws_send_queue_size,
+    overflow_policy=settings.ws_overflow_policy,
+    spectator_hz=settings.ws_spectator_hz,
+    conflated_types=settings.ws_conflated_types.split(","),
+    heartbeat_seconds=settings.ws_heartbeat_seconds,
+    idle_timeout_seconds=settings.ws_idle_timeout_seconds,
+)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Benchmark the bid paths selectable with BID_MODE.
+
+Creates throwaway users, teams, a player and an auction per run in the
+configured database, then has `--bidders` concurrent teams place
+`--bids` bids each through `auction_service.place_bid`. Every BID_MODE in
+`--modes` is run under every AUCTION_CONCURRENCY in `--concurrency`.
+
+With `--admin-interval-ms` an admin task pauses and restarts the auction
+at that interval while bids flow, to measure mixed admin and bid load.
+Reports accepted bids, throughput and p50/p99 latency per run.
+
+Usage (inside the backend container):
+  python scripts/bench_bid_paths.py --modes locking,single_statement --bidders 8 --bids 50
+  python scripts/bench_bid_paths.py --modes locking --concurrency pessimistic,optimistic --admin-interval-ms 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+from fastapi import HTTPException
+
+from app.db.session import AsyncSessionLocal, init_db
+from app.models import User, Team, Player, Auction
+from app.models.enums import AuctionStatusEnum
+from app.services import auction_service
+from app.services.auction_engine import auction_engine
+
+
+async def create_fixture(bidders: int):
+    run = uuid4().hex[:8]
+    async with AsyncSessionLocal() as session:
+        managers = [
+            User(
+                id=str(uuid4()),
+                email=f"bench-{run}-{i}@example.com",
+                username=f"bench-{run}-{i}",
+                password_hash="!",
+                role="team_manager",
+            )
+            for i in range(bidders)
+        ]
+        session.add_all(managers)
+        await session.flush()
+        teams = [
+            Team(id=str(uuid4()), name=f"bench-{run}-{i}", manager_id=manager.id, budget_spent=0)
+            for i, manager in enumerate(managers)
+        ]
+        player = Player(id=str(uuid4()), name=f"bench-{run}", role="batsman", base_price=100, is_approved=True)
+        session.add_all(teams + [player])
+        await session.flush()
+        auction = Auction(
+            id=str(uuid4()),
+            name=f"bench-{run}",
+            status=AuctionStatusEnum.ONGOING.value,
+            current_player_id=player.id,
+            total_revenue=0,
+        )
+        session.add(auction)
+        await session.commit()
+    return auction.id, [team.id for team in teams]
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        return 0.0, 0.0
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return statistics.median(latencies), p99
+
+
+async def run_mode(mode: str, concurrency: str, bidders: int, bids: int, admin_interval_ms: int):
+    auction_service.settings.bid_mode = mode
+    auction_service.settings.auction_concurrency = concurrency
+    auction_id, team_ids = await create_fixture(bidders)
+    latencies = []
+    admin_latencies = []
+    accepted = 0
+    price = [100]
+    running = True
+
+    async def bidder(team_id: str):
+        nonlocal accepted
+        for _ in range(bids):
+            price[0] += 1
+            start = time.perf_counter()
+            async with AsyncSessionLocal() as session:
+                try:
+                    await auction_service.place_bid(session, auction_id, team_id, price[0], 1)
+                    accepted += 1
+                except HTTPException:
+                    pass
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    async def admin():
+        while running:
+            await asyncio.sleep(admin_interval_ms / 1000)
+            for action in (auction_service.pause_auction, auction_service.start_auction):
+                start = time.perf_counter()
+                async with AsyncSessionLocal() as session:
+                    try:
+                        await action(session, auction_id)
+                    except HTTPException:
+                        pass
+                admin_latencies.append((time.perf_counter() - start) * 1000)
+
+    admin_task = asyncio.create_task(admin()) if admin_interval_ms > 0 else None
+    started = time.perf_counter()
+    await asyncio.gather(*(bidder(team_id) for team_id in team_ids))
+    elapsed = time.perf_counter() - started
+    running = False
+    if admin_task is not None:
+        await admin_task
+    await auction_engine.flush_all()
+
+    p50, p99 = percentiles(latencies)
+    line = (
+        f"{mode:>16} / {concurrency:<11}: {len(latencies)} bids, {accepted} accepted, "
+        f"{len(latencies) / elapsed:8.1f} bids/s, p50 {p50:6.2f} ms, p99 {p99:6.2f} ms"
+    )
+    if admin_latencies:
+        admin_p50, admin_p99 = percentiles(admin_latencies)
+        line += f" | admin {len(admin_latencies)} ops, p50 {admin_p50:6.2f} ms, p99 {admin_p99:6.2f} ms"
+    print(line)
+
+
+async def main(modes, concurrencies, bidders: int, bids: int, admin_interval_ms: int):
+    await init_db()
+    await auction_engine.start()
+    try:
+        for concurrency in concurrencies:
+            for mode in modes:
+                await run_mode(mode, concurrency, bidders, bids, admin_interval_ms)
+    finally:
+        await auction_service.bid_pipeline.stop()
+        await auction_engine.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", default="locking,single_statement", help="Comma-separated BID_MODE values")
+    parser.add_argument("--bidders", type=int, default=8, help="Concurrent bidding teams")
+    parser.add_argument("--bids", type=int, default=50, help="Bids per team")
+    parser.add_argument("--concurrency", default="pessimistic", help="Comma-separated AUCTION_CONCURRENCY values")
+    parser.add_argument("--admin-interval-ms", type=int, default=0, help="Pause/start the auction at this interval (0 = no admin load)")
+    args = parser.parse_args()
+    asyncio.run(main(
+        args.modes.split(","),
+        args.concurrency.split(","),
+        args.bidders,
+        args.bids,
+        args.admin_interval_ms,
+    ))
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Compare bid latency over REST and over the auction WebSocket.
+
+Creates two throwaway team managers with a team each, a player and an
+ongoing auction in the configured database, then has the two teams
+outbid each other `--bids` times through `POST /api/v1/auctions/{id}/bid`
+and `--bids` times through `bid` messages on `/ws/auctions/{id}` of a
+running server. Latency is measured client side: request to response for
+REST, bid message to `bid_ack`/`bid_rejected` for the WebSocket.
+
+The bid rate limit is per client address, so every REST request and every
+WebSocket connection (reused for up to 25 bids) sends its own
+X-Forwarded-For address.
+
+Usage (server running, same DATABASE_URL and SECRET_KEY):
+  python scripts/bench_bid_transport.py --url http://localhost:8000 --bids 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from itertools import count
+from uuid import uuid4
+
+import httpx
+import websockets
+
+from app.core.security import create_access_token
+from app.db.session import AsyncSessionLocal, init_db
+from app.models import Auction, Player, Team, User
+from app.models.enums import AuctionStatusEnum
+
+BIDS_PER_SOCKET = 25
+_addresses = count(1)
+
+
+def next_address() -> str:
+    n = next(_addresses)
+    return f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+
+async def create_fixture():
+    run = uuid4().hex[:8]
+    async with AsyncSessionLocal() as session:
+        managers = [
+            User(
+                id=str(uuid4()),
+                email=f"bench-{run}-{i}@example.com",
+                username=f"bench-{run}-{i}",
+                password_hash="!",
+                role="team_manager",
+            )
+            for i in range(2)
+        ]
+        session.add_all(managers)
+        await session.flush()
+        teams = [
+            Team(id=str(uuid4()), name=f"bench-{run}-{i}", manager_id=manager.id, budget_spent=0)
+            for i, manager in enumerate(managers)
+        ]
+        player = Player(id=str(uuid4()), name=f"bench-{run}", role="batsman", base_price=100, is_approved=True)
+        session.add_all(teams + [player])
+        await session.flush()
+        auction = Auction(
+            id=str(uuid4()),
+            name=f"bench-{run}",
+            status=AuctionStatusEnum.ONGOING.value,
+            current_player_id=player.id,
+            total_revenue=0,
+        )
+        session.add(auction)
+        await session.commit()
+    bidders = [(create_access_token(manager.id), team.id) for manager, team in zip(managers, teams)]
+    return auction.id, bidders
+
+
+def summary(label: str, latencies, accepted: int) -> str:
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return f"{label:>9}: {len(latencies)} bids, {accepted} accepted, p50 {p50:6.2f} ms, p99 {p99:6.2f} ms"
+
+
+async def bench_rest(url: str, auction_id: str, bidders, bids: int, price):
+    latencies, accepted = [], 0
+    async with httpx.AsyncClient(base_url=url) as client:
+        for i in range(bids):
+            token, team_id = bidders[i % 2]
+            price[0] += 1
+            started = time.perf_counter()
+            res = await client.post(
+                f"/api/v1/auctions/{auction_id}/bid",
+                json={"team_id": team_id, "amount": price[0], "min_increment": 1},
+                headers={"Authorization": f"Bearer {token}", "X-Forwarded-For": next_address()},
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            accepted += res.status_code == 201
+    return latencies, accepted
+
+
+async def bench_ws(url: str, auction_id: str, bidders, bids: int, price):
+    ws_url = url.replace("http", "ws", 1) + f"/ws/auctions/{auction_id}"
+    latencies, accepted = [], 0
+    sent = 0
+    while sent < bids:
+        address = next_address()
+        sockets = [
+            await websockets.connect(f"{ws_url}?token={token}", additional_headers={"X-Forwarded-For": address})
+            for token, _ in bidders
+        ]
+        try:
+            for _ in range(min(BIDS_PER_SOCKET, bids - sent)):
+                socket = sockets[sent % 2]
+                client_id = uuid4().hex
+                price[0] += 1
+                started = time.perf_counter()
+                await socket.send(json.dumps({
+                    "type": "bid",
+                    "client_id": client_id,
+                    "team_id": bidders[sent % 2][1],
+                    "amount": price[0],
+                    "min_increment": 1,
+                }))
+                while True:
+                    reply = json.loads(await socket.recv())
+                    if reply.get("client_id") == client_id:
+                        break
+                latencies.append((time.perf_counter() - started) * 1000)
+                accepted += reply["type"] == "bid_ack"
+                sent += 1
+        finally:
+            for socket in sockets:
+                await socket.close()
+    return latencies, accepted
+
+
+async def main(url: str, bids: int):
+    await init_db()
+    auction_id, bidders = await create_fixture()
+    price = [100]
+    for label, bench in (("rest", bench_rest), ("websocket", bench_ws)):
+        latencies, accepted = await bench(url, auction_id, bidders, bids, price)
+        print(summary(label, latencies, accepted))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the running server")
+    parser.add_argument("--bids", type=int, default=200, help="Bids per transport")
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.bids))
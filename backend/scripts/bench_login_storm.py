@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Check that bids keep flowing while many users log in at once.
+
+Creates `--users` throwaway users sharing one password, two team managers
+with a team each, a player and an ongoing auction in the configured
+database. Against a running server it then keeps a steady stream of bids
+(`POST /api/v1/auctions/{id}/bid`, every `--interval-ms`) and `/health`
+probes going, first for `--quiet` seconds on their own and then while all
+users log in through `POST /api/v1/auth/login`, `--concurrency` at a time.
+
+Bid and probe latencies show how long the server's event loop was blocked:
+with bcrypt on the loop each login stalls every other request for its full
+hashing time. The run fails (exit status 1) when the p99 bid latency during
+the storm exceeds the quiet p99 by more than `--max-lag-ms`.
+
+Usage (server running, same DATABASE_URL and SECRET_KEY):
+  python scripts/bench_login_storm.py --url http://localhost:8000 --users 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from itertools import count
+from typing import List
+from uuid import uuid4
+
+import httpx
+
+from app.core.hash import hash_password
+from app.core.security import create_access_token
+from app.db.session import AsyncSessionLocal, init_db
+from app.models import Auction, Player, Team, User
+from app.models.enums import AuctionStatusEnum
+
+PASSWORD = "login-storm-password"
+_addresses = count(1)
+
+
+def next_address() -> str:
+    n = next(_addresses)
+    return f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+
+async def create_fixture(users: int):
+    run = uuid4().hex[:8]
+    password_hash = hash_password(PASSWORD)
+    async with AsyncSessionLocal() as session:
+        managers = [
+            User(
+                id=str(uuid4()),
+                email=f"storm-{run}-m{i}@example.com",
+                username=f"storm-{run}-m{i}",
+                password_hash="!",
+                role="team_manager",
+            )
+            for i in range(2)
+        ]
+        members = [
+            User(
+                id=str(uuid4()),
+                email=f"storm-{run}-{i}@example.com",
+                username=f"storm-{run}-{i}",
+                password_hash=password_hash,
+                role="player",
+            )
+            for i in range(users)
+        ]
+        session.add_all(managers + members)
+        await session.flush()
+        teams = [
+            Team(id=str(uuid4()), name=f"storm-{run}-{i}", manager_id=manager.id, budget_spent=0)
+            for i, manager in enumerate(managers)
+        ]
+        player = Player(id=str(uuid4()), name=f"storm-{run}", role="batsman", base_price=100, is_approved=True)
+        session.add_all(teams + [player])
+        await session.flush()
+        auction = Auction(
+            id=str(uuid4()),
+            name=f"storm-{run}",
+            status=AuctionStatusEnum.ONGOING.value,
+            current_player_id=player.id,
+            total_revenue=0,
+        )
+        session.add(auction)
+        await session.commit()
+    bidders = [(create_access_token(manager.id), team.id) for manager, team in zip(managers, teams)]
+    return auction.id, bidders, [user.email for user in members]
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return "no samples"
+    values = sorted(values)
+    p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+    return f"n={len(values):<5} p50 {statistics.median(values):7.1f} ms  p99 {p99:7.1f} ms  max {values[-1]:7.1f} ms"
+
+
+def p99(values: List[float]) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * 0.99))] if values else 0.0
+
+
+class Traffic:
+    """Paced bids and health probes, their latencies split by phase."""
+
+    def __init__(self, client: httpx.AsyncClient, auction_id: str, bidders, interval: float):
+        self.client = client
+        self.auction_id = auction_id
+        self.bidders = bidders
+        self.interval = interval
+        self.phase = "quiet"
+        self.bids = {"quiet": [], "storm": []}
+        self.probes = {"quiet": [], "storm": []}
+        self.rejected = 0
+        self.errors = 0
+        self.price = 100
+        self.running = True
+
+    async def _bids(self) -> None:
+        i = 0
+        while self.running:
+            token, team_id = self.bidders[i % 2]
+            self.price += 1
+            phase, started = self.phase, time.perf_counter()
+            try:
+                res = await self.client.post(
+                    f"/api/v1/auctions/{self.auction_id}/bid",
+                    json={"team_id": team_id, "amount": self.price, "min_increment": 1},
+                    headers={"Authorization": f"Bearer {token}", "X-Forwarded-For": next_address()},
+                )
+                self.rejected += res.status_code != 201
+            except httpx.TransportError:
+                self.errors += 1
+            elapsed = time.perf_counter() - started
+            self.bids[phase].append(elapsed * 1000)
+            i += 1
+            await asyncio.sleep(max(self.interval - elapsed, 0))
+
+    async def _probes(self) -> None:
+        while self.running:
+            phase, started = self.phase, time.perf_counter()
+            try:
+                await self.client.get("/health")
+            except httpx.TransportError:
+                self.errors += 1
+            elapsed = time.perf_counter() - started
+            self.probes[phase].append(elapsed * 1000)
+            await asyncio.sleep(max(self.interval - elapsed, 0))
+
+    async def run(self) -> None:
+        await asyncio.gather(self._bids(), self._probes())
+
+
+async def login_storm(url: str, emails: List[str], concurrency: int):
+    latencies, statuses = [], {}
+    slots = asyncio.Semaphore(concurrency)
+    # A connection per login, as separate users would open
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=0)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+
+        async def login(email: str) -> None:
+            async with slots:
+                started = time.perf_counter()
+                res = await client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[res.status_code] = statuses.get(res.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login(email) for email in emails))
+    return latencies, statuses, time.perf_counter() - started
+
+
+async def main(args) -> int:
+    await init_db()
+    auction_id, bidders, emails = await create_fixture(args.users)
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=120) as client:
+        traffic = Traffic(client, auction_id, bidders, args.interval_ms / 1000)
+        background = asyncio.create_task(traffic.run())
+        await asyncio.sleep(args.quiet)
+        traffic.phase = "storm"
+        logins, statuses, storm_seconds = await login_storm(args.url, emails, args.concurrency)
+        traffic.running = False
+        await background
+
+    print(f"logins: {len(emails)} in {storm_seconds:.1f} s, status {statuses}")
+    print(f"  login latency  {percentiles(logins)}")
+    for phase in ("quiet", "storm"):
+        print(f"{phase:>5} bids      {percentiles(traffic.bids[phase])}")
+        print(f"{phase:>5} /health   {percentiles(traffic.probes[phase])}")
+    print(f"bids not accepted: {traffic.rejected}, requests failed: {traffic.errors}")
+
+    lag = p99(traffic.bids["storm"]) - p99(traffic.bids["quiet"])
+    ok = lag <= args.max_lag_ms
+    print(f"{'PASS' if ok else 'FAIL'}: bid p99 rose {lag:.1f} ms during the storm (limit {args.max_lag_ms:.0f} ms)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the running server")
+    parser.add_argument("--users", type=int, default=200, help="Users logging in during the storm")
+    parser.add_argument("--concurrency", type=int, default=50, help="Logins in flight at once")
+    parser.add_argument("--interval-ms", type=float, default=20, help="Pause between bids (and between probes)")
+    parser.add_argument("--quiet", type=float, default=3, help="Seconds of bids before the storm")
+    parser.add_argument("--max-lag-ms", type=float, default=100, help="Allowed rise of the bid p99 during the storm")
+    sys.exit(asyncio.run(main(parser.parse_args())))
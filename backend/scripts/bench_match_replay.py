@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Measure how long loading a match's scoreboard takes as the match grows.
+
+Creates one throwaway match per `--events` size in the configured database,
+with synthetic ball-by-ball events (and a snapshot every
+MATCH_SNAPSHOT_INTERVAL events, as appends store them), then times cold
+loads (`match_scoreboard.replay`) from the first event and from the latest
+snapshot.
+
+Usage:
+  python scripts/bench_match_replay.py --events 100 1000 5000 20000 --reads 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime
+from itertools import islice
+from uuid import uuid4
+
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal, init_db
+from app.models import Match, MatchEvent, Team, User
+from app.models.enums import EventTypeEnum, MatchStatusEnum, MatchTypeEnum
+from app.services.match_scoreboard import Scoreboard, scoreboard_replays, replay, snapshot_due, snapshot_row
+
+settings = get_settings()
+CHUNK = 1000
+
+
+def synthetic_events(team_ids, rng: random.Random):
+    """An endless match: innings after innings of random deliveries."""
+    yield EventTypeEnum.MATCH_STARTED.value, {}
+    for number in range(1_000_000):
+        yield EventTypeEnum.INNINGS_STARTED.value, {"batting_team_id": team_ids[number % 2]}
+        wickets, batter = 0, 0
+        while wickets < 10:
+            bowler = f"bowler-{rng.randrange(5)}"
+            for _ in range(6):
+                data = {"batter_id": f"batter-{batter}", "bowler_id": bowler}
+                if rng.random() < 0.015:
+                    wickets += 1
+                    batter += 1
+                    yield EventTypeEnum.WICKET.value, dict(data, kind="bowled")
+                    if wickets == 10:
+                        break
+                else:
+                    yield EventTypeEnum.RUN_SCORED.value, dict(data, runs=rng.choice((0, 0, 0, 1, 1, 2, 4, 6)))
+            else:
+                yield EventTypeEnum.OVER_COMPLETED.value, {}
+        yield EventTypeEnum.INNINGS_ENDED.value, {}
+
+
+async def create_match(team_ids, events: int, rng: random.Random) -> str:
+    match = Match(
+        id=str(uuid4()),
+        name=f"bench-{events}",
+        match_type=MatchTypeEnum.TEST.value,
+        status=MatchStatusEnum.ONGOING.value,
+        team_1_id=team_ids[0],
+        team_2_id=team_ids[1],
+        scheduled_at=datetime.utcnow(),
+        team_1_score=0,
+        team_2_score=0,
+        last_event_seq=0,
+    )
+    board = Scoreboard.empty(match)
+    async with AsyncSessionLocal() as session:
+        session.add(match)
+        await session.flush()
+        rows = []
+        for seq, (event_type, data) in enumerate(islice(synthetic_events(team_ids, rng), events), start=1):
+            board.apply(seq, event_type, data)
+            rows.append(MatchEvent(
+                id=str(uuid4()),
+                match_id=match.id,
+                event_type=event_type,
+                sequence_number=seq,
+                event_timestamp=datetime.utcnow(),
+                event_data=json.dumps(data) if data else None,
+            ))
+            if snapshot_due(seq):
+                rows.append(snapshot_row(board))
+            if len(rows) >= CHUNK:
+                session.add_all(rows)
+                await session.flush()
+                rows = []
+        session.add_all(rows)
+        match.last_event_seq = board.last_seq
+        match.team_1_score = board.totals[team_ids[0]]
+        match.team_2_score = board.totals[team_ids[1]]
+        await session.commit()
+    return match.id
+
+
+async def time_reads(match_id: str, reads: int, use_snapshots: bool):
+    timings = []
+    replayed_before = scoreboard_replays.value()
+    for _ in range(reads):
+        async with AsyncSessionLocal() as session:
+            match = await session.get(Match, match_id)
+            started = time.perf_counter()
+            await replay(session, match, use_snapshots=use_snapshots)
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), (scoreboard_replays.value() - replayed_before) / reads
+
+
+async def main(sizes, reads: int):
+    await init_db()
+    run = uuid4().hex[:8]
+    async with AsyncSessionLocal() as session:
+        managers = [
+            User(
+                id=str(uuid4()),
+                email=f"bench-{run}-{i}@example.com",
+                username=f"bench-{run}-{i}",
+                password_hash="!",
+                role="team_manager",
+            )
+            for i in range(2)
+        ]
+        session.add_all(managers)
+        await session.flush()
+        teams = [
+            Team(id=str(uuid4()), name=f"bench-{run}-{i}", manager_id=manager.id, budget_spent=0)
+            for i, manager in enumerate(managers)
+        ]
+        session.add_all(teams)
+        await session.commit()
+    team_ids = [team.id for team in teams]
+
+    rng = random.Random(7)
+    print(f"snapshot interval {settings.match_snapshot_interval}, median of {reads} cold loads")
+    print(f"{'events':>8} {'full replay':>22} {'from snapshot':>22}")
+    for events in sizes:
+        match_id = await create_match(team_ids, events, rng)
+        full_ms, full_events = await time_reads(match_id, reads, use_snapshots=False)
+        snap_ms, snap_events = await time_reads(match_id, reads, use_snapshots=True)
+        print(
+            f"{events:>8} {full_ms:>9.2f} ms {full_events:>6.0f} ev"
+            f" {snap_ms:>9.2f} ms {snap_events:>6.0f} ev"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, nargs="+", default=[100, 1000, 5000, 20000], help="Match sizes")
+    parser.add_argument("--reads", type=int, default=20, help="Cold loads timed per match and mode")
+    args = parser.parse_args()
+    asyncio.run(main(args.events, args.reads))
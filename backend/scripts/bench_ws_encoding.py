@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Benchmark WebSocket broadcast encoding.
+
+Broadcasts `--messages` auction events to a room of `--sockets` null
+sockets through `ConnectionManager`, once per encoding in `--encodings`,
+and reports CPU time per 10k deliveries and bytes per frame. Each
+encoding is measured twice: encoding every frame per socket (the old
+behaviour) and encoding once per broadcast (`FrameSet`). No database or
+network is involved; the sockets discard what they are sent.
+
+msgpack encodings are only available when the msgpack package is installed.
+
+Usage (inside the backend container):
+  python scripts/bench_ws_encoding.py --sockets 1000 --messages 50
+  python scripts/bench_ws_encoding.py --encodings json,json+deflate,msgpack,msgpack+deflate
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from app.websocket import manager as manager_module
+from app.websocket.broker import InProcessBroker
+from app.websocket.codec import SUPPORTED_ENCODINGS, FrameSet, encode
+from app.websocket.manager import ConnectionManager
+
+
+class NullSocket:
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data: str):
+        self.frames += 1
+        self.bytes += len(data.encode())
+
+    async def send_bytes(self, data: bytes):
+        self.frames += 1
+        self.bytes += len(data)
+
+    async def close(self, code=None):
+        pass
+
+
+class PerSocketFrames(FrameSet):
+    """Encodes on every `get`, as when each socket serialized for itself."""
+
+    def get(self, encoding: str):
+        return encode(self.message, encoding)
+
+
+def sample_event(seq: int) -> dict:
+    return {
+        "type": "bid_placed",
+        "seq": seq,
+        "auction_id": str(uuid4()),
+        "player_id": str(uuid4()),
+        "team_id": str(uuid4()),
+        "amount": 1_000_000 + seq * 50_000,
+        "proxy": False,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+async def run(encoding: str, sockets: int, messages: int, per_socket: bool):
+    manager_module.FrameSet = PerSocketFrames if per_socket else FrameSet
+    manager = ConnectionManager(broker=InProcessBroker(), max_queue=messages + 1)
+    room = "auction:bench"
+    clients = [NullSocket() for _ in range(sockets)]
+    for client in clients:
+        await manager.connect(room, client, encoding)
+
+    started = time.process_time()
+    for seq in range(1, messages + 1):
+        await manager.broadcast_to_room(room, sample_event(seq))
+    while sum(client.frames for client in clients) < sockets * messages:
+        await asyncio.sleep(0)
+    elapsed = time.process_time() - started
+
+    for client in clients:
+        await manager.disconnect(room, client)
+    manager_module.FrameSet = FrameSet
+    deliveries = sockets * messages
+    return elapsed / deliveries * 10_000, sum(client.bytes for client in clients) / deliveries
+
+
+async def main(encodings, sockets: int, messages: int):
+    print(f"{'encoding':<18} {'frames':<10} {'cpu ms / 10k':>13} {'bytes / frame':>14}")
+    for encoding in encodings:
+        if encoding not in SUPPORTED_ENCODINGS:
+            print(f"{encoding:<18} not available")
+            continue
+        for per_socket in (True, False):
+            cpu, size = await run(encoding, sockets, messages, per_socket)
+            label = "per socket" if per_socket else "once"
+            print(f"{encoding:<18} {label:<10} {cpu * 1000:>13.1f} {size:>14.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--encodings", default=",".join(SUPPORTED_ENCODINGS), help="Comma-separated encodings")
+    parser.add_argument("--sockets", type=int, default=1000, help="Sockets in the room")
+    parser.add_argument("--messages", type=int, default=50, help="Broadcasts to send")
+    args = parser.parse_args()
+    asyncio.run(main(args.encodings.split(","), args.sockets, args.messages))
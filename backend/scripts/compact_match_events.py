@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Compact match snapshots.
+
+For every match (or the ones given with `--match`):
+
+- if more than MATCH_SNAPSHOT_INTERVAL events follow its latest snapshot
+  (e.g. matches scored before snapshots existed), or it is finished and has
+  no snapshot at its last event, stores a snapshot at the last event, so
+  loading it replays at most the usual tail;
+- deletes all but the `--keep` most recent snapshots.
+
+Events are never deleted: they stay the source of truth and the history
+served by `GET /matches/{id}/events`. Safe to run while matches are scored:
+each match is handled in its own transaction under the match row lock.
+
+Usage (inside the backend container):
+  python scripts/compact_match_events.py --dry-run
+  python scripts/compact_match_events.py --match <match_id> --keep 2
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import delete, func, select
+
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal, init_db
+from app.db.transactions import lock_row, run_transaction
+from app.models import Match, MatchSnapshot
+from app.models.enums import MatchStatusEnum
+from app.services.match_scoreboard import replay, snapshot_row
+
+settings = get_settings()
+
+
+async def compact_match(match_id: str, keep: int, dry_run: bool):
+    """Returns (snapshot written, snapshots deleted) for one match."""
+    async with AsyncSessionLocal() as session:
+
+        async def unit():
+            match = await lock_row(session, Match, Match.id == match_id)
+            if match is None or not match.last_event_seq:
+                return False, 0
+            res = await session.execute(
+                select(func.max(MatchSnapshot.sequence_number)).where(MatchSnapshot.match_id == match_id)
+            )
+            latest = res.scalar() or 0
+            tail = match.last_event_seq - latest
+            finished = match.status in (MatchStatusEnum.COMPLETED.value, MatchStatusEnum.CANCELLED.value)
+            write = tail > max(settings.match_snapshot_interval, 0) or (finished and tail > 0)
+            if write and not dry_run:
+                session.add(snapshot_row(await replay(session, match)))
+
+            res = await session.execute(
+                select(MatchSnapshot.sequence_number)
+                .where(MatchSnapshot.match_id == match_id)
+                .order_by(MatchSnapshot.sequence_number.desc())
+                .offset(keep - (1 if write else 0))
+            )
+            stale = list(res.scalars().all())
+            if stale and not dry_run:
+                await session.execute(
+                    delete(MatchSnapshot).where(
+                        MatchSnapshot.match_id == match_id,
+                        MatchSnapshot.sequence_number.in_(stale),
+                    )
+                )
+            return write, len(stale)
+
+        return await run_transaction(session, unit, "compact_match_events")
+
+
+async def main(match_ids, keep: int, dry_run: bool):
+    await init_db()
+    if not match_ids:
+        async with AsyncSessionLocal() as session:
+            res = await session.execute(select(Match.id).order_by(Match.scheduled_at))
+            match_ids = list(res.scalars().all())
+
+    written = deleted = 0
+    for match_id in match_ids:
+        wrote, removed = await compact_match(match_id, keep, dry_run)
+        written += wrote
+        deleted += removed
+        if wrote or removed:
+            print(f"{match_id}: {'snapshot written, ' if wrote else ''}{removed} old snapshots deleted")
+    verb = "would be" if dry_run else "were"
+    print(f"{len(match_ids)} matches: {written} snapshots {verb} written, {deleted} {verb} deleted")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--match", action="append", default=[], help="Match id (repeatable); default all matches")
+    parser.add_argument("--keep", type=int, default=2, help="Most recent snapshots to keep per match (at least 1)")
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing or deleting")
+    args = parser.parse_args()
+    asyncio.run(main(args.match, max(args.keep, 1), args.dry_run))
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""Load test WebSocket fan-out for auction rooms on one machine.
+
+Starts the app under uvicorn (a child process on `--port`, using this
+environment's DATABASE_URL and SECRET_KEY), creates `--rooms` ongoing
+auctions with two bidding teams each, and opens `--clients` authenticated
+`/ws/auctions/{id}` sockets spread evenly over the rooms. Then every room
+gets `--bids` bids at `--rate` bids per second through
+`POST /api/v1/auctions/{id}/bid` (i.e. `place_bid`), and each socket
+records every `bid_placed` it receives.
+
+Reported:
+- delivery latency percentiles, bid request sent -> frame received
+  ("bid") and event created on the server -> frame received ("fan-out");
+- messages missed: `seq` gaps on full streams; on spectator streams (which
+  are conflated by design) the share of bids delivered and the sockets
+  whose last frame is not the room's final bid;
+- server memory per connection (RSS growth while the sockets connect);
+- server CPU per accepted bid and per delivered frame during the bid phase,
+  and the harness's own CPU (if it nears the elapsed time, the clients
+  are the bottleneck, not the server).
+
+Memory and CPU are read from /proc, so this only runs on Linux. The open
+file limit is raised to its hard limit for both processes; raise the hard
+limit (`ulimit -Hn`) for very large runs. The server's output goes to
+`--server-log`.
+
+Usage (inside the backend container):
+  python scripts/ws_loadtest.py --clients 2000 --rooms 10 --bids 60 --rate 2
+  python scripts/ws_loadtest.py --clients 500 --rooms 1 --stream full
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+import httpx
+import websockets
+
+from app.core.security import create_access_token
+from app.db.session import AsyncSessionLocal
+from app.models import Auction, Player, Team, User
+from app.models.enums import AuctionStatusEnum
+
+_addresses = count(1)
+# (auction_id, amount) -> perf_counter() when the bid was sent
+sent_at: Dict[Tuple[str, int], float] = {}
+
+
+def next_address() -> str:
+    n = next(_addresses)
+    return f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+
+def raise_open_files() -> int:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+def rss_bytes(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime and stime are fields 14 and 15 of the full line
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def start_server(port: int, log) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=os.environ.copy(),
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+
+
+async def wait_for_server(url: str, server: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url) as client:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise SystemExit(f"server exited with {server.returncode}")
+            try:
+                await client.get("/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise SystemExit("server did not start")
+
+
+async def create_fixture(rooms: int):
+    """Ongoing auctions with two bidding teams each, plus a non-bidding viewer."""
+    run = uuid4().hex[:8]
+    async with AsyncSessionLocal() as session:
+        viewer = User(
+            id=str(uuid4()),
+            email=f"load-{run}-viewer@example.com",
+            username=f"load-{run}-viewer",
+            password_hash="!",
+            role="player",
+        )
+        session.add(viewer)
+        result = []
+        for r in range(rooms):
+            managers = [
+                User(
+                    id=str(uuid4()),
+                    email=f"load-{run}-{r}-{i}@example.com",
+                    username=f"load-{run}-{r}-{i}",
+                    password_hash="!",
+                    role="team_manager",
+                )
+                for i in range(2)
+            ]
+            session.add_all(managers)
+            await session.flush()
+            teams = [
+                Team(id=str(uuid4()), name=f"load-{run}-{r}-{i}", manager_id=manager.id, budget_spent=0)
+                for i, manager in enumerate(managers)
+            ]
+            player = Player(id=str(uuid4()), name=f"load-{run}-{r}", role="batsman", base_price=100, is_approved=True)
+            session.add_all(teams + [player])
+            await session.flush()
+            auction = Auction(
+                id=str(uuid4()),
+                name=f"load-{run}-{r}",
+                status=AuctionStatusEnum.ONGOING.value,
+                current_player_id=player.id,
+                total_revenue=0,
+            )
+            session.add(auction)
+            bidders = [(create_access_token(manager.id), team.id) for manager, team in zip(managers, teams)]
+            result.append((auction.id, bidders))
+        await session.commit()
+    return result, create_access_token(viewer.id)
+
+
+class Client:
+    """One simulated viewer socket and what it received."""
+
+    def __init__(self, auction_id: str):
+        self.auction_id = auction_id
+        self.received = 0
+        self.gaps = 0
+        self.last_seq: Optional[int] = None
+        self.last_amount: Optional[int] = None
+        self.bid_latencies: List[float] = []
+        self.fanout_latencies: List[float] = []
+        self.closed_by_server = False
+        self.socket = None
+        self.task: Optional[asyncio.Task] = None
+
+    async def connect(self, url: str) -> None:
+        self.socket = await websockets.connect(url, open_timeout=60, ping_interval=None, max_size=None)
+        self.task = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        try:
+            async for raw in self.socket:
+                received = time.perf_counter()
+                message = json.loads(raw)
+                kind = message.get("type")
+                seq = message.get("seq")
+                if kind == "ping":
+                    await self.socket.send('{"type": "pong"}')
+                elif kind == "snapshot":
+                    self.last_seq = message.get("last_seq")
+                elif kind == "bid_placed":
+                    amount = message["current_bid"]
+                    self.received += 1
+                    self.last_amount = amount
+                    started = sent_at.get((self.auction_id, amount))
+                    if started is not None:
+                        self.bid_latencies.append(received - started)
+                    created = datetime.fromisoformat(message["timestamp"])
+                    self.fanout_latencies.append((datetime.utcnow() - created).total_seconds())
+                if seq is not None:
+                    if self.last_seq is not None and seq > self.last_seq + 1:
+                        self.gaps += seq - self.last_seq - 1
+                    self.last_seq = max(seq, self.last_seq or 0)
+        except websockets.ConnectionClosed:
+            pass
+        self.closed_by_server = True
+
+    async def close(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+        if self.socket is not None:
+            await self.socket.close()
+
+
+async def connect_clients(ws_url: str, rooms, viewer_token: str, clients: int, stream: str, concurrency: int) -> List[Client]:
+    limit = asyncio.Semaphore(concurrency)
+    result = [Client(rooms[i % len(rooms)][0]) for i in range(clients)]
+
+    async def open_one(i: int, client: Client) -> None:
+        if stream == "full":
+            token = rooms[i % len(rooms)][1][i % 2][0]
+            query = f"token={token}"
+        else:
+            query = f"token={viewer_token}&stream=spectator"
+        async with limit:
+            await client.connect(f"{ws_url}/ws/auctions/{client.auction_id}?{query}")
+
+    await asyncio.gather(*(open_one(i, client) for i, client in enumerate(result)))
+    return result
+
+
+async def bid_stream(url: str, auction_id: str, bidders, bids: int, rate: float) -> Tuple[int, Optional[int]]:
+    """Alternate the two teams' bids; returns (accepted, final amount)."""
+    accepted, final = 0, None
+    interval = 1 / rate
+    next_at = time.perf_counter()
+    async with httpx.AsyncClient(base_url=url) as client:
+        for i in range(bids):
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            next_at += interval
+            token, team_id = bidders[i % 2]
+            amount = 101 + i
+            sent_at[(auction_id, amount)] = time.perf_counter()
+            res = await client.post(
+                f"/api/v1/auctions/{auction_id}/bid",
+                json={"team_id": team_id, "amount": amount, "min_increment": 1},
+                headers={"Authorization": f"Bearer {token}", "X-Forwarded-For": next_address()},
+            )
+            if res.status_code == 201:
+                accepted += 1
+                final = amount
+    return accepted, final
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return "no samples"
+    values = sorted(values)
+
+    def at(q: float) -> float:
+        return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+    return f"p50 {at(0.5):7.2f} ms  p90 {at(0.9):7.2f} ms  p99 {at(0.99):7.2f} ms  max {values[-1] * 1000:7.2f} ms"
+
+
+async def main(args) -> None:
+    open_files = raise_open_files()
+    if args.clients + 100 > open_files:
+        print(f"warning: open file limit is {open_files}, {args.clients} sockets may not fit")
+
+    url = f"http://127.0.0.1:{args.port}"
+    log = open(args.server_log, "w")
+    server = start_server(args.port, log)
+    clients: List[Client] = []
+    try:
+        await wait_for_server(url, server)
+        rooms, viewer_token = await create_fixture(args.rooms)
+
+        rss_before = rss_bytes(server.pid)
+        started = time.perf_counter()
+        clients = await connect_clients(url.replace("http", "ws", 1), rooms, viewer_token, args.clients, args.stream, args.connect_concurrency)
+        connect_seconds = time.perf_counter() - started
+        await asyncio.sleep(args.settle)
+        rss_after = rss_bytes(server.pid)
+
+        server_cpu = cpu_seconds(server.pid)
+        harness_cpu = time.process_time()
+        started = time.perf_counter()
+        results = await asyncio.gather(*(bid_stream(url, auction_id, bidders, args.bids, args.rate) for auction_id, bidders in rooms))
+        await asyncio.sleep(args.settle)
+        elapsed = time.perf_counter() - started
+        server_cpu = cpu_seconds(server.pid) - server_cpu
+        harness_cpu = time.process_time() - harness_cpu
+    finally:
+        for client in clients:
+            await client.close()
+        server.terminate()
+        server.wait()
+        log.close()
+
+    final_amount = {auction_id: final for (auction_id, _), (_, final) in zip(rooms, results)}
+    accepted = {auction_id: n for (auction_id, _), (n, _) in zip(rooms, results)}
+    expected = sum(accepted[client.auction_id] for client in clients)
+    delivered = sum(client.received for client in clients)
+    stale = sum(client.last_amount != final_amount[client.auction_id] for client in clients)
+    closed = sum(client.closed_by_server for client in clients)
+
+    print(f"sockets: {args.clients} {args.stream} in {args.rooms} rooms, connected in {connect_seconds:.1f} s")
+    print(f"bids: {sum(accepted.values())} accepted of {args.bids * args.rooms} sent at {args.rate}/s per room")
+    print(f"frames: {delivered} bid frames delivered of {expected} bids x sockets ({delivered / max(expected, 1):.1%})")
+    print(f"missed: {sum(client.gaps for client in clients)} seq gaps, {stale} sockets without the final bid, {closed} closed by the server")
+    print(f"bid -> socket:     {percentiles([v for client in clients for v in client.bid_latencies])}")
+    print(f"event -> socket:   {percentiles([v for client in clients for v in client.fanout_latencies])}")
+    print(f"server memory: {(rss_after - rss_before) / max(args.clients, 1) / 1024:.1f} KiB per connection ({rss_after / 2**20:.0f} MiB RSS)")
+    print(
+        f"server cpu: {server_cpu:.2f} s over {elapsed:.1f} s, "
+        f"{server_cpu / max(sum(accepted.values()), 1) * 1000:.2f} ms per bid, "
+        f"{server_cpu / max(delivered, 1) * 1e6:.1f} us per delivered frame"
+    )
+    print(f"harness cpu: {harness_cpu:.2f} s (server log: {args.server_log})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=1000, help="WebSocket clients, spread over the rooms")
+    parser.add_argument("--rooms", type=int, default=10, help="Auctions (rooms)")
+    parser.add_argument("--bids", type=int, default=60, help="Bids per room")
+    parser.add_argument("--rate", type=float, default=2, help="Bids per second per room")
+    parser.add_argument("--stream", choices=("spectator", "full"), default="spectator", help="Subscription of the clients")
+    parser.add_argument("--port", type=int, default=8766, help="Port for the server under test")
+    parser.add_argument("--connect-concurrency", type=int, default=200, help="Sockets being opened at once")
+    parser.add_argument("--server-log", default="ws_loadtest-server.log", help="File for the server's output")
+    parser.add_argument("--settle", type=float, default=2, help="Seconds to wait after connecting and after the last bid")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,65 @@
+"""Test configuration.
+
+Tests run against a throwaway SQLite database (created with `init_db`) unless
+DATABASE_URL is set. Settings are read at import, so this has to happen
+before any `app` module is imported.
+"""
+import os
+import tempfile
+from uuid import uuid4
+
+import pytest
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="auction-tests-"), "test.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{DB_PATH}")
+
+
+@pytest.fixture
+def fresh_db():
+    """Start the test with an empty SQLite database."""
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    yield
+
+
+async def _create_auction():
+    """A scheduled auction with one team and its first player up; returns their ids."""
+    from app.db.session import AsyncSessionLocal
+    from app.models import Auction, Player, Team, User
+    from app.models.enums import AuctionStatusEnum
+
+    async with AsyncSessionLocal() as session:
+        manager = User(
+            id=str(uuid4()), email="manager@example.com", username="manager", password_hash="!", role="team_manager"
+        )
+        session.add(manager)
+        await session.flush()
+        team = Team(id=str(uuid4()), name="Team", manager_id=manager.id, budget_spent=0)
+        player = Player(id=str(uuid4()), name="Player", role="batsman", base_price=100, is_approved=True)
+        session.add_all([team, player])
+        await session.flush()
+        auction = Auction(
+            id=str(uuid4()),
+            name="Auction",
+            status=AuctionStatusEnum.SCHEDULED.value,
+            current_player_id=player.id,
+            total_revenue=0,
+        )
+        session.add(auction)
+        await session.commit()
+    return auction.id, team.id, player.id
+
+
+@pytest.fixture
+def create_auction(fresh_db, monkeypatch):
+    """Async factory for `_create_auction`; bids take the locking path and broadcasts go nowhere."""
+    from app.services import auction_service
+    from app.websocket.manager import manager
+
+    async def quiet_broadcast(room, message):
+        pass
+
+    monkeypatch.setattr(auction_service.settings, "bid_mode", "locking")
+    monkeypatch.setattr(manager, "broadcast_to_room", quiet_broadcast)
+    monkeypatch.setattr(manager, "broadcast_local", quiet_broadcast)
+    return _create_auction
@@ -0,0 +1,114 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+
+from app.db.session import AsyncSessionLocal, engine, init_db
+from app.models import Auction, AuctionEvent, Bid, Team, TeamCommitment
+from app.services.auction_engine import AuctionEngine
+
+
+async def _second_team():
+    async with AsyncSessionLocal() as session:
+        first = (await session.execute(select(Team))).scalars().first()
+        team = Team(id=str(uuid4()), name="Rivals", manager_id=first.manager_id, budget_spent=0)
+        session.add(team)
+        await session.commit()
+    return team.id
+
+
+async def _stored(auction_id):
+    async with AsyncSessionLocal() as session:
+        auction = (await session.execute(select(Auction).where(Auction.id == auction_id))).scalar_one()
+        bids = (await session.execute(select(Bid).order_by(Bid.amount))).scalars().all()
+        events = (await session.execute(select(AuctionEvent).order_by(AuctionEvent.seq))).scalars().all()
+        commitments = (await session.execute(select(TeamCommitment))).scalars().all()
+    return {
+        "auction": (auction.current_bid, auction.current_bidder_id, auction.version, auction.last_event_seq),
+        "bids": [(bid.team_id, bid.amount, bid.is_winning) for bid in bids],
+        "events": [(event.seq, event.type) for event in events],
+        "commitments": [(row.auction_id, row.team_id, row.amount) for row in commitments],
+    }
+
+
+def test_accepted_bids_are_persisted_on_flush(create_auction):
+    async def scenario():
+        await init_db()
+        auction_id, team_id, _ = await create_auction()
+        rival_id = await _second_team()
+        try:
+            live_engine = AuctionEngine()
+            before = await _stored(auction_id)
+            live, purse = await live_engine.load(auction_id, team_id)
+            _, rival = await live_engine.load(auction_id, rival_id)
+            live_engine.accept(live, purse, 100)
+            live_engine.accept(live, rival, 110)
+            _, last_event = live_engine.accept(live, purse, 120)
+            unflushed = await _stored(auction_id)
+            await live_engine.flush(auction_id)
+            return auction_id, team_id, rival_id, before, unflushed, await _stored(auction_id), live, last_event
+        finally:
+            await engine.dispose()
+
+    auction_id, team_id, rival_id, before, unflushed, after, live, last_event = asyncio.run(scenario())
+    assert unflushed == before
+    version = before["auction"][2]
+    assert after["auction"] == (120, team_id, version + 1, 3)
+    assert after["bids"] == [(team_id, 100, False), (rival_id, 110, False), (team_id, 120, True)]
+    assert after["events"] == [(1, "bid_placed"), (2, "bid_placed"), (3, "bid_placed")]
+    assert after["commitments"] == [(auction_id, team_id, 120)]
+    assert last_event.seq == live.last_event_seq == 3
+    assert live.pending == [] and live.pending_events == []
+
+
+def test_a_failed_flush_keeps_the_batch_for_the_next_one(create_auction, monkeypatch):
+    async def scenario():
+        await init_db()
+        auction_id, team_id, _ = await create_auction()
+        try:
+            live_engine = AuctionEngine()
+            live, purse = await live_engine.load(auction_id, team_id)
+            live_engine.accept(live, purse, 100)
+
+            persist = live_engine._persist
+
+            async def failing(*args):
+                raise RuntimeError("database unavailable")
+
+            monkeypatch.setattr(live_engine, "_persist", failing)
+            with pytest.raises(RuntimeError):
+                await live_engine.flush(auction_id)
+            live_engine.accept(live, purse, 110)
+            monkeypatch.setattr(live_engine, "_persist", persist)
+            await live_engine.flush(auction_id)
+            return team_id, await _stored(auction_id)
+        finally:
+            await engine.dispose()
+
+    team_id, stored = asyncio.run(scenario())
+    assert stored["bids"] == [(team_id, 100, False), (team_id, 110, True)]
+    assert stored["events"] == [(1, "bid_placed"), (2, "bid_placed")]
+
+
+def test_transition_flushes_pending_bids_before_the_state_change(create_auction):
+    async def scenario():
+        await init_db()
+        auction_id, team_id, _ = await create_auction()
+        try:
+            live_engine = AuctionEngine()
+            live, purse = await live_engine.load(auction_id, team_id)
+            live_engine.accept(live, purse, 150)
+            async with live_engine.transition(auction_id):
+                seen_by_transition = await _stored(auction_id)
+                cached_during = auction_id in live_engine.auctions
+            return team_id, seen_by_transition, cached_during, live_engine
+        finally:
+            await engine.dispose()
+
+    team_id, seen, cached_during, live_engine = asyncio.run(scenario())
+    assert seen["auction"][:2] == (150, team_id)
+    assert seen["bids"] == [(team_id, 150, True)]
+    assert cached_during
+    # Cached state is dropped so the next bid reloads what the transition wrote
+    assert live_engine.auctions == {} and live_engine.teams == {}
@@ -0,0 +1,36 @@
+import asyncio
+
+from app.db.session import AsyncSessionLocal, engine, init_db
+from app.models import Auction
+from app.services import auction_service
+from app.services.auction_snapshots import AuctionSnapshotStore
+
+
+def test_repeated_sale_does_not_count_revenue_twice(create_auction):
+    async def scenario():
+        await init_db()
+        auction_id, team_id, _ = await create_auction()
+        store = AuctionSnapshotStore()
+        await store.start()
+        try:
+            async with AsyncSessionLocal() as session:
+                await auction_service.start_auction(session, auction_id)
+                await auction_service.place_bid(session, auction_id, team_id, 150, 1)
+            await store.get(auction_id)
+
+            # The second call takes the idempotent path but still emits player_sold
+            for _ in range(2):
+                async with AsyncSessionLocal() as session:
+                    await auction_service.finalize_sold_player(session, auction_id)
+
+            snapshot = await store.get(auction_id)
+            async with AsyncSessionLocal() as session:
+                auction = await session.get(Auction, auction_id)
+            return snapshot.total_revenue, auction.total_revenue
+        finally:
+            await store.stop()
+            await engine.dispose()
+
+    snapshot_revenue, row_revenue = asyncio.run(scenario())
+    assert row_revenue == 150
+    assert snapshot_revenue == row_revenue
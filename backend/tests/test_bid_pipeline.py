@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.db.session import AsyncSessionLocal, engine, init_db
+from app.models import Auction, Bid, Team, TeamCommitment
+from app.services.bid_pipeline import BidPipeline
+
+
+async def _submit_all(pipeline, auction_id, bids):
+    """Submit `(team_id, amount, current_user)` bids in this order into one batch."""
+    return await asyncio.gather(
+        *(pipeline.submit(auction_id, team_id, amount, 10, user) for team_id, amount, user in bids),
+        return_exceptions=True,
+    )
+
+
+def test_a_batch_resolves_to_the_highest_valid_bid(create_auction):
+    from app.services import auction_service
+
+    async def scenario():
+        await init_db()
+        auction_id, team_id, _ = await create_auction()
+        try:
+            async with AsyncSessionLocal() as session:
+                manager_id = (await session.execute(select(Team.manager_id))).scalar()
+                rival = Team(id="rival-team", name="Rivals", manager_id=manager_id, budget_spent=0)
+                session.add(rival)
+                await session.commit()
+                await auction_service.start_auction(session, auction_id)
+
+            pipeline = BidPipeline(auction_service._resolve_bid_batch, interval_ms=20)
+            outsider = SimpleNamespace(id="someone-else", role="team_manager")
+            results = await _submit_all(pipeline, auction_id, [
+                (team_id, 150, None),
+                ("rival-team", 120, None),
+                ("rival-team", 200, None),
+                (team_id, 205, None),
+                (team_id, 300, outsider),
+                ("no-such-team", 400, None),
+            ])
+            await pipeline.stop()
+
+            async with AsyncSessionLocal() as session:
+                auction = (await session.execute(select(Auction))).scalar_one()
+                bids = (await session.execute(select(Bid).order_by(Bid.amount))).scalars().all()
+                commitments = (await session.execute(select(TeamCommitment))).scalars().all()
+                stored = {
+                    "auction": (auction.current_bid, auction.current_bidder_id, auction.last_event_seq),
+                    "bids": [(bid.team_id, bid.amount, bid.is_winning) for bid in bids],
+                    "commitments": [(row.team_id, row.amount) for row in commitments],
+                }
+            return team_id, results, stored
+        finally:
+            await engine.dispose()
+
+    team_id, results, stored = asyncio.run(scenario())
+    accepted = [(bid.team_id, bid.amount, event.seq) for bid, event in (results[0], results[2])]
+    assert accepted == [(team_id, 150, 2), ("rival-team", 200, 3)]  # seq 1 is auction_started
+
+    rejected = results[1], results[3], results[4], results[5]
+    assert all(isinstance(exc, HTTPException) for exc in rejected)
+    assert [(exc.status_code, exc.detail) for exc in rejected] == [
+        (400, "Bid increment too small"),
+        (400, "Bid increment too small"),
+        (403, "Not manager of the team"),
+        (404, "Team not found"),
+    ]
+    assert len({id(exc) for exc in rejected}) == len(rejected)
+
+    assert stored["auction"] == (200, "rival-team", 3)
+    assert stored["bids"] == [(team_id, 150, False), ("rival-team", 200, True)]
+    assert stored["commitments"] == [("rival-team", 200)]
+
+
+def test_each_waiter_gets_its_own_exception_when_the_batch_fails():
+    failure = RuntimeError("database unavailable")
+
+    async def resolver(auction_id, batch):
+        raise failure
+
+    async def scenario():
+        pipeline = BidPipeline(resolver, interval_ms=1)
+        return await _submit_all(pipeline, "a1", [("t1", 100, None), ("t2", 110, None), ("t3", 120, None)])
+
+    errors = asyncio.run(scenario())
+    assert [(exc.status_code, exc.detail) for exc in errors] == [(500, "Bid could not be processed")] * 3
+    assert all(exc.__cause__ is failure for exc in errors)
+    assert len({id(exc) for exc in errors}) == 3
+
+
+def test_each_waiter_gets_its_own_exception_for_a_missing_auction(fresh_db):
+    from app.services import auction_service
+
+    async def scenario():
+        await init_db()
+        try:
+            pipeline = BidPipeline(auction_service._resolve_bid_batch, interval_ms=1)
+            return await _submit_all(pipeline, "missing", [("t1", 100, None), ("t2", 110, None)])
+        finally:
+            await engine.dispose()
+
+    errors = asyncio.run(scenario())
+    assert [(exc.status_code, exc.detail) for exc in errors] == [(404, "Auction not found")] * 2
+    assert errors[0] is not errors[1]
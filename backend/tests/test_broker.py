@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+from app.websocket.broker import MAX_NOTIFY_BYTES, PostgresBroker
+
+
+class NotifyConnection:
+    """Stands in for the publishing asyncpg connection."""
+
+    def __init__(self):
+        self.notifications = []
+
+    def is_closed(self):
+        return False
+
+    async def execute(self, query, channel, payload):
+        self.notifications.append(payload)
+
+
+def _worker(loaders=None):
+    broker = PostgresBroker("postgresql://unused", "ws")
+    broker._publish_conn = NotifyConnection()
+    broker._listener = asyncio.get_running_loop().create_future()  # publish as if started
+    delivered = []
+
+    async def deliver(room, payload, remote):
+        delivered.append((room, json.loads(payload), remote))
+
+    broker.attach(deliver)
+    for prefix, loader in (loaders or {}).items():
+        broker.set_reference_loader(prefix, loader)
+    return broker, delivered
+
+
+async def _receive(broker, notifications):
+    for raw in notifications:
+        broker._on_notify(None, 0, "ws", raw)
+    consumer = asyncio.create_task(broker._consume())
+    await asyncio.sleep(0.01)
+    consumer.cancel()
+
+
+def test_oversized_messages_are_sent_by_reference_and_loaded_by_receivers():
+    big = {"type": "player_updated", "seq": 7, "player": {"bio": "x" * MAX_NOTIFY_BYTES}}
+    small = {"type": "bid_placed", "seq": 8, "current_bid": 150}
+    loaded = []
+
+    async def load(room, reference):
+        loaded.append((room, reference))
+        return json.dumps(big) if reference == {"seq": 7} else None
+
+    async def scenario():
+        sender, sent_locally = _worker()
+        sender.set_reference_loader("auction:", load)
+        receiver, received = _worker({"auction:": load})
+        await sender.publish("auction:a1", json.dumps(big))
+        await sender.publish("auction:a1", json.dumps(small))
+        notifications = sender._publish_conn.notifications
+        assert all(len(raw.encode()) <= MAX_NOTIFY_BYTES for raw in notifications)
+        await _receive(receiver, notifications)
+        return sent_locally, received
+
+    sent_locally, received = asyncio.run(scenario())
+    assert [message["seq"] for _, message, _ in sent_locally] == [7, 8]
+    assert received == [("auction:a1", big, True), ("auction:a1", small, True)]
+    assert loaded == [("auction:a1", {"seq": 7})]
+
+
+def test_oversized_messages_without_a_loader_stay_local():
+    big = {"type": "note", "seq": 1, "text": "x" * MAX_NOTIFY_BYTES}
+
+    async def scenario():
+        sender, sent_locally = _worker()
+        await sender.publish("match:m1", json.dumps(big))
+        return sender._publish_conn.notifications, sent_locally
+
+    notifications, sent_locally = asyncio.run(scenario())
+    assert notifications == []
+    assert len(sent_locally) == 1
+
+
+def test_auction_events_are_loaded_by_reference_from_the_table(create_auction):
+    from app.db.session import AsyncSessionLocal, engine, init_db
+    from app.services import auction_service
+    from app.services.event_log import EventLog
+
+    async def scenario():
+        await init_db()
+        auction_id, _, _ = await create_auction()
+        try:
+            async with AsyncSessionLocal() as session:
+                await auction_service.start_auction(session, auction_id)
+            other_worker = EventLog()
+            found = await other_worker.load_message(f"auction:{auction_id}", {"seq": 1})
+            missing = await other_worker.load_message(f"auction:{auction_id}", {"seq": 2})
+            return auction_id, found, missing
+        finally:
+            await engine.dispose()
+
+    auction_id, found, missing = asyncio.run(scenario())
+    message = json.loads(found)
+    assert (message["type"], message["auction_id"], message["seq"]) == ("auction_started", auction_id, 1)
+    assert missing is None
@@ -0,0 +1,151 @@
+import asyncio
+from uuid import uuid4
+
+from sqlalchemy import select, update
+
+from app.db.session import AsyncSessionLocal, engine, init_db
+from app.models import Auction, Team, TeamCommitment
+from app.models.enums import AuctionStatusEnum
+from app.services.commitment_ledger import (
+    CommitmentReconciler,
+    pending_commitments,
+    reconcile,
+    reconcile_auction,
+    record_commitment,
+    release_commitment,
+)
+
+
+async def _ledger():
+    async with AsyncSessionLocal() as session:
+        res = await session.execute(select(TeamCommitment).order_by(TeamCommitment.auction_id))
+        return {row.auction_id: (row.team_id, row.amount) for row in res.scalars().all()}
+
+
+async def _live_auction_with_bid(create_auction, amount=150):
+    """A started auction whose current lot has a winning bid of `amount`, and an idle second auction."""
+    from app.services import auction_service
+
+    auction_id, team_id, _ = await create_auction()
+    async with AsyncSessionLocal() as session:
+        await auction_service.start_auction(session, auction_id)
+    async with AsyncSessionLocal() as session:
+        await auction_service.place_bid(session, auction_id, team_id, amount, 10)
+    async with AsyncSessionLocal() as session:
+        idle = Auction(id=str(uuid4()), name="Idle", status=AuctionStatusEnum.SCHEDULED.value, total_revenue=0)
+        session.add(idle)
+        await session.commit()
+    return auction_id, idle.id, team_id
+
+
+def test_record_and_release_keep_one_row_per_auction(create_auction):
+    async def scenario():
+        await init_db()
+        auction_id, team_id, _ = await create_auction()
+        try:
+            async with AsyncSessionLocal() as session:
+                manager_id = (await session.execute(select(Team.manager_id))).scalar()
+                rival = Team(id=str(uuid4()), name="Rivals", manager_id=manager_id, budget_spent=0)
+                other = Auction(id=str(uuid4()), name="Other", status=AuctionStatusEnum.SCHEDULED.value, total_revenue=0)
+                session.add_all([rival, other])
+                await session.commit()
+
+            steps = []
+            async with AsyncSessionLocal() as session:
+                await record_commitment(session, auction_id, team_id, 150)
+                await record_commitment(session, other.id, team_id, 300)
+                await session.commit()
+            steps.append(await _ledger())
+            async with AsyncSessionLocal() as session:
+                pending = (
+                    await pending_commitments(session, team_id, auction_id),
+                    await pending_commitments(session, team_id, other.id),
+                    await pending_commitments(session, rival.id, auction_id),
+                )
+            async with AsyncSessionLocal() as session:
+                await record_commitment(session, auction_id, rival.id, 160)
+                await session.commit()
+            steps.append(await _ledger())
+            async with AsyncSessionLocal() as session:
+                await release_commitment(session, auction_id)
+                await release_commitment(session, auction_id)  # nothing left to release
+                await session.commit()
+            steps.append(await _ledger())
+            return auction_id, other.id, team_id, rival.id, steps, pending
+        finally:
+            await engine.dispose()
+
+    auction_id, other_id, team_id, rival_id, steps, pending = asyncio.run(scenario())
+    assert steps[0] == {auction_id: (team_id, 150), other_id: (team_id, 300)}
+    assert pending == (300, 150, 0)
+    assert steps[1] == {auction_id: (rival_id, 160), other_id: (team_id, 300)}
+    assert steps[2] == {other_id: (team_id, 300)}
+
+
+def test_reconcile_auction_repairs_only_drifted_rows(create_auction):
+    async def scenario():
+        await init_db()
+        try:
+            auction_id, idle_id, team_id = await _live_auction_with_bid(create_auction)
+            outcomes = []
+            async with AsyncSessionLocal() as session:
+                outcomes.append(await reconcile_auction(session, auction_id))
+
+                await session.execute(
+                    update(TeamCommitment).where(TeamCommitment.auction_id == auction_id).values(amount=999)
+                )
+                await session.commit()
+                outcomes.append(await reconcile_auction(session, auction_id))
+                outcomes.append(await _ledger())
+
+                await release_commitment(session, auction_id)
+                await session.commit()
+                outcomes.append(await reconcile_auction(session, auction_id))
+                outcomes.append(await _ledger())
+
+                await record_commitment(session, idle_id, team_id, 500)
+                await session.commit()
+                outcomes.append(await reconcile_auction(session, idle_id))
+                outcomes.append(await _ledger())
+            return auction_id, team_id, outcomes
+        finally:
+            await engine.dispose()
+
+    auction_id, team_id, outcomes = asyncio.run(scenario())
+    expected = {auction_id: (team_id, 150)}
+    assert outcomes == [False, True, expected, True, expected, True, expected]
+
+
+def test_reconciler_corrects_drift_in_the_background(create_auction):
+    async def scenario():
+        await init_db()
+        try:
+            auction_id, idle_id, team_id = await _live_auction_with_bid(create_auction)
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    update(TeamCommitment).where(TeamCommitment.auction_id == auction_id).values(amount=10)
+                )
+                await record_commitment(session, idle_id, team_id, 500)
+                await session.commit()
+            drifted = await _ledger()
+
+            reconciler = CommitmentReconciler(interval_seconds=0.05)
+            await reconciler.start()
+            try:
+                for _ in range(100):
+                    await asyncio.sleep(0.05)
+                    if await _ledger() == {auction_id: (team_id, 150)}:
+                        break
+            finally:
+                await reconciler.stop()
+
+            async with AsyncSessionLocal() as session:
+                repaired_again = await reconcile(session)
+            return auction_id, idle_id, team_id, drifted, await _ledger(), repaired_again
+        finally:
+            await engine.dispose()
+
+    auction_id, idle_id, team_id, drifted, repaired, repaired_again = asyncio.run(scenario())
+    assert drifted == {auction_id: (team_id, 10), idle_id: (team_id, 500)}
+    assert repaired == {auction_id: (team_id, 150)}
+    assert repaired_again == 0
@@ -0,0 +1,117 @@
+import asyncio
+
+from app.services.event_log import AuctionEventEntry, EventLog, EventRing, next_event
+
+
+def _events(*seqs, auction_id="a1"):
+    return [next_event(auction_id, seq - 1, "bid_placed", {"current_bid": seq * 10}) for seq in seqs]
+
+
+def _seqs(events):
+    return None if events is None else [event.seq for event in events]
+
+
+def test_ring_replays_a_range_it_holds():
+    ring = EventRing(capacity=8)
+    for event in _events(1, 2, 3, 4, 5):
+        ring.add(event)
+
+    assert _seqs(ring.after(0, 5)) == [1, 2, 3, 4, 5]
+    assert _seqs(ring.after(2, 4)) == [3, 4]
+    assert ring.after(5, 5) == []
+
+
+def test_ring_returns_none_once_the_range_is_evicted():
+    ring = EventRing(capacity=3)
+    for event in _events(1, 2, 3, 4, 5):
+        ring.add(event)
+
+    assert ring.last_seq == 5
+    assert ring.after(0, 5) is None
+    assert ring.after(1, 5) is None
+    assert _seqs(ring.after(2, 5)) == [3, 4, 5]
+    assert ring.after(4, 6) is None  # not seen yet
+
+
+def test_ring_returns_none_for_a_gap():
+    ring = EventRing(capacity=8)
+    for event in _events(1, 2, 4):
+        ring.add(event)
+
+    assert ring.after(0, 4) is None
+    assert _seqs(ring.after(0, 2)) == [1, 2]
+
+
+def test_replay_needs_the_ring_to_cover_the_range():
+    log = EventLog(capacity=2)
+
+    async def scenario():
+        for event in _events(1, 2, 3):
+            await log.publish(event)
+
+    asyncio.run(scenario())
+    assert log.replay("a1", 0) is None
+    assert _seqs(log.replay("a1", 1)) == [2, 3]
+    assert log.replay("unknown", 0) is None
+
+
+def test_remote_events_are_published_once_in_seq_order_whatever_order_they_arrive():
+    log = EventLog(capacity=8)
+    seen = []
+
+    async def record(event):
+        seen.append(event.seq)
+
+    log.subscribe(record)
+
+    async def scenario():
+        for event in _events(3, 1, 2, 2, 3):
+            await log.ingest_remote("auction:a1", event.message)
+        await log.ingest_remote("match:m1", {"type": "score", "seq": 9})
+        await log.ingest_remote("auction:a1", {"type": "countdown", "seconds_left": 3})
+
+    asyncio.run(scenario())
+    assert sorted(seen) == [1, 2, 3]
+    replayed = log.replay("a1", 0)
+    assert _seqs(replayed) == [1, 2, 3]
+    assert replayed[0] == _events(1)[0]
+    assert log.last_seq("m1") == 0
+
+
+def test_events_after_falls_back_to_the_table_for_evicted_events(create_auction):
+    from sqlalchemy import select
+
+    from app.db.session import AsyncSessionLocal, engine, init_db
+    from app.models import Auction
+    from app.services.event_log import append_event
+
+    async def scenario():
+        await init_db()
+        auction_id, _, _ = await create_auction()
+        try:
+            async with AsyncSessionLocal() as session:
+                auction = (await session.execute(select(Auction).where(Auction.id == auction_id))).scalar_one()
+                events = [
+                    await append_event(session, auction, "bid_placed", {"current_bid": amount})
+                    for amount in (100, 110, 120, 130)
+                ]
+                await session.commit()
+
+            log = EventLog(capacity=2)
+            for event in events:
+                await log.publish(event)
+            async with AsyncSessionLocal() as session:
+                from_ring = await log.events_after(session, auction_id, 2)
+                from_table = await log.events_after(session, auction_id, 0)
+                paged = await log.events_after(session, auction_id, 0, limit=2)
+                unknown = await log.events_after(session, "missing", 0)
+            return events, from_ring, from_table, paged, unknown
+        finally:
+            await engine.dispose()
+
+    events, from_ring, from_table, paged, unknown = asyncio.run(scenario())
+    assert from_ring == (events[2:], 4)
+    assert from_table == (events, 4)
+    assert isinstance(from_table[0][0], AuctionEventEntry)
+    assert paged == (events[:2], 4)
+    assert unknown is None
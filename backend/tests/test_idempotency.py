@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.idempotency import IdempotencyCache, IdempotencyStore, StoredResponse
+
+
+def _entry(body: str = "{}", ttl: float = 60, request_hash: str = "h") -> StoredResponse:
+    return StoredResponse(request_hash, 201, body, time.time() + ttl)
+
+
+def test_cache_evicts_least_recently_used_past_max_entries():
+    cache = IdempotencyCache(max_entries=2, max_bytes=1024)
+    cache.put(("u", "a"), _entry())
+    cache.put(("u", "b"), _entry())
+    cache.get(("u", "a"))
+    cache.put(("u", "c"), _entry())
+
+    assert cache.get(("u", "b")) is None
+    assert cache.get(("u", "a")) is not None
+    assert cache.get(("u", "c")) is not None
+    assert len(cache) == 2
+
+
+def test_cache_evicts_oldest_past_max_bytes_and_skips_oversized_entries():
+    cache = IdempotencyCache(max_entries=100, max_bytes=30)
+    cache.put(("u", "a"), _entry("x" * 10))  # 11 bytes with the hash
+    cache.put(("u", "b"), _entry("y" * 10))
+    cache.put(("u", "c"), _entry("z" * 10))
+    assert cache.get(("u", "a")) is None
+    assert len(cache) == 2
+
+    cache.put(("u", "big"), _entry("w" * 30))
+    assert cache.get(("u", "big")) is None
+    assert len(cache) == 2
+
+
+def test_cache_replacing_a_key_does_not_count_it_twice():
+    cache = IdempotencyCache(max_entries=10, max_bytes=30)
+    for _ in range(5):
+        cache.put(("u", "a"), _entry("x" * 10))
+    cache.put(("u", "b"), _entry("y" * 10))
+    assert cache.get(("u", "a")) is not None
+    assert cache.get(("u", "b")) is not None
+
+
+def test_cache_entries_expire():
+    cache = IdempotencyCache(max_entries=10, max_bytes=1024)
+    cache.put(("u", "old"), _entry(ttl=-1))
+    cache.put(("u", "new"), _entry(ttl=60))
+    assert cache.get(("u", "old")) is None
+    assert cache.get(("u", "new")) is not None
+    assert len(cache) == 1
+
+
+def _store(monkeypatch) -> IdempotencyStore:
+    store = IdempotencyStore(IdempotencyCache(max_entries=10, max_bytes=1024), ttl_seconds=60)
+
+    async def nothing_stored(scoped):
+        return None
+
+    async def save(scoped, entry):
+        pass
+
+    monkeypatch.setattr(store, "_load", nothing_stored)
+    monkeypatch.setattr(store, "_save", save)
+    return store
+
+
+def test_retry_replays_the_response_and_reuse_for_another_request_is_422(monkeypatch):
+    store = _store(monkeypatch)
+    calls = []
+
+    async def execute():
+        calls.append(1)
+        return {"bid": len(calls)}
+
+    async def scenario():
+        first = await store.run("u", "k", "hash-1", execute)
+        again = await store.run("u", "k", "hash-1", execute)
+        with pytest.raises(HTTPException) as reused:
+            await store.run("u", "k", "hash-2", execute)
+        return first, again, reused.value
+
+    first, again, reused = asyncio.run(scenario())
+    assert first == ({"bid": 1}, False)
+    assert again == ({"bid": 1}, True)
+    assert reused.status_code == 422
+    assert calls == [1]
+
+
+def test_duplicates_waiting_on_a_failed_request_get_their_own_exception(monkeypatch):
+    store = _store(monkeypatch)
+
+    async def execute():
+        await asyncio.sleep(0.05)
+        raise HTTPException(status_code=400, detail="Bid too low")
+
+    async def scenario():
+        return await asyncio.gather(*(store.run("u", "k", "h", execute) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(scenario())
+    assert all(isinstance(error, HTTPException) for error in errors)
+    assert [(error.status_code, error.detail) for error in errors] == [(400, "Bid too low")] * 3
+    assert len({id(error) for error in errors}) == 3
+
+    # Failures are not stored: the key can be retried
+    async def succeed():
+        return {"ok": True}
+
+    assert asyncio.run(store.run("u", "k", "h", succeed)) == ({"ok": True}, False)
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.timing_wheel import TimingWheel
+from app.db.session import AsyncSessionLocal, engine, init_db
+from app.models import Auction, Player
+from app.models.enums import PlayerStatusEnum
+from app.services import auction_service
+from app.services.event_log import event_log
+from app.services.lot_timer import LotTimer
+
+
+def test_resumed_lot_with_standing_bid_is_sold(create_auction):
+    async def scenario():
+        await init_db()
+        auction_id, team_id, player_id = await create_auction()
+        timer = LotTimer(0.4, 0.2, 0.1, 100, TimingWheel(tick_ms=20, slots=64))
+        await timer.start()
+        try:
+            async with AsyncSessionLocal() as session:
+                await auction_service.start_auction(session, auction_id)
+                await auction_service.place_bid(session, auction_id, team_id, 150, 1)
+                await auction_service.pause_auction(session, auction_id)
+            assert auction_id not in timer.lots
+
+            async with AsyncSessionLocal() as session:
+                await auction_service.start_auction(session, auction_id)
+            assert auction_id in timer.lots
+
+            await asyncio.sleep(0.8)
+            async with AsyncSessionLocal() as session:
+                player = (await session.execute(select(Player).where(Player.id == player_id))).scalars().one()
+                auction = await session.get(Auction, auction_id)
+            return player.status, player.team_id, auction.total_revenue
+        finally:
+            await timer.stop()
+            await engine.dispose()
+
+    status, owner, revenue = asyncio.run(scenario())
+    assert status == PlayerStatusEnum.SOLD.value
+    assert owner is not None
+    assert revenue == 150
+
+
+def test_bid_the_timer_did_not_see_is_sold_not_wiped(create_auction):
+    async def scenario():
+        await init_db()
+        auction_id, team_id, player_id = await create_auction()
+        timer = LotTimer(0.4, 0.2, 0.1, 100, TimingWheel(tick_ms=20, slots=64))
+        await timer.start()
+        try:
+            async with AsyncSessionLocal() as session:
+                await auction_service.start_auction(session, auction_id)
+            assert auction_id in timer.lots
+
+            # The bid commits while the countdown runs out, before the timer hears of it
+            event_log.unsubscribe(timer.on_event)
+            async with AsyncSessionLocal() as session:
+                await auction_service.place_bid(session, auction_id, team_id, 150, 1)
+
+            await asyncio.sleep(0.8)
+            async with AsyncSessionLocal() as session:
+                player = (await session.execute(select(Player).where(Player.id == player_id))).scalars().one()
+                auction = await session.get(Auction, auction_id)
+            return player.status, auction.current_bid, auction.total_revenue
+        finally:
+            await timer.stop()
+            await engine.dispose()
+
+    status, bid, revenue = asyncio.run(scenario())
+    assert status == PlayerStatusEnum.SOLD.value
+    assert bid == 150
+    assert revenue == 150
+
+
+def test_guarded_unsold_refuses_a_lot_with_a_bid(create_auction):
+    async def scenario():
+        await init_db()
+        auction_id, team_id, player_id = await create_auction()
+        try:
+            async with AsyncSessionLocal() as session:
+                await auction_service.start_auction(session, auction_id)
+                await auction_service.place_bid(session, auction_id, team_id, 150, 1)
+            with pytest.raises(HTTPException) as rejected:
+                async with AsyncSessionLocal() as session:
+                    await auction_service.mark_player_unsold(session, auction_id, expected_player_id=player_id)
+            async with AsyncSessionLocal() as session:
+                player = (await session.execute(select(Player).where(Player.id == player_id))).scalars().one()
+            return rejected.value.status_code, player.status
+        finally:
+            await engine.dispose()
+
+    status_code, player_status = asyncio.run(scenario())
+    assert status_code == 409
+    assert player_status == PlayerStatusEnum.AVAILABLE.value
@@ -0,0 +1,53 @@
+import asyncio
+
+from app.services.match_scoreboard import MatchScoreboardStore, Scoreboard
+
+
+def _board() -> Scoreboard:
+    return Scoreboard(
+        match_id="m1", status="scheduled", team_1_id="t1", team_2_id="t2", totals={"t1": 0, "t2": 0}
+    )
+
+
+def _message(board: Scoreboard, event_type: str, data: dict) -> dict:
+    board.apply(board.last_seq + 1, event_type, data)
+    return {"type": event_type, "match_id": board.match_id, "seq": board.last_seq, "data": data, "delta": board.delta(data)}
+
+
+def test_remote_events_are_replayed_in_order_and_gaps_drop_the_board():
+    appender = _board()
+    messages = [
+        _message(appender, "match_started", {}),
+        _message(appender, "innings_started", {"batting_team_id": "t1"}),
+        _message(appender, "run_scored", {"runs": 4, "batter_id": "b1", "bowler_id": "w1"}),
+        _message(appender, "run_scored", {"runs": 1, "batter_id": "b1", "bowler_id": "w1"}),
+    ]
+    store = MatchScoreboardStore()
+    store.install(_board())
+
+    async def ingest(*batch):
+        for message in batch:
+            await store.ingest_remote("match:m1", message)
+
+    asyncio.run(ingest(*messages[:3], messages[1]))  # a repeat is ignored
+    assert store.latest("m1").last_seq == 3
+    assert store.latest("m1").totals["t1"] == 4
+
+    lost = _message(appender, "run_scored", {"runs": 6})
+    asyncio.run(ingest(messages[3], _message(appender, "run_scored", {"runs": 1})))
+    assert lost["seq"] == 5
+    assert store.latest("m1") is None  # seq 6 after 4: rebuilt on the next read
+
+
+def test_delta_stays_small_without_over_completions():
+    board = _board()
+    board.apply(1, "match_started", {})
+    board.apply(2, "innings_started", {"batting_team_id": "t1"})
+    for seq in range(3, 3003):
+        board.apply(seq, "run_scored", {"runs": 1, "batter_id": f"b{seq % 40}", "bowler_id": f"w{seq % 9}"})
+
+    delta = board.delta({"batter_id": "b1", "bowler_id": "w1"})
+    assert len(delta["innings"]["batting"]) == 1
+    assert len(delta["innings"]["bowling"]) == 1
+    assert len(delta["this_over"]) < 3000
+    assert len(board.as_dict()["innings"][0]["batting"]) == 40
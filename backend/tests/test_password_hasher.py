@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+from fastapi import HTTPException
+
+from app.core import hash as hash_module
+from app.core.hash import PasswordHasher, hash_password, verify_password
+
+PASSWORD = "correct horse battery staple"
+
+
+class Concurrency:
+    """Wraps a bcrypt function, recording how many calls run at once."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def wrap(self, fn):
+        def counted(*args):
+            with self.lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            try:
+                return fn(*args)
+            finally:
+                with self.lock:
+                    self.running -= 1
+        return counted
+
+
+async def _max_tick_delay(until: asyncio.Future, interval: float = 0.01) -> float:
+    """Worst lateness of an `interval` sleep while `until` is pending."""
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    while not until.done():
+        started = loop.time()
+        await asyncio.sleep(interval)
+        worst = max(worst, loop.time() - started - interval)
+    return worst
+
+
+def test_hashing_leaves_the_event_loop_responsive_and_caps_threads(monkeypatch):
+    stored = hash_password(PASSWORD)
+    concurrency = Concurrency()
+    monkeypatch.setattr(hash_module, "hash_password", concurrency.wrap(hash_password))
+    monkeypatch.setattr(hash_module, "verify_password", concurrency.wrap(verify_password))
+
+    async def scenario():
+        hasher = PasswordHasher(workers=2, max_waiting=16)
+        await hasher.start()
+        try:
+            calls = asyncio.gather(
+                *(hasher.hash(PASSWORD) for _ in range(3)),
+                *(hasher.verify(PASSWORD, stored) for _ in range(3)),
+            )
+            lag = await _max_tick_delay(calls)
+            return await calls, lag
+        finally:
+            await hasher.stop()
+
+    results, lag = asyncio.run(scenario())
+
+    assert all(verify_password(PASSWORD, hashed) for hashed in results[:3])
+    assert results[3:] == [True, True, True]
+    assert concurrency.peak == 2
+    # One bcrypt call takes a few hundred milliseconds; on the loop a tick would wait that long
+    assert lag < 0.15
+
+
+def test_callers_beyond_max_waiting_are_refused():
+    async def scenario():
+        hasher = PasswordHasher(workers=1, max_waiting=1)
+        await hasher.start()
+        try:
+            return await asyncio.gather(*(hasher.hash(PASSWORD) for _ in range(3)), return_exceptions=True)
+        finally:
+            await hasher.stop()
+
+    results = asyncio.run(scenario())
+    refused = [result for result in results if isinstance(result, HTTPException)]
+    assert len(refused) == 1
+    assert refused[0].status_code == 503
+    assert refused[0].headers == {"Retry-After": "1"}
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.proxy_bidding import Contender, plan_proxy_bids
+
+T0 = datetime(2026, 10, 1, 12, 0, 0)
+EARLY, MIDDLE, LATE = T0, T0 + timedelta(seconds=1), T0 + timedelta(seconds=2)
+
+
+@pytest.mark.parametrize(
+    "current_bid, current_bidder_id, base_price, contenders, expected",
+    [
+        pytest.param(None, None, 100, [], [], id="no ceilings"),
+        pytest.param(None, None, 100, [Contender("A", 500, EARLY)], [("A", 100)], id="lone ceiling opens at the base price"),
+        pytest.param(None, None, None, [Contender("A", 500, EARLY)], [("A", 10)], id="no base price opens at one increment"),
+        pytest.param(
+            None, None, 100,
+            [Contender("A", 300, EARLY), Contender("B", 250, MIDDLE)],
+            [("B", 250), ("A", 260)],
+            id="higher ceiling wins one increment above the runner-up",
+        ),
+        pytest.param(
+            None, None, 100,
+            [Contender("A", 255, EARLY), Contender("B", 250, MIDDLE)],
+            [("B", 245), ("A", 255)],
+            id="winning bid is capped at its ceiling",
+        ),
+        pytest.param(
+            None, None, 100,
+            [Contender("A", 300, LATE), Contender("B", 300, EARLY)],
+            [("A", 290), ("B", 300)],
+            id="equal ceilings go to the earliest proxy",
+        ),
+        pytest.param(
+            None, None, 100,
+            [Contender("A", 300, EARLY), Contender("B", 100, MIDDLE)],
+            [("B", 100), ("A", 110)],
+            id="runner-up at the opening price still bids",
+        ),
+        pytest.param(200, "X", 100, [Contender("A", 205, EARLY)], [], id="ceiling below the next bid loses to the current bid"),
+        pytest.param(
+            200, "X", 100,
+            [Contender("A", 205, EARLY), Contender("B", 300, MIDDLE)],
+            [("B", 210)],
+            id="only ceilings that reach the next bid take part",
+        ),
+        pytest.param(
+            200, "X", 100,
+            [Contender("A", 210, EARLY)],
+            [("A", 210)],
+            id="incumbent without a ceiling is outbid and places nothing",
+        ),
+        pytest.param(
+            200, "X", 100,
+            [Contender("X", 400, EARLY), Contender("A", 300, MIDDLE)],
+            [("A", 300), ("X", 310)],
+            id="incumbent's own ceiling defends the lot",
+        ),
+        pytest.param(
+            200, "X", 100,
+            [Contender("X", 300, LATE), Contender("A", 300, EARLY)],
+            [("X", 290), ("A", 300)],
+            id="earlier ceiling beats the incumbent's equal one",
+        ),
+        pytest.param(
+            200, "X", 100,
+            [Contender("X", 150, EARLY), Contender("A", 250, MIDDLE)],
+            [("A", 210)],
+            id="incumbent ceiling below its standing bid counts as the bid",
+        ),
+        pytest.param(200, "X", 100, [Contender("X", 400, EARLY)], [], id="incumbent alone does not bid against itself"),
+    ],
+)
+def test_plan_proxy_bids(current_bid, current_bidder_id, base_price, contenders, expected):
+    assert plan_proxy_bids(current_bid, current_bidder_id, base_price, 10, contenders) == expected
@@ -0,0 +1,136 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.db import transactions
+from app.db.session import AsyncSessionLocal, engine
+from app.db.transactions import LockOrderError, classify_error, note_lock, run_transaction, tx_exhausted, tx_retries
+from app.models import Auction, Bid, Player, Team
+
+
+class DriverError(Exception):
+    def __init__(self, sqlstate):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+def _db_error(sqlstate: str) -> DBAPIError:
+    return DBAPIError("UPDATE auctions ...", {}, DriverError(sqlstate))
+
+
+@pytest.mark.parametrize(
+    "exc, reason",
+    [
+        (_db_error("40P01"), "deadlock"),
+        (_db_error("40001"), "serialization"),
+        (StaleDataError("version mismatch"), "stale"),
+        (_db_error("23505"), None),
+        (ValueError("not a database error"), None),
+    ],
+)
+def test_classify_error(exc, reason):
+    assert classify_error(exc) == reason
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(transactions.settings, "tx_retry_base_ms", 0)
+    monkeypatch.setattr(transactions.settings, "tx_max_retries", 3)
+    monkeypatch.setattr(transactions.settings, "auction_cas_max_retries", 2)
+
+
+def _run(unit, operation):
+    async def scenario():
+        try:
+            async with AsyncSessionLocal() as session:
+                return await run_transaction(session, unit, operation)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("failure, reason", [("40P01", "deadlock"), ("40001", "serialization"), (None, "stale")])
+def test_transient_failures_are_retried_until_the_unit_succeeds(fast_retries, failure, reason):
+    attempts = []
+    operation = f"test_retry_{reason}"
+
+    async def unit():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _db_error(failure) if failure else StaleDataError("version mismatch")
+        return "done"
+
+    assert _run(unit, operation) == "done"
+    assert len(attempts) == 3
+    assert tx_retries.value(operation=operation, reason=reason) == 2
+
+
+@pytest.mark.parametrize("failure, reason, limit", [("40P01", "deadlock", 3), (None, "stale", 2)])
+def test_exhausted_retries_become_409(fast_retries, failure, reason, limit):
+    attempts = []
+    operation = f"test_exhausted_{reason}"
+
+    async def unit():
+        attempts.append(1)
+        raise _db_error(failure) if failure else StaleDataError("version mismatch")
+
+    with pytest.raises(HTTPException) as exhausted:
+        _run(unit, operation)
+    assert exhausted.value.status_code == 409
+    assert len(attempts) == limit + 1
+    assert tx_exhausted.value(operation=operation, reason=reason) == 1
+
+
+def test_other_errors_are_not_retried(fast_retries):
+    attempts = []
+
+    async def unit():
+        attempts.append(1)
+        raise _db_error("23505")
+
+    with pytest.raises(DBAPIError):
+        _run(unit, "test_not_retried")
+    assert len(attempts) == 1
+
+
+def test_locks_in_canonical_order_are_allowed():
+    session = SimpleNamespace(info={})
+    for model in (Auction, Player, Player, Team, Bid):
+        note_lock(session, model)
+
+
+def test_out_of_order_lock_raises():
+    session = SimpleNamespace(info={})
+    note_lock(session, Auction)
+    note_lock(session, Team)
+    with pytest.raises(LockOrderError):
+        note_lock(session, Player)
+
+
+def test_lock_order_starts_over_with_each_attempt(fast_retries):
+    attempts = []
+
+    async def unit():
+        attempts.append(1)
+        session = unit.session
+        if len(attempts) == 1:
+            note_lock(session, Bid)
+            raise _db_error("40P01")
+        # A retry starts from no locks held, so Team is fine after the first attempt's Bid
+        note_lock(session, Team)
+        return len(attempts)
+
+    async def scenario():
+        try:
+            async with AsyncSessionLocal() as session:
+                unit.session = session
+                return await run_transaction(session, unit, "test_lock_reset")
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(scenario()) == 2
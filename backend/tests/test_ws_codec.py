@@ -0,0 +1,72 @@
+import asyncio
+import json
+import zlib
+
+import msgpack
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.core.security import create_access_token
+from app.db.session import AsyncSessionLocal, engine, init_db
+from app.models import User
+from app.websocket.codec import (
+    ENCODING_JSON,
+    ENCODING_JSON_DEFLATE,
+    ENCODING_MSGPACK,
+    ENCODING_MSGPACK_DEFLATE,
+    MAX_INBOUND_BYTES,
+    decode,
+    encode,
+)
+
+MESSAGE = {"type": "bid", "client_id": "c-1", "amount": 1500000}
+
+
+@pytest.mark.parametrize(
+    "encoding", [ENCODING_JSON, ENCODING_JSON_DEFLATE, ENCODING_MSGPACK, ENCODING_MSGPACK_DEFLATE]
+)
+def test_decode_reverses_encode(encoding):
+    assert decode(encode(MESSAGE, encoding), encoding) == MESSAGE
+
+
+def test_text_frames_are_json_whatever_the_encoding():
+    assert decode(json.dumps(MESSAGE), ENCODING_MSGPACK_DEFLATE) == MESSAGE
+
+
+@pytest.mark.parametrize(
+    "frame, encoding",
+    [
+        ("not json", ENCODING_JSON),
+        (b"not deflated", ENCODING_JSON_DEFLATE),
+        (b"\xc1", ENCODING_MSGPACK),
+        (zlib.compress(b"\0" * (MAX_INBOUND_BYTES + 1)), ENCODING_MSGPACK_DEFLATE),
+    ],
+)
+def test_invalid_frames_raise_value_error(frame, encoding):
+    with pytest.raises(ValueError):
+        decode(frame, encoding)
+
+
+def test_binary_frames_are_read_with_the_negotiated_encoding(create_auction):
+    async def prepare():
+        await init_db()
+        auction_id, _, _ = await create_auction()
+        async with AsyncSessionLocal() as session:
+            manager_id = (await session.execute(select(User.id).where(User.role == "team_manager"))).scalar_one()
+        await engine.dispose()
+        return auction_id, create_access_token(manager_id)
+
+    auction_id, token = asyncio.run(prepare())
+    from app.main import app
+
+    with TestClient(app) as client:
+        with client.websocket_connect(
+            f"/ws/auctions/{auction_id}?token={token}", subprotocols=[ENCODING_MSGPACK_DEFLATE]
+        ) as websocket:
+            websocket.send_bytes(encode({"type": "auth", "token": token}, ENCODING_MSGPACK_DEFLATE))
+            for _ in range(5):
+                reply = msgpack.unpackb(zlib.decompress(websocket.receive_bytes()))
+                if reply["type"] == "auth_ok":
+                    break
+            assert reply["type"] == "auth_ok"